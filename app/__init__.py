@@ -1,19 +1,84 @@
 import os
-from flask import Flask
+import threading
+from io import BytesIO
+from flask import Flask, Request
 from flask_cors import CORS
 
 
-def create_app():
+def env_flag(name, default="false"):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+class UploadRequest(Request):
+    """
+    Keeps uploaded files in memory instead of spooling parts over 500 KB to
+    a temporary file. Only done when the body is capped with
+    `max_content_length`, so memory use stays bounded; other requests keep
+    Werkzeug's default.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        if self.max_content_length is not None:
+            return BytesIO()
+        return super()._get_file_stream(
+            total_content_length, content_type, filename, content_length
+        )
+
+
+def warm_up():
+    """
+    Import the heavy modules and build the clients that requests otherwise
+    load on first use (python-docx, openai, boto3, the S3 client and the
+    blank .docx template). The PDF render pool is left to the first PDF, so
+    workers that never render one do not start its processes.
+    """
+    from docx import Document  # noqa: F401
+    from app.utils.docx_extract import parse_docx  # noqa: F401
+    from app.utils.docx_template import blank_template
+    from app.utils.llm_utils import get_openai
+    from app.utils.s3_utils import get_s3_client
+
+    get_openai()
+    get_s3_client()
+    blank_template()
+
+
+def warm_up_in_background():
+    """
+    Run `warm_up` on a daemon thread so the worker can serve requests while it
+    loads. Under gunicorn without --preload, create_app runs after the fork,
+    so each worker warms up its own clients.
+    """
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def create_app(config=None):
     app = Flask(__name__, static_folder="static")
+    app.request_class = UploadRequest
     CORS(
         app, resources={r"/*": {"origins": "*"}}
     )  # Allow all origins for development; restrict in production
     app.config["UPLOAD_FOLDER"] = "static/uploads"
+    app.config["LOG_LEVEL"] = os.getenv("LOG_LEVEL", "INFO")
+    app.config["LIBRARY_LOG_LEVEL"] = os.getenv("LIBRARY_LOG_LEVEL", "WARNING")
+    # Load heavy modules and clients in the background instead of on the first request
+    app.config["WARM_UP"] = env_flag("WARM_UP")
+    if config:
+        app.config.update(config)
 
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
     from .routes import api
+    from .utils.tracing import configure_logging, init_tracing
 
+    configure_logging(app.config["LOG_LEVEL"], app.config["LIBRARY_LOG_LEVEL"])
+    init_tracing(app)
     app.register_blueprint(api)
 
+    if app.config["WARM_UP"]:
+        warm_up_in_background()
+
     return app
@@ -0,0 +1,462 @@
+"""
+Async serving mode: the same API as the Flask blueprint in app/routes.py,
+served by aiohttp so one worker can hold hundreds of in-flight requests and
+generations. LLM calls use openai's async client over a shared aiohttp
+session; blocking S3 calls run on a thread pool sized like the S3 connection
+pool (see s3_utils.run_s3).
+
+    python -m aiohttp.web -H 0.0.0.0 -P 5000 app.async_app:create_async_app
+    gunicorn "app.async_app:create_async_app()" --worker-class aiohttp.GunicornWebWorker
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from io import BytesIO
+from aiohttp import hdrs, web
+from botocore.exceptions import ClientError, PaginationError
+from app import env_flag, warm_up_in_background
+from app.routes import (
+    MAX_RESUME_REQUEST_SIZE,
+    MAX_RESUME_SIZE,
+    generation_dedupe_key,
+    job_accepted,
+    job_queue,
+    parse_batch_jobs,
+    parse_output_format,
+    parse_page_size,
+    parse_resume_keys,
+    resume_format,
+)
+from app.utils.file_utils import DOCX_MIMETYPE, DOCX_SIGNATURE
+from app.utils.generate_pdf import PDF_MIMETYPE, adocx_to_pdf, pdf_cache
+from app.utils.generation import (
+    GenerationError,
+    agenerate_resume_for_user,
+    agenerate_resumes_for_user,
+)
+from app.utils.llm_utils import close_aiosession
+from app.utils.nlp_utils import reuse_index, tailoring_cache
+from app.utils.resume_store import (
+    delete_tailored_resumes,
+    get_master_resume_url,
+    get_tailored_resume_url,
+    list_tailored_resumes,
+    load_tailored_resume,
+    store_master_resume,
+)
+from app.utils.s3_utils import presigned_url_cache, run_s3
+from app.utils.tracing import (
+    REQUEST_ID_HEADER,
+    begin_request,
+    configure_logging,
+    end_request,
+    render_metrics,
+    request_id_var,
+)
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_FOLDER = "static/uploads"
+
+# How often event streams check their job for updates, in seconds
+JOB_EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", "0.1"))
+
+
+def error_response(message, status):
+    return web.json_response({"error": message}, status=status)
+
+
+@web.middleware
+async def cors_middleware(request, handler):
+    # Allow all origins, like flask-cors in create_app
+    if request.method == hdrs.METH_OPTIONS:
+        response = web.Response()
+        response.headers["Access-Control-Allow-Methods"] = request.headers.get(
+            "Access-Control-Request-Method", "GET, POST, DELETE"
+        )
+        response.headers["Access-Control-Allow-Headers"] = request.headers.get(
+            "Access-Control-Request-Headers", "*"
+        )
+    else:
+        response = await handler(request)
+    if not response.prepared:
+        response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+@web.middleware
+async def tracing_middleware(request, handler):
+    begin_request(request.headers.get(REQUEST_ID_HEADER))
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        if not response.prepared:
+            response.headers[REQUEST_ID_HEADER] = request_id_var.get()
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        resource = request.match_info.route.resource
+        end_request(
+            request.method,
+            resource.canonical if resource is not None else "unmatched",
+            request.path,
+            status,
+            time.perf_counter() - start,
+        )
+
+
+async def stream_response(request, content_type):
+    response = web.StreamResponse(
+        headers={
+            "Content-Type": content_type,
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "Access-Control-Allow-Origin": "*",
+            REQUEST_ID_HEADER: request_id_var.get(),
+        }
+    )
+    await response.prepare(request)
+    return response
+
+
+async def home(request):
+    return web.json_response({"message": "Welcome to the Resume Tailor API!"})
+
+
+async def health_check(request):
+    return web.json_response({"status": "ok"})
+
+
+async def cache_stats(request):
+    stats = {"presignedUrls": presigned_url_cache.stats(), "pdf": pdf_cache.stats()}
+    if tailoring_cache is not None:
+        stats["tailoring"] = tailoring_cache.stats()
+    if reuse_index is not None:
+        stats["tailoringReuse"] = reuse_index.stats()
+    return web.json_response(stats)
+
+
+async def metrics(request):
+    return web.Response(text=render_metrics(), content_type="text/plain")
+
+
+async def upload_resume(request):
+    user_id = request.headers.get("userId")
+    if not user_id:
+        return error_response("User ID is required", 400)
+
+    # Reject oversized requests from the declared length, before reading the body
+    if request.content_length and request.content_length > MAX_RESUME_REQUEST_SIZE:
+        return error_response("File size exceeds the 2MB limit.", 400)
+
+    invalid_format = "Invalid file format. Only .docx files are allowed."
+    if not request.content_type.startswith("multipart/"):
+        return error_response(invalid_format, 400)
+    file = None
+    async for part in await request.multipart():
+        if part.name == "resume":
+            file = part
+            break
+    if file is None or not file.filename or file.filename.split(".")[-1].lower() != "docx":
+        return error_response(invalid_format, 400)
+
+    mimetype = file.headers.get(hdrs.CONTENT_TYPE, "").split(";")[0].strip()
+    if mimetype != DOCX_MIMETYPE:
+        return error_response("Invalid MIME type. Please upload a .docx file.", 400)
+
+    # Read with the size limit enforced as bytes arrive
+    data = bytearray()
+    while chunk := await file.read_chunk():
+        data += chunk
+        if len(data) > MAX_RESUME_SIZE:
+            return error_response("File size exceeds the 2MB limit.", 400)
+
+    # A .docx is a zip archive, so it must start with the zip local file header
+    if not data.startswith(DOCX_SIGNATURE):
+        return error_response("Invalid file content. Please upload a .docx file.", 400)
+
+    try:
+        s3_url = await run_s3(store_master_resume, user_id, BytesIO(data), file.filename)
+        if not s3_url:
+            return error_response("Failed to upload to S3", 500)
+        return web.json_response(
+            {
+                "message": "Resume uploaded successfully",
+                "resumeUrl": s3_url,
+                "fileName": file.filename,
+            }
+        )
+    except Exception as e:
+        logger.exception("Error uploading resume")
+        return error_response("Failed to upload resume", 500)
+
+
+async def serve_uploaded_file(request):
+    filename = request.match_info["filename"]
+    path = os.path.join(UPLOAD_FOLDER, filename)
+    if os.path.basename(filename) != filename or not os.path.isfile(path):
+        return error_response("File not found", 404)
+    return web.FileResponse(path)
+
+
+async def get_master_resume(request):
+    user_id = request.headers.get("userId")
+    if not user_id:
+        return error_response("User ID is required", 400)
+
+    try:
+        master_resume = await run_s3(get_master_resume_url, user_id)
+        if master_resume is None:
+            return error_response("No master resume found", 404)
+
+        pre_signed_url, file_name = master_resume
+        return web.json_response({"resumeUrl": pre_signed_url, "fileName": file_name})
+    except ClientError as e:
+        logger.exception("Error accessing S3")
+        return error_response("Failed to access S3", 500)
+    except Exception as e:
+        logger.exception("Unexpected error")
+        return error_response("An unexpected error occurred", 500)
+
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def generate_resume(request):
+    """
+    Start a tailored resume generation as a task on the event loop and return
+    its job id right away, like the Flask route.
+    """
+    user_id = request.headers.get("userId")
+    if not user_id:
+        return error_response("User ID is required", 400)
+
+    data = await read_json(request) or {}
+    job_title = data.get("jobTitle")
+    job_description = data.get("jobDescription")
+    if not job_title or not job_description:
+        return error_response("Job title and description are required", 400)
+    output_format, error = parse_output_format(data.get("format"))
+    if error:
+        return error_response(error, 400)
+
+    try:
+        job = job_queue.submit_async(
+            user_id,
+            generation_dedupe_key(user_id, job_title, job_description, output_format),
+            agenerate_resume_for_user,
+            user_id,
+            job_title,
+            job_description,
+            output_format=output_format,
+        )
+        return web.json_response(job_accepted(job), status=202)
+    except Exception as e:
+        logger.exception("Error queueing tailored resume")
+        return error_response("Failed to generate tailored resume", 500)
+
+
+async def generate_resumes_batch(request):
+    user_id = request.headers.get("userId")
+    if not user_id:
+        return error_response("User ID is required", 400)
+
+    jobs, error = parse_batch_jobs(await read_json(request))
+    if error:
+        return error_response(error, 400)
+
+    try:
+        results = await agenerate_resumes_for_user(user_id, jobs)
+    except GenerationError as e:
+        return error_response(str(e), e.status_code)
+    except Exception as e:
+        logger.exception("Error starting batch generation")
+        return error_response("Failed to generate tailored resumes", 500)
+
+    response = await stream_response(request, "application/x-ndjson")
+    async for result in results:
+        await response.write((json.dumps(result) + "\n").encode())
+    await response.write_eof()
+    return response
+
+
+def get_user_job(request):
+    job = job_queue.get(request.match_info["job_id"])
+    if job is None or job.user_id != request.headers.get("userId"):
+        return None
+    return job
+
+
+async def get_job(request):
+    job = get_user_job(request)
+    if job is None:
+        return error_response("Job not found", 404)
+    return web.json_response(job.to_dict())
+
+
+async def stream_job_events(request):
+    """
+    Server-sent events with the job state after every update, ending once
+    the job has finished. Jobs may be updated from worker threads, so the
+    stream polls the job's version instead of blocking on it.
+    """
+    job = get_user_job(request)
+    if job is None:
+        return error_response("Job not found", 404)
+
+    response = await stream_response(request, "text/event-stream")
+    version = None
+    last_write = time.monotonic()
+    while True:
+        if job.version != version:
+            version = job.version
+            await response.write(f"data: {json.dumps(job.to_dict())}\n\n".encode())
+            last_write = time.monotonic()
+            if job.finished:
+                break
+        elif time.monotonic() - last_write >= 15:
+            await response.write(b": keep-alive\n\n")
+            last_write = time.monotonic()
+        await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+    await response.write_eof()
+    return response
+
+
+async def get_tailored_resumes(request):
+    user_id = request.headers.get("userId")
+    if not user_id:
+        return error_response("User ID is required", 400)
+
+    limit, error = parse_page_size(request.query.get("limit"))
+    if error:
+        return error_response(error, 400)
+
+    try:
+        tailored_resumes, next_cursor = await run_s3(
+            list_tailored_resumes, user_id, limit, request.query.get("cursor")
+        )
+        return web.json_response({"resumes": tailored_resumes, "nextCursor": next_cursor})
+    except PaginationError:
+        return error_response("Invalid cursor", 400)
+    except Exception as e:
+        logger.exception("Error fetching tailored resumes")
+        return error_response("Failed to fetch tailored resumes", 500)
+
+
+async def download_tailored_resume(request):
+    user_id = request.headers.get("userId")
+    key = request.query.get("key")
+    if not user_id or not key:
+        return error_response("User ID and resume key are required", 400)
+
+    stored_format = resume_format(key)
+    output_format, error = parse_output_format(request.query.get("format", stored_format))
+    if error:
+        return error_response(error, 400)
+
+    try:
+        if output_format == stored_format:
+            url = await run_s3(get_tailored_resume_url, user_id, key)
+            return web.Response(status=302, headers={hdrs.LOCATION: url})
+        if stored_format != "docx":
+            return error_response(f"Cannot convert this resume to {output_format}", 400)
+
+        docx_bytes = await run_s3(load_tailored_resume, user_id, key)
+        if docx_bytes is None:
+            return error_response("Resume not found", 404)
+        file_name = f"{key.rsplit('.', 1)[0]}.pdf"
+        return web.Response(
+            body=await adocx_to_pdf(docx_bytes),
+            content_type=PDF_MIMETYPE,
+            headers={hdrs.CONTENT_DISPOSITION: f'attachment; filename="{file_name}"'},
+        )
+    except Exception as e:
+        logger.exception("Error downloading tailored resume")
+        return error_response("Failed to download tailored resume", 500)
+
+
+async def delete_tailored_resume(request):
+    user_id = request.headers.get("userId")
+    key = request.query.get("key")
+    if not user_id or not key:
+        return error_response("User ID and resume key are required", 400)
+
+    try:
+        _, errors = await run_s3(delete_tailored_resumes, user_id, [key])
+        if errors:
+            raise Exception(f"File deletion failed: {errors[0]['message']}")
+        return web.json_response({"message": "Resume deleted successfully"})
+    except Exception as e:
+        logger.exception("Error deleting tailored resume")
+        return error_response("Failed to delete tailored resume", 500)
+
+
+async def bulk_delete_tailored_resumes(request):
+    user_id = request.headers.get("userId")
+    if not user_id:
+        return error_response("User ID is required", 400)
+
+    keys, error = parse_resume_keys(await read_json(request))
+    if error:
+        return error_response(error, 400)
+
+    try:
+        deleted, errors = await run_s3(delete_tailored_resumes, user_id, keys)
+        return web.json_response(
+            {"deleted": deleted, "errors": errors}, status=200 if not errors else 207
+        )
+    except Exception as e:
+        logger.exception("Error deleting tailored resumes")
+        return error_response("Failed to delete tailored resumes", 500)
+
+
+async def close_pools(app):
+    await close_aiosession()
+
+
+def create_async_app(argv=None):
+    """
+    Build the aiohttp application. `argv` is accepted so the factory can be
+    passed to `python -m aiohttp.web`.
+    """
+    configure_logging(
+        os.getenv("LOG_LEVEL", "INFO"), os.getenv("LIBRARY_LOG_LEVEL", "WARNING")
+    )
+    app = web.Application(
+        middlewares=[cors_middleware, tracing_middleware],
+        client_max_size=MAX_RESUME_REQUEST_SIZE,
+    )
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    app.add_routes(
+        [
+            web.get("/", home),
+            web.get("/health", health_check),
+            web.get("/cache-stats", cache_stats),
+            web.get("/metrics", metrics),
+            web.post("/upload-resume", upload_resume),
+            web.get("/static/uploads/{filename}", serve_uploaded_file),
+            web.get("/get-master-resume", get_master_resume),
+            web.post("/generate-resume", generate_resume),
+            web.post("/generate-resumes/batch", generate_resumes_batch),
+            web.get("/jobs/{job_id}", get_job),
+            web.get("/jobs/{job_id}/events", stream_job_events),
+            web.get("/get-tailored-resumes", get_tailored_resumes),
+            web.get("/download-tailored-resume", download_tailored_resume),
+            web.delete("/delete-tailored-resume", delete_tailored_resume),
+            web.delete("/tailored-resumes", bulk_delete_tailored_resumes),
+        ]
+    )
+    app.on_cleanup.append(close_pools)
+    if env_flag("WARM_UP"):
+        warm_up_in_background()
+    return app
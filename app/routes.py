@@ -1,14 +1,146 @@
 import os
-import re
-import boto3
-from botocore.exceptions import ClientError
-from flask import Blueprint, request, jsonify, send_from_directory
-from app.utils.file_utils import save_file
-from app.utils.nlp_utils import generate_tailored_resume_with_chunking
-from app.utils.s3_utils import upload_to_s3, delete_from_s3
+import json
+import logging
+from botocore.exceptions import ClientError, PaginationError
+from werkzeug.exceptions import RequestEntityTooLarge
+from io import BytesIO
+from flask import (
+    Blueprint,
+    Response,
+    redirect,
+    request,
+    jsonify,
+    send_file,
+    send_from_directory,
+)
+from app.utils.cache_utils import hash_key, normalize_text
+from app.utils.file_utils import (
+    DOCX_MIMETYPE,
+    DOCX_SIGNATURE,
+    save_file,
+)
+from app.utils.generate_pdf import PDF_MIMETYPE, docx_to_pdf, pdf_cache
+from app.utils.generation import (
+    OUTPUT_FORMATS,
+    GenerationError,
+    generate_resume_for_user,
+    generate_resumes_for_user,
+)
+from app.utils.job_queue import JobQueue
+from app.utils.nlp_utils import reuse_index, tailoring_cache
+from app.utils.resume_store import (
+    delete_tailored_resumes,
+    get_master_resume_url,
+    get_tailored_resume_url,
+    list_tailored_resumes,
+    load_tailored_resume,
+    store_master_resume,
+)
+from app.utils.tracing import render_metrics
+from app.utils.s3_utils import presigned_url_cache
+
+logger = logging.getLogger(__name__)
 
 api = Blueprint("api", __name__)
 
+job_queue = JobQueue(
+    max_workers=int(os.getenv("JOB_WORKERS", "4")),
+    result_ttl=int(os.getenv("JOB_RESULT_TTL", "3600")),
+    user_errors=(GenerationError,),
+)
+
+MAX_RESUME_SIZE = 2 * 1024 * 1024
+# Allowance for multipart boundaries and headers around the file itself
+MAX_RESUME_REQUEST_SIZE = MAX_RESUME_SIZE + 64 * 1024
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+MAX_BATCH_JOBS = int(os.getenv("BATCH_MAX_JOBS", "50"))
+MAX_BULK_DELETE_KEYS = int(os.getenv("BULK_DELETE_MAX_KEYS", "10000"))
+
+def generation_dedupe_key(user_id, job_title, job_description, output_format="docx"):
+    return hash_key(
+        user_id, normalize_text(job_title), normalize_text(job_description), output_format
+    )
+
+
+def job_accepted(job):
+    return {
+        "message": "Resume generation started",
+        "jobId": job.id,
+        "status": job.status,
+        "statusUrl": f"/jobs/{job.id}",
+        "eventsUrl": f"/jobs/{job.id}/events",
+    }
+
+
+def parse_batch_jobs(data):
+    """
+    Validate a batch generation body. Returns (jobs, error message).
+    """
+    jobs = data.get("jobs") if isinstance(data, dict) else None
+    if not isinstance(jobs, list) or not jobs:
+        return None, "A non-empty list of jobs is required"
+    if len(jobs) > MAX_BATCH_JOBS:
+        return None, f"At most {MAX_BATCH_JOBS} jobs per batch"
+    for job in jobs:
+        if not isinstance(job, dict) or not job.get("jobTitle") or not job.get("jobDescription"):
+            return None, "Every job needs a title and description"
+        output_format, error = parse_output_format(job.get("format"))
+        if error:
+            return None, error
+        job["format"] = output_format
+    return jobs, None
+
+
+def parse_output_format(value):
+    """
+    Validate a requested output format. Returns (format, error message).
+    """
+    if value is None:
+        return "docx", None
+    output_format = value.lower() if isinstance(value, str) else None
+    if output_format not in OUTPUT_FORMATS:
+        return None, f"format must be one of: {', '.join(OUTPUT_FORMATS)}"
+    return output_format, None
+
+
+def resume_format(key):
+    """
+    Output format of a tailored resume from its file name, or None.
+    """
+    extension = key.rsplit(".", 1)[-1].lower() if "." in key else None
+    return extension if extension in OUTPUT_FORMATS else None
+
+
+def parse_page_size(value):
+    """
+    Validate the `limit` query parameter. Returns (limit, error message).
+    """
+    try:
+        limit = int(value) if value is not None else DEFAULT_PAGE_SIZE
+    except ValueError:
+        return None, "limit must be an integer"
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return None, f"limit must be between 1 and {MAX_PAGE_SIZE}"
+    return limit, None
+
+
+def parse_resume_keys(data):
+    """
+    Validate a bulk delete body. Returns (keys, error message).
+    """
+    keys = data.get("keys") if isinstance(data, dict) else None
+    if not isinstance(keys, list) or not keys or not all(
+        isinstance(key, str) and key for key in keys
+    ):
+        return None, "A non-empty list of resume keys is required"
+    if len(keys) > MAX_BULK_DELETE_KEYS:
+        return None, f"At most {MAX_BULK_DELETE_KEYS} keys per request"
+    return keys, None
+
+
 @api.route("/", methods=["GET"])
 def home():
     return jsonify({"message": "Welcome to the Resume Tailor API!"})
@@ -17,52 +149,62 @@ def home():
 def health_check():
     return jsonify({"status": "ok"}), 200
 
+@api.route("/cache-stats", methods=["GET"])
+def cache_stats():
+    stats = {"presignedUrls": presigned_url_cache.stats(), "pdf": pdf_cache.stats()}
+    if tailoring_cache is not None:
+        stats["tailoring"] = tailoring_cache.stats()
+    if reuse_index is not None:
+        stats["tailoringReuse"] = reuse_index.stats()
+    return jsonify(stats), 200
+
+@api.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Stage, request and LLM metrics in the Prometheus text format.
+    """
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
 @api.route("/upload-resume", methods=["POST"])
 def upload_resume():
     user_id = request.headers.get("userId")
     if not user_id:
         return jsonify({"error": "User ID is required"}), 400
 
-    file = request.files.get("resume")
+    # Reject oversized requests from the declared length, before reading the body
+    if request.content_length and request.content_length > MAX_RESUME_REQUEST_SIZE:
+        return jsonify({"error": "File size exceeds the 2MB limit."}), 400
+
+    # Chunked bodies have no declared length; stop reading them at the limit too
+    request.max_content_length = MAX_RESUME_REQUEST_SIZE
+    try:
+        file = request.files.get("resume")
+    except RequestEntityTooLarge:
+        return jsonify({"error": "File size exceeds the 2MB limit."}), 400
     if not file or file.filename.split(".")[-1].lower() != "docx":
         return jsonify({"error": "Invalid file format. Only .docx files are allowed."}), 400
 
-    if file.mimetype != "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+    if file.mimetype != DOCX_MIMETYPE:
         return jsonify({"error": "Invalid MIME type. Please upload a .docx file."}), 400
 
-    max_file_size = 2 * 1024 * 1024 
-    if len(file.read()) > max_file_size:
+    # UploadRequest keeps the capped part in memory, so its size is known here
+    stream = file.stream
+    if stream.seek(0, os.SEEK_END) > MAX_RESUME_SIZE:
         return jsonify({"error": "File size exceeds the 2MB limit."}), 400
-    file.seek(0) 
+
+    # A .docx is a zip archive, so it must start with the zip local file header
+    stream.seek(0)
+    if stream.read(len(DOCX_SIGNATURE)) != DOCX_SIGNATURE:
+        return jsonify({"error": "Invalid file content. Please upload a .docx file."}), 400
+    stream.seek(0)
 
     original_filename = file.filename
-    s3_key = f"{user_id}/master_resume/{original_filename}"
-    local_file_path = os.path.join("static/uploads", original_filename)
 
     try:
-        # Initialize S3 client
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("AWS_S3_REGION"),
-        )
-
-        # Delete any existing files in the master_resume folder
-        existing_files = s3_client.list_objects_v2(
-            Bucket=os.getenv("AWS_S3_BUCKET"), Prefix=f"{user_id}/master_resume/"
-        )
-        for obj in existing_files.get("Contents", []):
-            s3_client.delete_object(Bucket=os.getenv("AWS_S3_BUCKET"), Key=obj["Key"])
-
-        # Save the new file locally
-        file.save(local_file_path)
-
-        # Upload the new file to S3
-        s3_url = upload_to_s3(local_file_path, os.getenv("AWS_S3_BUCKET"), s3_key)
+        # Upload straight from memory; nothing is written to local disk
+        s3_url = store_master_resume(user_id, stream, original_filename)
         if not s3_url:
             return jsonify({"error": "Failed to upload to S3"}), 500
-        os.remove(local_file_path)
 
         return (
             jsonify(
@@ -75,7 +217,7 @@ def upload_resume():
             200,
         )
     except Exception as e:
-        print(f"Error uploading resume: {e}")
+        logger.exception("Error uploading resume")
         return jsonify({"error": "Failed to upload resume"}), 500
 
 
@@ -98,46 +240,28 @@ def get_master_resume():
         return jsonify({"error": "User ID is required"}), 400
 
     try:
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("AWS_S3_REGION"),
-        )
-        response = s3_client.list_objects_v2(
-            Bucket=os.getenv("AWS_S3_BUCKET"), Prefix=f"{user_id}/master_resume/"
-        )
-        if "Contents" not in response:
-            return jsonify({"error": "No master resume found"}), 404
-
-        master_resumes = response["Contents"]
-        if not master_resumes:
+        master_resume = get_master_resume_url(user_id)
+        if master_resume is None:
             return jsonify({"error": "No master resume found"}), 404
 
-        # Assume there's only one file in master_resume directory
-        master_file = master_resumes[0]["Key"]
-        pre_signed_url = s3_client.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": os.getenv("AWS_S3_BUCKET"), "Key": master_file},
-            ExpiresIn=3600,  # Valid for 1 hour
-        )
-        return (
-            jsonify(
-                {"resumeUrl": pre_signed_url, "fileName": master_file.split("/")[-1]}
-            ),
-            200,
-        )
+        pre_signed_url, file_name = master_resume
+        return jsonify({"resumeUrl": pre_signed_url, "fileName": file_name}), 200
     except ClientError as e:
-        print(f"Error accessing S3: {e}")
+        logger.exception("Error accessing S3")
         return jsonify({"error": "Failed to access S3"}), 500
 
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        logger.exception("Unexpected error")
         return jsonify({"error": "An unexpected error occurred"}), 500
 
 
 @api.route("/generate-resume", methods=["POST"])
 def generate_resume():
+    """
+    Queue a tailored resume generation and return its job id right away.
+    Poll /jobs/<job_id> or subscribe to /jobs/<job_id>/events for progress.
+    `"format": "pdf"` in the body stores the result as a PDF instead of .docx.
+    """
     user_id = request.headers.get("userId")
     if not user_id:
         return jsonify({"error": "User ID is required"}), 400
@@ -147,136 +271,205 @@ def generate_resume():
     job_description = data.get("jobDescription")
     if not job_title or not job_description:
         return jsonify({"error": "Job title and description are required"}), 400
-
-    sanitized_job_title = re.sub(r"[^\w\s-]", "", job_title).replace(" ", "_")
-    tailored_file_name = f"{sanitized_job_title}_Tailored_Resume.docx"
-    s3_key_tailored = f"{user_id}/{tailored_file_name}"
-    local_file_path = os.path.join("static/uploads", tailored_file_name)
+    output_format, error = parse_output_format(data.get("format"))
+    if error:
+        return jsonify({"error": error}), 400
 
     try:
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("AWS_S3_REGION"),
+        job = job_queue.submit(
+            user_id,
+            generation_dedupe_key(user_id, job_title, job_description, output_format),
+            generate_resume_for_user,
+            user_id,
+            job_title,
+            job_description,
+            output_format=output_format,
         )
+        return jsonify(job_accepted(job)), 202
+    except Exception as e:
+        logger.exception("Error queueing tailored resume")
+        return jsonify({"error": "Failed to generate tailored resume"}), 500
 
-        # Find the master resume in the master_resume folder
-        response = s3_client.list_objects_v2(
-            Bucket=os.getenv("AWS_S3_BUCKET"), Prefix=f"{user_id}/master_resume/"
-        )
-        if "Contents" not in response or not response["Contents"]:
-            return jsonify({"error": "No master resume found"}), 404
 
-        # Get the first file in the master_resume folder
-        master_file_key = response["Contents"][0]["Key"]
-        pre_signed_url = s3_client.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": os.getenv("AWS_S3_BUCKET"), "Key": master_file_key},
-            ExpiresIn=3600,  # Valid for 1 hour
-        )
+@api.route("/generate-resumes/batch", methods=["POST"])
+def generate_resumes_batch():
+    """
+    Tailor the master resume to several jobs in one request:
+    {"jobs": [{"jobTitle": ..., "jobDescription": ...}, ...]}.
+    The master resume is loaded once, jobs run concurrently, and results are
+    streamed back as newline-delimited JSON, one line per job as it finishes.
+    """
+    user_id = request.headers.get("userId")
+    if not user_id:
+        return jsonify({"error": "User ID is required"}), 400
 
-        # Generate the tailored resume
-        generate_tailored_resume_with_chunking(
-            pre_signed_url, job_title, job_description, local_file_path
-        )
+    jobs, error = parse_batch_jobs(request.get_json(silent=True))
+    if error:
+        return jsonify({"error": error}), 400
 
-        # Upload the tailored resume back to S3
-        s3_url = upload_to_s3(
-            local_file_path, os.getenv("AWS_S3_BUCKET"), s3_key_tailored
-        )
-        os.remove(local_file_path)
+    try:
+        results = generate_resumes_for_user(user_id, jobs)
+    except GenerationError as e:
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.exception("Error starting batch generation")
+        return jsonify({"error": "Failed to generate tailored resumes"}), 500
 
-        # Generate a pre-signed URL for the tailored resume
-        tailored_resume_url = s3_client.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": os.getenv("AWS_S3_BUCKET"), "Key": s3_key_tailored},
-            ExpiresIn=3600,  # Valid for 1 hour
-        )
+    return Response(
+        (json.dumps(result) + "\n" for result in results),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        return (
-            jsonify(
-                {
-                    "message": "Resume tailored successfully",
-                    "resumeUrl": tailored_resume_url,
-                }
-            ),
-            200,
-        )
-    except Exception as e:
-        print(f"Error generating tailored resume: {e}")
-        return jsonify({"error": "Failed to generate tailored resume"}), 500
+
+def get_user_job(job_id):
+    user_id = request.headers.get("userId")
+    job = job_queue.get(job_id)
+    if job is None or job.user_id != user_id:
+        return None
+    return job
+
+
+@api.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@api.route("/jobs/<job_id>/events", methods=["GET"])
+def stream_job_events(job_id):
+    """
+    Server-sent events with the job state after every update, ending once
+    the job has finished.
+    """
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def events():
+        version = None
+        while True:
+            current = job.wait_for_change(version, timeout=15)
+            if current == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = current
+            yield f"data: {json.dumps(job.to_dict())}\n\n"
+            if job.finished:
+                break
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @api.route("/get-tailored-resumes", methods=["GET"])
 def get_tailored_resumes():
+    """
+    List a page of the user's tailored resumes.
+    Query params: `limit` (1-1000, default 50) and `cursor`, the `nextCursor`
+    returned by the previous page.
+    """
     user_id = request.headers.get("userId")
     if not user_id:
         return jsonify({"error": "User ID is required"}), 400
 
+    limit, error = parse_page_size(request.args.get("limit"))
+    if error:
+        return jsonify({"error": error}), 400
+    cursor = request.args.get("cursor")
+
     try:
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("AWS_S3_REGION"),
-        )
-        response = s3_client.list_objects_v2(
-            Bucket=os.getenv("AWS_S3_BUCKET"),
-            Prefix=f"{user_id}/",
-        )
-        tailored_resumes = []
-        for obj in response.get("Contents", []):
-            key = obj["Key"]
-            if "master_resume" not in key:  # Exclude the master resume
-                file_name = key.split("/")[-1]
-                pre_signed_url = s3_client.generate_presigned_url(
-                    "get_object",
-                    Params={"Bucket": os.getenv("AWS_S3_BUCKET"), "Key": key},
-                    ExpiresIn=3600,
-                )
-                tailored_resumes.append(
-                    {"title": file_name, "downloadUrl": pre_signed_url}
-                )
-
-        return jsonify({"resumes": tailored_resumes}), 200
+        tailored_resumes, next_cursor = list_tailored_resumes(user_id, limit, cursor)
+        return jsonify({"resumes": tailored_resumes, "nextCursor": next_cursor}), 200
+    except PaginationError:
+        return jsonify({"error": "Invalid cursor"}), 400
     except Exception as e:
-        print(f"Error fetching tailored resumes: {e}")
+        logger.exception("Error fetching tailored resumes")
         return jsonify({"error": "Failed to fetch tailored resumes"}), 500
-    
 
-@api.route("/delete-tailored-resume", methods=["DELETE"])
-def delete_tailored_resume():
+
+@api.route("/download-tailored-resume", methods=["GET"])
+def download_tailored_resume():
+    """
+    Download a tailored resume by file name, as stored (redirect to a
+    pre-signed URL) or, with `format=pdf`, a .docx rendered to PDF.
+    """
     user_id = request.headers.get("userId")
     key = request.args.get("key")
-
     if not user_id or not key:
         return jsonify({"error": "User ID and resume key are required"}), 400
 
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        region_name=os.getenv("AWS_S3_REGION"),
-    )
+    stored_format = resume_format(key)
+    output_format, error = parse_output_format(request.args.get("format", stored_format))
+    if error:
+        return jsonify({"error": error}), 400
 
     try:
-        # Delete the object
-        s3_client.delete_object(
-            Bucket=os.getenv("AWS_S3_BUCKET"), Key=f"{user_id}/{key}"
+        if output_format == stored_format:
+            return redirect(get_tailored_resume_url(user_id, key))
+        if stored_format != "docx":
+            return jsonify({"error": f"Cannot convert this resume to {output_format}"}), 400
+
+        docx_bytes = load_tailored_resume(user_id, key)
+        if docx_bytes is None:
+            return jsonify({"error": "Resume not found"}), 404
+        return send_file(
+            BytesIO(docx_to_pdf(docx_bytes)),
+            mimetype=PDF_MIMETYPE,
+            as_attachment=True,
+            download_name=f"{key.rsplit('.', 1)[0]}.pdf",
         )
+    except Exception as e:
+        logger.exception("Error downloading tailored resume")
+        return jsonify({"error": "Failed to download tailored resume"}), 500
 
-        # Verify deletion by listing objects again
-        response = s3_client.list_objects_v2(
-            Bucket=os.getenv("AWS_S3_BUCKET"), Prefix=f"{user_id}/"
-        )
-        if "Contents" in response:
-            remaining_files = [obj["Key"] for obj in response["Contents"]]
-            print(f"Remaining files: {remaining_files}")  # Debugging
-            if f"{user_id}/{key}" in remaining_files:
-                raise Exception("File deletion failed.")
+
+@api.route("/delete-tailored-resume", methods=["DELETE"])
+def delete_tailored_resume():
+    user_id = request.headers.get("userId")
+    key = request.args.get("key")
+
+    if not user_id or not key:
+        return jsonify({"error": "User ID and resume key are required"}), 400
+
+    try:
+        # The per-key result of the delete request confirms the deletion
+        _, errors = delete_tailored_resumes(user_id, [key])
+        if errors:
+            raise Exception(f"File deletion failed: {errors[0]['message']}")
 
         return jsonify({"message": "Resume deleted successfully"}), 200
     except Exception as e:
-        print(f"Error deleting tailored resume: {e}")
+        logger.exception("Error deleting tailored resume")
         return jsonify({"error": "Failed to delete tailored resume"}), 500
+
+
+@api.route("/tailored-resumes", methods=["DELETE"])
+def bulk_delete_tailored_resumes():
+    """
+    Delete many tailored resumes at once: {"keys": ["A_Tailored_Resume.docx", ...]}.
+    Keys are sent to S3 in batches of up to 1000 and the response lists which
+    were deleted and which failed.
+    """
+    user_id = request.headers.get("userId")
+    if not user_id:
+        return jsonify({"error": "User ID is required"}), 400
+
+    keys, error = parse_resume_keys(request.get_json(silent=True))
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        deleted, errors = delete_tailored_resumes(user_id, keys)
+        return (
+            jsonify({"deleted": deleted, "errors": errors}),
+            200 if not errors else 207,
+        )
+    except Exception as e:
+        logger.exception("Error deleting tailored resumes")
+        return jsonify({"error": "Failed to delete tailored resumes"}), 500
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe in-process cache with a bound on the number of entries and an
+    optional time-to-live (in seconds) per entry. When `max_bytes` is set,
+    values must be bytes and the total stored size is bounded as well.
+    """
+
+    def __init__(self, max_size=1024, ttl=None, max_bytes=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _size(self, value):
+        return len(value) if self.max_bytes is not None else 0
+
+    def _pop(self, key):
+        value, _ = self._data.pop(key)
+        self.total_bytes -= self._size(value)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (value, expires_at)
+            self.total_bytes += self._size(value)
+            while len(self._data) > self.max_size or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    JSON-serializable values stored one file per key under `directory`, so
+    entries survive restarts and can be shared between worker processes.
+    Keys must be safe to use as file names (e.g. hex digests).
+    """
+
+    def __init__(self, directory, ttl=None):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry["expires_at"] is not None and entry["expires_at"] <= time.time():
+            self.delete(key)
+            return None
+        return entry["value"]
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"expires_at": expires_at, "value": value}, f)
+        os.replace(tmp_path, self._path(key))  # Atomic, so readers never see partial files
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                self.delete(name[: -len(".json")])
+
+
+class CountingCache:
+    """
+    Wraps a cache backend and counts hits and misses.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, is_valid=None):
+        """
+        Return the cached value, or None on a miss. Values rejected by the
+        optional `is_valid` predicate are dropped and counted as misses.
+        """
+        value = self.backend.get(key)
+        if value is not None and is_valid is not None and not is_valid(value):
+            self.backend.delete(key)
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def hash_key(*parts):
+    """
+    Stable SHA-256 hex digest of the given JSON-serializable parts.
+    """
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_text(text):
+    """
+    Case- and whitespace-insensitive form of free text used in cache keys.
+    """
+    return " ".join(text.split()).lower()
+
+
+def create_tailoring_cache():
+    """
+    Build the tailoring cache from the environment:
+    TAILORING_CACHE=memory (default) | disk | none,
+    TAILORING_CACHE_SIZE, TAILORING_CACHE_TTL, TAILORING_CACHE_DIR.
+    """
+    backend = os.getenv("TAILORING_CACHE", "memory").lower()
+    ttl = float(os.getenv("TAILORING_CACHE_TTL", "86400")) or None
+    if backend == "none":
+        return None
+    if backend == "disk":
+        directory = os.getenv("TAILORING_CACHE_DIR", ".cache/tailoring")
+        return CountingCache(DiskCache(directory, ttl=ttl))
+    max_size = int(os.getenv("TAILORING_CACHE_SIZE", "4096"))
+    return CountingCache(LRUCache(max_size=max_size, ttl=ttl))
@@ -0,0 +1,243 @@
+import sys
+from dataclasses import dataclass, field
+from docx import Document
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT, WD_UNDERLINE
+from docx.oxml.ns import qn
+from docx.styles import BabelFish
+
+W_VAL = qn("w:val")
+W_P = qn("w:p")
+W_R = qn("w:r")
+W_HYPERLINK = qn("w:hyperlink")
+R_ID = qn("r:id")
+W_PPR = qn("w:pPr")
+W_PSTYLE = qn("w:pStyle")
+W_JC = qn("w:jc")
+W_RPR = qn("w:rPr")
+W_B = qn("w:b")
+W_I = qn("w:i")
+W_U = qn("w:u")
+W_SZ = qn("w:sz")
+W_RFONTS = qn("w:rFonts")
+W_ASCII = qn("w:ascii")
+W_T = qn("w:t")
+W_TAB = qn("w:tab")
+W_PTAB = qn("w:ptab")
+W_BR = qn("w:br")
+W_CR = qn("w:cr")
+W_TYPE = qn("w:type")
+W_NO_BREAK_HYPHEN = qn("w:noBreakHyphen")
+W_STYLE = qn("w:style")
+W_STYLE_ID = qn("w:styleId")
+W_NAME = qn("w:name")
+W_DEFAULT = qn("w:default")
+
+FALSE_VALUES = ("0", "false", "off")
+
+
+@dataclass(slots=True)
+class RunNode:
+    text: str
+    bold: bool | None = None
+    italic: bool | None = None
+    underline: bool | WD_UNDERLINE | None = None
+    font_name: str | None = None
+    font_size: float | None = None  # Points
+    hyperlink: str | None = None  # Target URL of a run inside a hyperlink
+
+
+@dataclass(slots=True)
+class ParagraphNode:
+    text: str
+    style: str | None
+    alignment: WD_PARAGRAPH_ALIGNMENT | None = None
+    runs: list = field(default_factory=list)
+    # `runs` plus the runs inside hyperlinks, in document order
+    all_runs: list = field(default_factory=list)
+    # Hyperlink paragraphs are not rewritten (see docx_rewrite), so not tailored
+    has_hyperlink: bool = False
+
+
+@dataclass(slots=True)
+class SectionNode:
+    page_width: int  # Twips, like the other measurements
+    page_height: int
+    left_margin: int
+    right_margin: int
+    top_margin: int
+    bottom_margin: int
+    header_distance: int
+    footer_distance: int
+    header_text: str = ""
+    footer_text: str = ""
+
+
+@dataclass(slots=True)
+class DocumentTree:
+    paragraphs: list
+    sections: list
+
+
+def parse_docx(source, include_sections=True):
+    """
+    Parse a .docx (path or file-like object) into a DocumentTree in a single
+    pass over the body XML. Matches what python-docx reports through
+    `doc.paragraphs` and `paragraph.runs`, without building proxy objects
+    for every paragraph, run and font; hyperlink runs, which python-docx
+    leaves out of `runs`, are in `all_runs` with their target. Section
+    layout, headers and footers are skipped when `include_sections` is False.
+    """
+    doc = Document(source)
+    style_names, default_style = _paragraph_style_names(doc)
+    hyperlinks = {
+        rel_id: rel.target_ref for rel_id, rel in doc.part.rels.items() if rel.is_external
+    }
+
+    paragraphs = [
+        _parse_paragraph(p, style_names, default_style, hyperlinks)
+        for p in doc.element.body.iterchildren(W_P)
+    ]
+    sections = _parse_sections(doc) if include_sections else []
+    return DocumentTree(paragraphs=paragraphs, sections=sections)
+
+
+def _paragraph_style_names(doc):
+    names = {}
+    default_style = None
+    for style in doc.styles.element.iterchildren(W_STYLE):
+        if style.get(W_TYPE) != "paragraph":
+            continue
+        name_el = style.find(W_NAME)
+        if name_el is None:
+            continue
+        name = sys.intern(BabelFish.internal2ui(name_el.get(W_VAL)))
+        names[style.get(W_STYLE_ID)] = name
+        if style.get(W_DEFAULT) in ("1", "true", "on"):
+            default_style = name
+    return names, default_style
+
+
+def _parse_paragraph(p, style_names, default_style, hyperlinks):
+    style = default_style
+    alignment = None
+    pPr = p.find(W_PPR)
+    if pPr is not None:
+        pStyle = pPr.find(W_PSTYLE)
+        if pStyle is not None:
+            style = style_names.get(pStyle.get(W_VAL), default_style)
+        jc = pPr.find(W_JC)
+        if jc is not None:
+            alignment = WD_PARAGRAPH_ALIGNMENT.from_xml(jc.get(W_VAL))
+
+    runs = []
+    all_runs = []
+    text_parts = []
+    has_hyperlink = False
+    for child in p:
+        if child.tag == W_R:
+            run = _parse_run(child)
+            runs.append(run)
+            all_runs.append(run)
+            text_parts.append(run.text)
+        elif child.tag == W_HYPERLINK:
+            # Hyperlink text counts towards paragraph text but not `runs`
+            has_hyperlink = True
+            target = hyperlinks.get(child.get(R_ID))
+            for r in child.iterchildren(W_R):
+                run = _parse_run(r)
+                run.hyperlink = target
+                all_runs.append(run)
+                text_parts.append(run.text)
+
+    return ParagraphNode(
+        text="".join(text_parts),
+        style=style,
+        alignment=alignment,
+        runs=runs,
+        all_runs=all_runs,
+        has_hyperlink=has_hyperlink,
+    )
+
+
+def _parse_run(r):
+    run = RunNode(text=run_text(r))
+    rPr = r.find(W_RPR)
+    if rPr is None:
+        return run
+
+    for prop in rPr:
+        tag = prop.tag
+        if tag == W_B:
+            run.bold = prop.get(W_VAL) not in FALSE_VALUES
+        elif tag == W_I:
+            run.italic = prop.get(W_VAL) not in FALSE_VALUES
+        elif tag == W_U:
+            run.underline = _underline(prop.get(W_VAL))
+        elif tag == W_SZ:
+            run.font_size = int(prop.get(W_VAL)) / 2  # Half-points
+        elif tag == W_RFONTS:
+            font_name = prop.get(W_ASCII)
+            run.font_name = sys.intern(font_name) if font_name else None
+    return run
+
+
+def _underline(val):
+    if val is None:
+        return None
+    underline = WD_UNDERLINE.from_xml(val)
+    if underline == WD_UNDERLINE.SINGLE:
+        return True
+    if underline == WD_UNDERLINE.NONE:
+        return False
+    return underline
+
+
+def run_text(r):
+    parts = []
+    for child in r:
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or "")
+        elif tag == W_TAB or tag == W_PTAB:
+            parts.append("\t")
+        elif tag == W_BR:
+            # Page and column breaks have no text equivalent
+            if child.get(W_TYPE) in (None, "textWrapping"):
+                parts.append("\n")
+        elif tag == W_CR:
+            parts.append("\n")
+        elif tag == W_NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def _parse_sections(doc):
+    sections = []
+    header_text = footer_text = ""
+    for section in doc.sections:
+        # A linked header/footer is the previous section's one. Reading it
+        # through python-docx would walk back through every earlier section.
+        if not section.header.is_linked_to_previous:
+            header_text = _first_paragraph_text(section.header)
+        if not section.footer.is_linked_to_previous:
+            footer_text = _first_paragraph_text(section.footer)
+        sections.append(
+            SectionNode(
+                page_width=section.page_width.twips,
+                page_height=section.page_height.twips,
+                left_margin=section.left_margin.twips,
+                right_margin=section.right_margin.twips,
+                top_margin=section.top_margin.twips,
+                bottom_margin=section.bottom_margin.twips,
+                header_distance=section.header_distance.twips,
+                footer_distance=section.footer_distance.twips,
+                header_text=header_text,
+                footer_text=footer_text,
+            )
+        )
+    return sections
+
+
+def _first_paragraph_text(header_or_footer):
+    paragraphs = header_or_footer.paragraphs
+    return paragraphs[0].text if paragraphs else ""
@@ -0,0 +1,139 @@
+import re
+import copy
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from app.utils.docx_extract import W_BR, W_HYPERLINK, W_P, W_R, W_RPR, W_TYPE, run_text
+
+# Run children that carry text (see docx_extract.run_text)
+TEXT_TAGS = frozenset(
+    qn(tag) for tag in ("w:t", "w:tab", "w:ptab", "w:br", "w:cr", "w:noBreakHyphen")
+)
+
+
+def apply_paragraph_edits(doc, edits):
+    """
+    Replace the text of body paragraphs in place. `edits` maps paragraph
+    indices (as in `doc.paragraphs` and docx_extract.parse_docx) to new text.
+    Paragraph properties (style, numbering, spacing) and sections, headers and
+    footers are left untouched. Returns the number of paragraphs rewritten.
+    """
+    return rewrite_body(doc.element.body, edits)
+
+
+def rewrite_body(body, edits):
+    """
+    Same as `apply_paragraph_edits`, for a `w:body` element.
+    """
+    if not edits:
+        return 0
+
+    rewritten = 0
+    for idx, p in enumerate(body.iterchildren(W_P)):
+        text = edits.get(idx)
+        if text is not None and rewrite_paragraph(p, text):
+            rewritten += 1
+    return rewritten
+
+
+def rewrite_paragraph(p, text):
+    """
+    Set the text of a `w:p` element while keeping run formatting.
+    Leading and trailing runs whose text is unchanged (e.g. a bold "Skills:"
+    label) are kept as they are; the changed middle goes into the first
+    changed run, which keeps its formatting, and the other changed runs are
+    emptied. Paragraphs containing hyperlinks are skipped (nlp_utils does not
+    send them for tailoring either). Returns True when
+    the paragraph was rewritten.
+    """
+    if p.find(W_HYPERLINK) is not None:
+        return False
+
+    runs = [r for r in p.iterchildren(W_R) if _has_text(r)]
+    if not runs:
+        if not text:
+            return False
+        p.append(_new_run(text, template=p.find(W_R)))
+        return True
+
+    texts = [run_text(r) for r in runs]
+    if "".join(texts) == text:
+        return False
+
+    # Unchanged runs at the start...
+    start, prefix = 0, 0
+    while start < len(runs) and text.startswith(texts[start], prefix):
+        prefix += len(texts[start])
+        start += 1
+    # ...and at the end, without overlapping the prefix
+    end, suffix = len(runs), len(text)
+    while end > start and text.endswith(texts[end - 1], prefix, suffix):
+        suffix -= len(texts[end - 1])
+        end -= 1
+
+    middle = text[prefix:suffix]
+    if start == end:
+        # Only new text between unchanged runs: add it styled like its neighbour
+        if middle:
+            anchor = runs[start - 1] if start > 0 else runs[0]
+            new_run = _new_run(middle, template=anchor)
+            if start > 0:
+                anchor.addnext(new_run)
+            else:
+                anchor.addprevious(new_run)
+        return True
+
+    _set_text(runs[start], middle)
+    for r in runs[start + 1 : end]:
+        _clear_text(r)
+    return True
+
+
+def _is_text(child):
+    if child.tag == W_BR:
+        # Page and column breaks are layout, not text, and must survive edits
+        return child.get(W_TYPE) in (None, "textWrapping")
+    return child.tag in TEXT_TAGS
+
+
+def _has_text(r):
+    return any(_is_text(child) for child in r)
+
+
+def _clear_text(r):
+    for child in list(r):
+        if _is_text(child):
+            r.remove(child)
+
+
+def _set_text(r, text):
+    """
+    Replace the text of a run, leaving any non-text content (e.g. drawings)
+    and its properties alone. Tabs and newlines become `w:tab` and `w:br`.
+    """
+    _clear_text(r)
+    for piece in re.split(r"([\t\n])", text):
+        if piece == "\t":
+            r.append(OxmlElement("w:tab"))
+        elif piece == "\n":
+            r.append(OxmlElement("w:br"))
+        elif piece:
+            t = OxmlElement("w:t")
+            t.text = piece
+            if piece != piece.strip():
+                t.set(qn("xml:space"), "preserve")
+            r.append(t)
+
+
+def _new_run(text, template=None):
+    """
+    New `w:r` holding `text`, with the run properties of `template` if given.
+    """
+    if template is None:
+        r = OxmlElement("w:r")
+    else:
+        r = copy.deepcopy(template)
+        for child in list(r):
+            if child.tag != W_RPR:
+                r.remove(child)
+    _set_text(r, text)
+    return r
@@ -0,0 +1,157 @@
+import os
+import copy
+import hashlib
+import zipfile
+import threading
+from io import BytesIO
+from xml.sax.saxutils import escape
+from lxml import etree
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from app.utils.cache_utils import LRUCache
+from app.utils.docx_rewrite import rewrite_body
+
+W_BODY = qn("w:body")
+W_SECTPR = qn("w:sectPr")
+
+PACKAGE_RELS_PART = "_rels/.rels"
+OFFICE_DOCUMENT_REL = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+)
+RELATIONSHIP_TAG = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+
+# Parsed master resumes by content digest
+template_cache = LRUCache(max_size=int(os.getenv("DOCX_TEMPLATE_CACHE_SIZE", "64")))
+
+_blank_template = None
+_blank_template_lock = threading.Lock()
+
+
+class DocxTemplate:
+    """
+    A .docx unzipped and parsed once and kept in memory. Each `render` clones
+    the main document part, changes the clone and appends it to an archive of
+    the other parts that was compressed once up front, so only one XML part
+    is serialized and compressed per document, and styles, numbering,
+    headers, footers and media are never parsed at all. Safe to share
+    between threads: the template itself is never modified.
+    """
+
+    def __init__(self, docx_bytes):
+        with zipfile.ZipFile(BytesIO(docx_bytes)) as archive:
+            infos = archive.infolist()
+            parts = {info.filename: archive.read(info) for info in infos}
+        self.document_part = _find_document_part(parts)
+        self._document = parse_xml(parts[self.document_part])
+        self._document_info = next(i for i in infos if i.filename == self.document_part)
+
+        base = BytesIO()
+        with zipfile.ZipFile(base, "w", zipfile.ZIP_DEFLATED) as archive:
+            for info in infos:
+                if info.filename != self.document_part:
+                    archive.writestr(_entry(info), parts[info.filename])
+        self._base = base.getvalue()
+
+    def render(self, output_file, edits=None, paragraphs=None):
+        """
+        Write a copy of the template to `output_file` (a path or binary
+        file-like object) with body paragraph `edits` ({paragraph index: new
+        text}, see docx_rewrite) applied and the `paragraphs` texts appended.
+        """
+        document = copy.deepcopy(self._document)
+        body = document.find(W_BODY)
+        if edits:
+            rewrite_body(body, edits)
+        if paragraphs:
+            append_paragraphs(body, paragraphs)
+
+        # Every render writes into its own copy of the shared archive
+        buffer = BytesIO(self._base)
+        with zipfile.ZipFile(buffer, "a", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(_entry(self._document_info), _serialize(document))
+
+        if hasattr(output_file, "write"):
+            output_file.write(buffer.getvalue())
+        else:
+            with open(output_file, "wb") as f:
+                f.write(buffer.getvalue())
+
+
+def _find_document_part(parts):
+    rels = parse_xml(parts[PACKAGE_RELS_PART])
+    for rel in rels.iter(RELATIONSHIP_TAG):
+        if rel.get("Type") == OFFICE_DOCUMENT_REL:
+            return rel.get("Target").lstrip("/")
+    return "word/document.xml"
+
+
+def _entry(info):
+    # writestr fills in offsets and sizes, so a ZipInfo is never reused
+    entry = zipfile.ZipInfo(info.filename, info.date_time)
+    entry.compress_type = zipfile.ZIP_DEFLATED
+    entry.external_attr = info.external_attr
+    return entry
+
+
+def _serialize(element):
+    return etree.tostring(element, encoding="UTF-8", xml_declaration=True, standalone=True)
+
+
+def _run_xml(text):
+    pieces = []
+    for line_no, line in enumerate(text.split("\n")):
+        if line_no:
+            pieces.append("<w:br/>")
+        for tab_no, piece in enumerate(line.split("\t")):
+            if tab_no:
+                pieces.append("<w:tab/>")
+            if piece:
+                pieces.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+    return f"<w:r>{''.join(pieces)}</w:r>"
+
+
+def append_paragraphs(body, texts):
+    """
+    Add a paragraph per text at the end of `body`, before its section
+    properties. The XML for all of them is built as one string and parsed
+    in a single call rather than element by element.
+    """
+    fragment = parse_xml(
+        f"<w:body {nsdecls('w')}>"
+        + "".join(f"<w:p>{_run_xml(text)}</w:p>" for text in texts)
+        + "</w:body>"
+    )
+    sect_pr = body.find(W_SECTPR)
+    for p in list(fragment):
+        if sect_pr is not None:
+            sect_pr.addprevious(p)
+        else:
+            body.append(p)
+
+
+def get_docx_template(docx_bytes):
+    """
+    The parsed template for a .docx, from cache while its bytes are unchanged.
+    """
+    key = hashlib.sha256(docx_bytes).hexdigest()
+    template = template_cache.get(key)
+    if template is None:
+        template = DocxTemplate(docx_bytes)
+        template_cache.set(key, template)
+    return template
+
+
+def blank_template():
+    """
+    python-docx's default document, parsed once.
+    """
+    global _blank_template
+    if _blank_template is None:
+        with _blank_template_lock:
+            if _blank_template is None:
+                from docx import Document
+
+                buffer = BytesIO()
+                Document().save(buffer)
+                _blank_template = DocxTemplate(buffer.getvalue())
+    return _blank_template
@@ -1,18 +1,17 @@
-from docx import Document
+from docx.shared import Pt
+from app.utils.docx_extract import parse_docx
 
 
 def extract_text_with_formatting(docx_path: str) -> str:
     """
     Extract text and formatting (font size, bold, etc.) from a Word document (.docx).
     """
-    doc = Document(docx_path)
-    formatted_text = ""
+    tree = parse_docx(docx_path, include_sections=False)
+    lines = []
 
-    for para in doc.paragraphs:
+    for para in tree.paragraphs:
         for run in para.runs:  # Each run is a piece of text with a consistent style
-            font_size = run.font.size
-            text = run.text
-            is_bold = run.bold
-            formatted_text += f"[Font Size: {font_size}, Bold: {is_bold}] {text}\n"
+            font_size = Pt(run.font_size) if run.font_size else None
+            lines.append(f"[Font Size: {font_size}, Bold: {run.bold}] {run.text}\n")
 
-    return formatted_text
+    return "".join(lines)
@@ -1,6 +1,10 @@
 import os
 import logging
 
+DOCX_MIMETYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+# Zip local file header; every .docx starts with it
+DOCX_SIGNATURE = b"PK\x03\x04"
+
 
 def save_file(file, folder="static/uploads", filename="master_resume.docx"):
     """
@@ -16,22 +20,19 @@ def save_file(file, folder="static/uploads", filename="master_resume.docx"):
     return filepath
 
 
-logging.basicConfig(level=logging.DEBUG)
-
-
 def extract_docx_structure(file_path):
     """
     Extract text and formatting from a .docx file.
     """
-    from docx import Document
+    from app.utils.docx_extract import parse_docx
 
-    doc = Document(file_path)
+    tree = parse_docx(file_path, include_sections=False)
     content = []
 
-    for para in doc.paragraphs:
+    for para in tree.paragraphs:
         if not para.runs:  # Skip paragraphs with no runs
             content.append(
-                {"text": para.text, "style": para.style.name}
+                {"text": para.text, "style": para.style}
             )  # Basic info for empty runs
             continue
 
@@ -39,14 +40,12 @@ def extract_docx_structure(file_path):
             content.append(
                 {
                     "text": run.text,  # Use run text instead of paragraph text for finer granularity
-                    "style": para.style.name,
-                    "font_name": run.font.name if run.font and run.font.name else None,
-                    "font_size": run.font.size.pt
-                    if run.font and run.font.size
-                    else None,
-                    "bold": run.bold if run else False,
-                    "italic": run.italic if run else False,
-                    "underline": run.underline if run else False,
+                    "style": para.style,
+                    "font_name": run.font_name,
+                    "font_size": run.font_size,
+                    "bold": run.bold,
+                    "italic": run.italic,
+                    "underline": run.underline,
                 }
             )
 
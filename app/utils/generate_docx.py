@@ -1,25 +1,20 @@
-from docx import Document
-import os
+from io import BytesIO
+from app.utils.docx_template import blank_template
 
 
-def generate_docx(tailored_resume: str, output_folder="static/uploads"):
+def generate_docx(tailored_resume: str, output_file=None):
     """
-    Generates a .docx file from the tailored resume text.
+    Generates a .docx from the tailored resume text, one paragraph per line,
+    into `output_file` (a path or binary file-like object). By default each
+    call gets its own in-memory buffer, so concurrent calls never share an
+    output file. Returns `output_file` (the buffer, rewound).
     """
-    # Ensure the output folder exists
-    os.makedirs(output_folder, exist_ok=True)
+    if output_file is None:
+        output_file = BytesIO()
 
-    # Define the filename for the Word document
-    filename = f"Tailored_Resume.docx"
-    file_path = os.path.join(output_folder, filename)
+    # Clone the default template, parsed once, instead of calling Document()
+    blank_template().render(output_file, paragraphs=tailored_resume.split("\n"))
 
-    # Create a new Word document
-    doc = Document()
-
-    # Add the tailored resume content to the document
-    doc.add_paragraph(tailored_resume)
-
-    # Save the document
-    doc.save(file_path)
-
-    return file_path  # Return the file path to the generated .docx file
+    if hasattr(output_file, "seek"):
+        output_file.seek(0)
+    return output_file
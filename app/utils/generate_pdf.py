@@ -0,0 +1,256 @@
+import os
+import asyncio
+import hashlib
+import threading
+import multiprocessing
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape, quoteattr
+from app.utils.cache_utils import CountingCache, LRUCache, hash_key
+from app.utils.tracing import span
+
+PDF_MIMETYPE = "application/pdf"
+
+# Bump whenever the layout changes so cached PDFs are not reused.
+RENDER_VERSION = 2
+
+TWIPS_PER_POINT = 20
+
+# Render processes per server process unless PDF_RENDER_WORKERS says
+# otherwise. Every gunicorn worker has its own pool, so this stays small.
+DEFAULT_PDF_WORKERS = 2
+
+# US Letter with one-inch margins, in twips, for documents without sections
+DEFAULT_PAGE = (12240, 15840, 1440)
+
+# Rendered PDFs keyed by a hash of the .docx they were rendered from
+pdf_cache = CountingCache(
+    LRUCache(
+        max_size=int(os.getenv("PDF_CACHE_SIZE", "256")),
+        max_bytes=int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    )
+)
+
+_pdf_pool = None
+_pdf_pool_pid = None
+_pdf_pool_lock = threading.Lock()
+
+# Paragraph styles by .docx style name, built once per process
+_styles = None
+
+
+def load_styles():
+    """
+    Build the paragraph styles and load the font metrics they use.
+    """
+    global _styles
+    if _styles is None:
+        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        normal = ParagraphStyle(
+            "Normal",
+            parent=getSampleStyleSheet()["Normal"],
+            fontName="Helvetica",
+            fontSize=10.5,
+            leading=13,
+            spaceAfter=2,
+        )
+        heading = ParagraphStyle(
+            "Heading", parent=normal, fontName="Helvetica-Bold", spaceBefore=8, spaceAfter=3
+        )
+        _styles = {
+            "Normal": normal,
+            "Title": ParagraphStyle(
+                "Title", parent=heading, fontSize=20, leading=24, spaceBefore=0
+            ),
+            "Heading 1": ParagraphStyle("Heading 1", parent=heading, fontSize=14, leading=17),
+            "Heading 2": ParagraphStyle("Heading 2", parent=heading, fontSize=12, leading=15),
+            "Heading 3": ParagraphStyle("Heading 3", parent=heading, fontSize=11, leading=14),
+            "List Bullet": ParagraphStyle(
+                "List Bullet", parent=normal, leftIndent=14, bulletIndent=4
+            ),
+        }
+        # Standard font metrics are read from disk on first use
+        for font in ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique"):
+            stringWidth("x", font, 10)
+    return _styles
+
+
+def _paragraph_style(styles, style_name, alignment):
+    from reportlab.lib.styles import ParagraphStyle
+
+    name = style_name or "Normal"
+    if name not in styles:
+        if name.startswith("Heading"):
+            name = "Heading 2"
+        elif name.startswith("List"):
+            name = "List Bullet"
+        else:
+            name = "Normal"
+    if alignment is None:
+        return styles[name]
+
+    # Left, center and right share values with reportlab; every other
+    # WD_PARAGRAPH_ALIGNMENT is a kind of justification (TA_JUSTIFY is 4)
+    value = int(alignment) if int(alignment) <= 2 else 4
+    key = (name, value)
+    if key not in styles:
+        styles[key] = ParagraphStyle(f"{name} {value}", parent=styles[name], alignment=value)
+    return styles[key]
+
+
+def _run_markup(run):
+    text = escape(run.text).replace("\t", "    ").replace("\n", "<br/>")
+    if not text:
+        return ""
+    if run.font_size:
+        text = f'<font size="{run.font_size:g}">{text}</font>'
+    if run.underline:
+        text = f"<u>{text}</u>"
+    if run.italic:
+        text = f"<i>{text}</i>"
+    if run.bold:
+        text = f"<b>{text}</b>"
+    if run.hyperlink:
+        text = f"<link href={quoteattr(run.hyperlink)}>{text}</link>"
+    return text
+
+
+def render_pdf(docx_bytes):
+    """
+    Render a .docx to PDF bytes from its parsed structure: paragraph styles,
+    alignment, bold/italic/underline runs, hyperlinks, font sizes, page size,
+    margins and the first header and footer line. Fonts are mapped to Helvetica, since
+    the document's own fonts are not available to embed.
+    """
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+    from app.utils.docx_extract import parse_docx
+
+    styles = load_styles()
+    tree = parse_docx(BytesIO(docx_bytes))
+
+    flowables = []
+    for para in tree.paragraphs:
+        style = _paragraph_style(styles, para.style, para.alignment)
+        markup = "".join(_run_markup(run) for run in para.all_runs)
+        if not markup.strip():
+            flowables.append(Spacer(1, style.leading / 2))
+            continue
+        bullet = "•" if style.name.startswith("List Bullet") else None
+        flowables.append(Paragraph(markup, style, bulletText=bullet))
+
+    if tree.sections:
+        section = tree.sections[0]
+        page_width, page_height = section.page_width, section.page_height
+        margins = (
+            section.left_margin,
+            section.right_margin,
+            section.top_margin,
+            section.bottom_margin,
+        )
+        header_text, footer_text = section.header_text, section.footer_text
+        header_y = page_height - section.header_distance
+        footer_y = section.footer_distance
+    else:
+        page_width, page_height, margin = DEFAULT_PAGE
+        margins = (margin,) * 4
+        header_text = footer_text = ""
+        header_y, footer_y = page_height - margin / 2, margin / 2
+    left, right, top, bottom = (value / TWIPS_PER_POINT for value in margins)
+
+    def draw_header_footer(canvas, doc):
+        canvas.saveState()
+        canvas.setFont("Helvetica", 9)
+        if header_text:
+            canvas.drawString(left, header_y / TWIPS_PER_POINT - 9, header_text)
+        if footer_text:
+            canvas.drawString(left, footer_y / TWIPS_PER_POINT, footer_text)
+        canvas.restoreState()
+
+    buffer = BytesIO()
+    SimpleDocTemplate(
+        buffer,
+        pagesize=(page_width / TWIPS_PER_POINT, page_height / TWIPS_PER_POINT),
+        leftMargin=left,
+        rightMargin=right,
+        topMargin=top,
+        bottomMargin=bottom,
+        # No timestamps or random IDs, so the same document renders identically
+        invariant=True,
+    ).build(
+        flowables or [Spacer(1, 1)],
+        onFirstPage=draw_header_footer,
+        onLaterPages=draw_header_footer,
+    )
+    return buffer.getvalue()
+
+
+def init_worker():
+    """
+    Load everything a render needs, so a worker's first render is not slower.
+    """
+    from app.utils.docx_extract import parse_docx  # noqa: F401
+
+    load_styles()
+
+
+def get_pdf_workers():
+    default = min(DEFAULT_PDF_WORKERS, os.cpu_count() or 1)
+    return max(1, int(os.getenv("PDF_RENDER_WORKERS", str(default))))
+
+
+def get_pdf_pool():
+    """
+    Return the process pool that renders PDFs, creating it on the first
+    render and again after a fork, so server processes that never render a
+    PDF never start one. Layout is CPU-bound, so threads would serialize on
+    the GIL. Workers are spawned rather than forked (forking a process with
+    running threads can deadlock) and all start with the pool, each loading
+    python-docx, reportlab, fonts and styles before taking work.
+    """
+    global _pdf_pool, _pdf_pool_pid
+    if _pdf_pool is None or _pdf_pool_pid != os.getpid():
+        with _pdf_pool_lock:
+            if _pdf_pool is None or _pdf_pool_pid != os.getpid():
+                workers = get_pdf_workers()
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker,
+                )
+                for _ in range(workers):
+                    _pdf_pool.submit(os.getpid)
+                _pdf_pool_pid = os.getpid()
+    return _pdf_pool
+
+
+def pdf_cache_key(docx_bytes):
+    return hash_key("pdf", RENDER_VERSION, hashlib.sha256(docx_bytes).hexdigest())
+
+
+def docx_to_pdf(docx_bytes):
+    """
+    Return the PDF rendering of a .docx, from cache when the same document
+    was rendered before, otherwise rendered on the process pool.
+    """
+    key = pdf_cache_key(docx_bytes)
+    pdf = pdf_cache.get(key)
+    if pdf is None:
+        with span("pdf_render"):
+            pdf = get_pdf_pool().submit(render_pdf, docx_bytes).result()
+        pdf_cache.set(key, pdf)
+    return pdf
+
+
+async def adocx_to_pdf(docx_bytes):
+    """
+    Async version of `docx_to_pdf`; the event loop is free while rendering.
+    """
+    key = pdf_cache_key(docx_bytes)
+    pdf = pdf_cache.get(key)
+    if pdf is None:
+        with span("pdf_render"):
+            pdf = await asyncio.wrap_future(get_pdf_pool().submit(render_pdf, docx_bytes))
+        pdf_cache.set(key, pdf)
+    return pdf
@@ -0,0 +1,310 @@
+import os
+import re
+import asyncio
+import logging
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.utils.file_utils import DOCX_MIMETYPE
+from app.utils.generate_pdf import PDF_MIMETYPE, adocx_to_pdf, docx_to_pdf
+from app.utils.llm_scheduler import BATCH, set_llm_user
+from app.utils.nlp_utils import (
+    agenerate_tailored_resume,
+    generate_tailored_resume,
+    group_paragraphs,
+    load_master_resume,
+)
+from app.utils.tracing import span, submit_with_context
+from app.utils.s3_utils import (
+    get_s3_client,
+    download_fileobj_from_s3,
+    get_presigned_url,
+    run_s3,
+    upload_fileobj_to_s3,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Output formats of a tailored resume and their content types
+OUTPUT_FORMATS = {"docx": DOCX_MIMETYPE, "pdf": PDF_MIMETYPE}
+
+
+class GenerationError(Exception):
+    """
+    Expected generation failure whose message is safe to show to the user.
+    """
+
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def tailored_prefix(user_id):
+    """
+    Tailored resumes live under their own prefix so they can be listed
+    without also listing (and filtering out) the master resume.
+    """
+    return f"{user_id}/tailored/"
+
+
+def tailored_resume_key(user_id, job_title, output_format="docx"):
+    sanitized_job_title = re.sub(r"[^\w\s-]", "", job_title).replace(" ", "_")
+    return f"{tailored_prefix(user_id)}{sanitized_job_title}_Tailored_Resume.{output_format}"
+
+
+def get_batch_concurrency():
+    return max(1, int(os.getenv("BATCH_MAX_CONCURRENCY", "4")))
+
+
+def load_user_master_resume(user_id):
+    """
+    Return (docx bytes, content) for the user's master resume, from cache
+    while its ETag is unchanged.
+    """
+    s3_client = get_s3_client()
+
+    # Find the master resume in the master_resume folder
+    with span("s3_list"):
+        response = s3_client.list_objects_v2(
+            Bucket=os.getenv("AWS_S3_BUCKET"), Prefix=f"{user_id}/master_resume/"
+        )
+    if "Contents" not in response or not response["Contents"]:
+        raise GenerationError("No master resume found", 404)
+
+    # Get the first file in the master_resume folder, from cache when unchanged
+    master_file = response["Contents"][0]
+    master_resume = load_master_resume(
+        user_id,
+        master_file["ETag"],
+        lambda: download_fileobj_from_s3(os.getenv("AWS_S3_BUCKET"), master_file["Key"]),
+    )
+    if master_resume is None:
+        raise GenerationError("Failed to download master resume")
+    master_bytes, content, _ = master_resume
+    return master_bytes, content
+
+
+def tailor_and_upload(
+    user_id,
+    master_bytes,
+    content,
+    job_title,
+    job_description,
+    on_progress=None,
+    paragraph_groups=None,
+    output_format="docx",
+):
+    """
+    Tailor an already loaded master resume to one job, upload the result to S3
+    (as a .docx, or rendered to PDF for `output_format="pdf"`) and return the
+    response payload with a pre-signed download URL.
+    """
+    # Generate the tailored resume into an in-memory buffer
+    tailored_file = BytesIO()
+    token_usage = generate_tailored_resume(
+        master_bytes,
+        content,
+        job_title,
+        job_description,
+        tailored_file,
+        on_progress,
+        paragraph_groups=paragraph_groups,
+    )
+    if output_format == "pdf":
+        tailored_file = BytesIO(docx_to_pdf(tailored_file.getvalue()))
+    return upload_tailored_resume(
+        user_id, job_title, tailored_file, token_usage, output_format
+    )
+
+
+def upload_tailored_resume(user_id, job_title, tailored_file, token_usage, output_format="docx"):
+    s3_key_tailored = tailored_resume_key(user_id, job_title, output_format)
+    tailored_file.seek(0)
+
+    # Upload the tailored resume back to S3
+    with span("s3_upload"):
+        s3_url = upload_fileobj_to_s3(
+            tailored_file,
+            os.getenv("AWS_S3_BUCKET"),
+            s3_key_tailored,
+            content_type=OUTPUT_FORMATS[output_format],
+        )
+    if not s3_url:
+        raise GenerationError("Failed to upload to S3")
+
+    # Generate a pre-signed URL for the tailored resume
+    with span("presign"):
+        tailored_resume_url = get_presigned_url(
+            os.getenv("AWS_S3_BUCKET"), s3_key_tailored, expires_in=3600
+        )
+
+    logger.debug("Tailored resume for user %s: %s", user_id, token_usage)
+    return {
+        "message": "Resume tailored successfully",
+        "resumeUrl": tailored_resume_url,
+        "format": output_format,
+        "tokenUsage": token_usage,
+    }
+
+
+def generate_resume_for_user(
+    user_id, job_title, job_description, on_progress=None, output_format="docx"
+):
+    """
+    Tailor the user's master resume to a job, upload the result to S3 and
+    return the response payload with a pre-signed download URL.
+    `on_progress(completed, total)` is called as resume chunks are tailored.
+    """
+    set_llm_user(user_id)
+    master_bytes, content = load_user_master_resume(user_id)
+    return tailor_and_upload(
+        user_id,
+        master_bytes,
+        content,
+        job_title,
+        job_description,
+        on_progress,
+        output_format=output_format,
+    )
+
+
+def generate_resumes_for_user(user_id, jobs, max_workers=None):
+    """
+    Tailor the user's master resume to many jobs at once. The master resume is
+    listed, downloaded, parsed and chunked once up front (raising
+    GenerationError if that fails); the jobs then run on a bounded thread
+    pool, each uploading its own result. Returns an iterator of per-job
+    results in completion order, each with the job's `index` in `jobs`.
+    Batch LLM calls yield to single generations waiting in the scheduler.
+    """
+    master_bytes, content = load_user_master_resume(user_id)
+    paragraph_groups = list(group_paragraphs(content))
+    max_workers = min(max_workers or get_batch_concurrency(), max(len(jobs), 1))
+
+    def results():
+        # Jobs are submitted with this context, so their LLM calls inherit it
+        set_llm_user(user_id, BATCH)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                submit_with_context(
+                    executor,
+                    tailor_and_upload,
+                    user_id,
+                    master_bytes,
+                    content,
+                    job["jobTitle"],
+                    job["jobDescription"],
+                    paragraph_groups=paragraph_groups,
+                    output_format=job.get("format", "docx"),
+                ): idx
+                for idx, job in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                error = future.exception()
+                result = future.result() if error is None else None
+                yield _batch_result(user_id, jobs, futures[future], result, error)
+
+    return results()
+
+
+def _batch_result(user_id, jobs, idx, result=None, error=None):
+    entry = {"index": idx, "jobTitle": jobs[idx]["jobTitle"]}
+    if error is None:
+        entry.update(status="succeeded", result=result)
+    elif isinstance(error, GenerationError):
+        entry.update(status="failed", error=str(error))
+    else:
+        logger.error(
+            "Error tailoring batch job %s for user %s", idx, user_id, exc_info=error
+        )
+        entry.update(status="failed", error="Failed to generate tailored resume")
+    return entry
+
+
+async def atailor_and_upload(
+    user_id,
+    master_bytes,
+    content,
+    job_title,
+    job_description,
+    on_progress=None,
+    paragraph_groups=None,
+    output_format="docx",
+):
+    """
+    Async version of `tailor_and_upload`: LLM calls run on the event loop,
+    S3 calls on the S3 thread pool and PDF rendering on the render pool.
+    """
+    tailored_file = BytesIO()
+    token_usage = await agenerate_tailored_resume(
+        master_bytes,
+        content,
+        job_title,
+        job_description,
+        tailored_file,
+        on_progress,
+        paragraph_groups=paragraph_groups,
+    )
+    if output_format == "pdf":
+        tailored_file = BytesIO(await adocx_to_pdf(tailored_file.getvalue()))
+    return await run_s3(
+        upload_tailored_resume, user_id, job_title, tailored_file, token_usage, output_format
+    )
+
+
+async def agenerate_resume_for_user(
+    user_id, job_title, job_description, on_progress=None, output_format="docx"
+):
+    """
+    Async version of `generate_resume_for_user`.
+    """
+    set_llm_user(user_id)
+    master_bytes, content = await run_s3(load_user_master_resume, user_id)
+    return await atailor_and_upload(
+        user_id,
+        master_bytes,
+        content,
+        job_title,
+        job_description,
+        on_progress,
+        output_format=output_format,
+    )
+
+
+async def agenerate_resumes_for_user(user_id, jobs, max_workers=None):
+    """
+    Async version of `generate_resumes_for_user`, returning an async iterator
+    of per-job results in completion order.
+    """
+    master_bytes, content = await run_s3(load_user_master_resume, user_id)
+    paragraph_groups = list(group_paragraphs(content))
+    semaphore = asyncio.Semaphore(max_workers or get_batch_concurrency())
+
+    async def run(idx, job):
+        async with semaphore:
+            try:
+                result = await atailor_and_upload(
+                    user_id,
+                    master_bytes,
+                    content,
+                    job["jobTitle"],
+                    job["jobDescription"],
+                    paragraph_groups=paragraph_groups,
+                    output_format=job.get("format", "docx"),
+                )
+            except Exception as e:
+                return _batch_result(user_id, jobs, idx, error=e)
+            return _batch_result(user_id, jobs, idx, result)
+
+    async def results():
+        # Tasks copy the context they are created in
+        set_llm_user(user_id, BATCH)
+        tasks = [asyncio.create_task(run(idx, job)) for idx, job in enumerate(jobs)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return results()
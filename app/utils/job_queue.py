@@ -0,0 +1,179 @@
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.tracing import submit_with_context
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Job:
+    """
+    State of one background job. Every update bumps `version` and wakes up
+    anyone waiting in `wait_for_change`.
+    """
+
+    def __init__(self, job_id, user_id):
+        self.id = job_id
+        self.user_id = user_id
+        self.status = QUEUED
+        self.completed = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.version = 0
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def update(self, **changes):
+        with self._condition:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            if self.finished and self.finished_at is None:
+                self.finished_at = time.time()
+            self.version += 1
+            self._condition.notify_all()
+
+    def set_progress(self, completed, total):
+        self.update(completed=completed, total=total)
+
+    def wait_for_change(self, version, timeout=None):
+        """
+        Block until the job's version differs from `version` or the timeout
+        expires. Returns the current version.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def to_dict(self):
+        with self._condition:
+            return {
+                "jobId": self.id,
+                "status": self.status,
+                "progress": {"completed": self.completed, "total": self.total},
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobQueue:
+    """
+    In-process job queue backed by a thread pool, or by the event loop for
+    coroutine functions (see `submit_async`).
+    Identical in-flight submissions (same `dedupe_key`) share a single job.
+    Finished jobs are kept for `result_ttl` seconds so their status can be
+    polled. Job state lives in the process that accepted the job, so status
+    requests must reach the same process (single worker with threads, or
+    sticky sessions).
+    """
+
+    def __init__(self, max_workers=4, result_ttl=3600, user_errors=()):
+        self.result_ttl = result_ttl
+        # Exceptions whose message is reported to the user; others are generic
+        self.user_errors = user_errors
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job"
+        )
+        self._jobs = {}
+        self._in_flight = {}
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    def submit(self, user_id, dedupe_key, func, *args, **kwargs):
+        """
+        Run `func(*args, on_progress=..., **kwargs)` in the background and
+        return its Job, or the already running Job for the same `dedupe_key`.
+        """
+        job, created = self._register(user_id, dedupe_key)
+        if created:
+            # Run in the submitter's context so the job's spans keep its request ID
+            submit_with_context(
+                self._executor, self._run, job, dedupe_key, func, args, kwargs
+            )
+        return job
+
+    def submit_async(self, user_id, dedupe_key, func, *args, **kwargs):
+        """
+        Same as `submit` for a coroutine function, run as a task on the
+        current event loop instead of the thread pool. Jobs submitted either
+        way share ids, dedupe and status tracking.
+        """
+        job, created = self._register(user_id, dedupe_key)
+        if created:
+            task = asyncio.get_running_loop().create_task(
+                self._run_async(job, dedupe_key, func, args, kwargs)
+            )
+            # The loop only keeps weak references to tasks
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return job
+
+    def _register(self, user_id, dedupe_key):
+        with self._lock:
+            self._prune()
+            job_id = self._in_flight.get(dedupe_key)
+            if job_id is not None:
+                return self._jobs[job_id], False
+
+            job = Job(uuid.uuid4().hex, user_id)
+            self._jobs[job.id] = job
+            self._in_flight[dedupe_key] = job.id
+            return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, dedupe_key, func, args, kwargs):
+        job.update(status=RUNNING)
+        try:
+            result = func(*args, on_progress=job.set_progress, **kwargs)
+            job.update(status=SUCCEEDED, result=result)
+        except Exception as e:
+            self._fail(job, e)
+        finally:
+            self._done(dedupe_key)
+
+    async def _run_async(self, job, dedupe_key, func, args, kwargs):
+        job.update(status=RUNNING)
+        try:
+            result = await func(*args, on_progress=job.set_progress, **kwargs)
+            job.update(status=SUCCEEDED, result=result)
+        except Exception as e:
+            self._fail(job, e)
+        finally:
+            self._done(dedupe_key)
+
+    def _fail(self, job, error):
+        if isinstance(error, self.user_errors):
+            job.update(status=FAILED, error=str(error))
+        else:
+            logger.error("Error running job %s", job.id, exc_info=error)
+            job.update(status=FAILED, error="Job failed")
+
+    def _done(self, dedupe_key):
+        with self._lock:
+            self._in_flight.pop(dedupe_key, None)
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
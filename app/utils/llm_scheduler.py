@@ -0,0 +1,435 @@
+import os
+import re
+import time
+import asyncio
+import sqlite3
+import logging
+import tempfile
+import itertools
+import threading
+import contextvars
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from app.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Lower values are dispatched first
+INTERACTIVE = 0
+BATCH = 1
+
+# Who the LLM calls made in this context are for, and how urgent they are
+llm_user_var = contextvars.ContextVar("llm_user", default=None)
+llm_priority_var = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+# "1m30.5s", "6s", "20ms" as sent in x-ratelimit-reset-* headers
+DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+_scheduler = None
+_rate_limiter = None
+_singletons_pid = None
+_singletons_lock = threading.Lock()
+
+
+def set_llm_user(user_id, priority=INTERACTIVE):
+    """
+    Attribute the LLM calls made from the current context (and the threads and
+    tasks it starts) to `user_id` for fair sharing.
+    """
+    llm_user_var.set(user_id)
+    llm_priority_var.set(priority)
+
+
+class SharedRateLimiter:
+    """
+    Token buckets for requests per minute and tokens per minute, stored in
+    SQLite so every worker process on the host draws from the same budget.
+    Like the provider, a call is charged its prompt plus `max_tokens` up front.
+    Each bucket holds up to `burst_seconds` worth of its rate. A limit of 0
+    disables that bucket.
+    """
+
+    def __init__(self, path, rpm=0, tpm=0, burst_seconds=60.0):
+        self.path = path
+        self.rates = {"requests": rpm / 60.0, "tokens": tpm / 60.0}
+        self.burst_seconds = burst_seconds
+        self._local = threading.local()
+        with self._transaction() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_limits "
+                "(name TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # sqlite3 connections must not be shared between threads or processes
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    @contextmanager
+    def _transaction(self):
+        db = self._connect()
+        # Take the write lock up front so read-modify-write is atomic
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def capacity(self, name):
+        return self.rates[name] * self.burst_seconds
+
+    def _level(self, db, name, now):
+        row = db.execute(
+            "SELECT level, updated FROM llm_limits WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return self.capacity(name)
+        level, updated = row
+        return min(self.capacity(name), level + (now - updated) * self.rates[name])
+
+    def _store(self, db, name, level, now):
+        db.execute(
+            "INSERT OR REPLACE INTO llm_limits (name, level, updated) VALUES (?, ?, ?)",
+            (name, level, now),
+        )
+
+    def reserve(self, tokens):
+        """
+        Take one request and `tokens` tokens from the buckets if both have
+        enough. Returns 0 on success, otherwise the seconds to wait before
+        trying again (nothing is taken).
+        """
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT level FROM llm_limits WHERE name = 'paused'").fetchone()
+            if row is not None and row[0] > now:
+                return row[0] - now
+
+            wanted = {"requests": 1, "tokens": tokens}
+            levels, wait = {}, 0.0
+            for name, amount in wanted.items():
+                if not self.rates[name]:
+                    continue
+                # A call larger than the bucket could never fit; let it drain it
+                amount = min(amount, self.capacity(name))
+                levels[name] = self._level(db, name, now) - amount
+                if levels[name] < 0:
+                    wait = max(wait, -levels[name] / self.rates[name])
+            if wait:
+                return wait
+            for name, level in levels.items():
+                self._store(db, name, level, now)
+            return 0.0
+
+    def pause(self, seconds, remaining=None):
+        """
+        Stop every process from dispatching for `seconds`, and lower the
+        buckets to the provider's reported `remaining` {"requests", "tokens"}.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT level FROM llm_limits WHERE name = 'paused'").fetchone()
+            until = max(row[0] if row is not None else 0, now + seconds)
+            self._store(db, "paused", until, now)
+            for name, value in (remaining or {}).items():
+                if self.rates.get(name) and value is not None:
+                    self._store(db, name, min(self._level(db, name, now), value), now)
+
+
+class _Ticket:
+    __slots__ = ("user", "priority", "tokens", "seq", "wake", "granted")
+
+    def __init__(self, user, priority, tokens, seq, wake):
+        self.user = user
+        self.priority = priority
+        self.tokens = tokens
+        self.seq = seq
+        self.wake = wake
+        self.granted = False
+
+
+class FairScheduler:
+    """
+    Limits in-flight LLM calls in this process and hands free slots out by
+    priority, then to the user with the fewest calls in flight, then to the
+    user served least recently. One user queueing many calls cannot starve
+    the others. With a `limiter`, a slot is only granted once the chosen call
+    fits in the shared rate limits, so the rate budget is shared out in the
+    same fair order. The limiter does disk I/O, so it is only consulted from a
+    dispatcher thread, never under the lock or on an event loop. Works for
+    threads (`acquire`) and coroutines (`aacquire`).
+    """
+
+    def __init__(self, max_in_flight, limiter=None):
+        self.max_in_flight = max_in_flight
+        self.limiter = limiter
+        self._queues = defaultdict(deque)  # user -> waiting tickets, FIFO
+        self._in_flight = defaultdict(int)
+        self._last_served = {}
+        self._total = 0
+        self._seq = itertools.count()
+        self._served = itertools.count()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._dispatcher = None
+
+    def _enqueue(self, user, priority, tokens, wake):
+        with self._lock:
+            ticket = _Ticket(user, priority, tokens, next(self._seq), wake)
+            self._queues[user].append(ticket)
+            if self.limiter is not None and self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._run_dispatcher, name="llm-dispatcher", daemon=True
+                )
+                self._dispatcher.start()
+            self._dispatch()
+        return ticket
+
+    def _next_ticket(self):
+        # Called with the lock held. The ticket to serve next, or None
+        if self._total >= self.max_in_flight or not self._queues:
+            return None
+        user = min(
+            self._queues,
+            key=lambda user: (
+                self._queues[user][0].priority,
+                self._in_flight[user],
+                self._last_served.get(user, -1),
+                self._queues[user][0].seq,
+            ),
+        )
+        return self._queues[user][0]
+
+    def _grant(self, ticket):
+        # Called with the lock held, for the head ticket of its user's queue
+        queue = self._queues[ticket.user]
+        queue.popleft()
+        if not queue:
+            del self._queues[ticket.user]
+        ticket.granted = True
+        self._in_flight[ticket.user] += 1
+        self._last_served[ticket.user] = next(self._served)
+        self._total += 1
+        ticket.wake()
+
+    def _dispatch(self):
+        # Called with the lock held
+        if self.limiter is not None:
+            self._changed.notify()
+            return
+        ticket = self._next_ticket()
+        while ticket is not None:
+            self._grant(ticket)
+            ticket = self._next_ticket()
+
+    def _run_dispatcher(self):
+        while True:
+            with self._lock:
+                ticket = self._next_ticket()
+                while ticket is None:
+                    self._changed.wait()
+                    ticket = self._next_ticket()
+            wait = self._reserve(ticket.tokens)
+            if wait:
+                # Nobody jumps the queue: retry the same choice once there is room
+                time.sleep(wait)
+                continue
+            with self._lock:
+                # Unless it was cancelled meanwhile; its reservation is then lost
+                queue = self._queues.get(ticket.user)
+                if queue and queue[0] is ticket:
+                    self._grant(ticket)
+
+    def _reserve(self, tokens):
+        try:
+            return self.limiter.reserve(tokens)
+        except sqlite3.Error as e:
+            # Let calls through rather than stall them all; the provider's
+            # own 429s still slow us down
+            logger.warning("LLM rate limiter unavailable: %s", e)
+            return 0.0
+
+    def acquire(self, user=None, priority=INTERACTIVE, tokens=0):
+        event = threading.Event()
+        ticket = self._enqueue(user, priority, tokens, event.set)
+        event.wait()
+        return ticket
+
+    async def aacquire(self, user=None, priority=INTERACTIVE, tokens=0):
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        ticket = self._enqueue(user, priority, tokens, wake)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            self._cancel(ticket)
+            raise
+        return ticket
+
+    def _cancel(self, ticket):
+        with self._lock:
+            if not ticket.granted:
+                queue = self._queues.get(ticket.user)
+                if queue is not None and ticket in queue:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._queues[ticket.user]
+                return
+        self.release(ticket)
+
+    def release(self, ticket):
+        with self._lock:
+            self._total -= 1
+            self._in_flight[ticket.user] -= 1
+            if not self._in_flight[ticket.user]:
+                del self._in_flight[ticket.user]
+                if ticket.user not in self._queues:
+                    self._last_served.pop(ticket.user, None)
+            self._dispatch()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "inFlight": self._total,
+                "waiting": sum(len(queue) for queue in self._queues.values()),
+                "users": len(set(self._queues) | set(self._in_flight)),
+            }
+
+
+def create_rate_limiter():
+    """
+    Build the shared rate limiter from the environment: LLM_RPM, LLM_TPM
+    (0 disables a limit), LLM_RATE_LIMIT_BURST seconds and LLM_RATE_LIMIT_DB.
+    Returns None when both limits are disabled.
+    """
+    rpm = float(os.getenv("LLM_RPM", "500"))
+    tpm = float(os.getenv("LLM_TPM", "200000"))
+    if not rpm and not tpm:
+        return None
+    path = os.getenv(
+        "LLM_RATE_LIMIT_DB", os.path.join(tempfile.gettempdir(), "resume-tailor-llm-limits.db")
+    )
+    burst = float(os.getenv("LLM_RATE_LIMIT_BURST", "60"))
+    return SharedRateLimiter(path, rpm=rpm, tpm=tpm, burst_seconds=burst)
+
+
+def _get_singletons():
+    global _scheduler, _rate_limiter, _singletons_pid
+    if _singletons_pid != os.getpid():
+        with _singletons_lock:
+            if _singletons_pid != os.getpid():
+                _rate_limiter = create_rate_limiter()
+                _scheduler = FairScheduler(
+                    int(os.getenv("LLM_MAX_IN_FLIGHT", "32")), _rate_limiter
+                )
+                _singletons_pid = os.getpid()
+    return _scheduler, _rate_limiter
+
+
+def get_scheduler():
+    return _get_singletons()[0]
+
+
+def get_rate_limiter():
+    return _get_singletons()[1]
+
+
+@contextmanager
+def llm_slot(estimated_tokens):
+    """
+    Wait for this user's turn and for room in the shared rate limits, then
+    hold one in-flight slot for the duration of the call.
+    """
+    scheduler = get_scheduler()
+    with span("llm_queue"):
+        ticket = scheduler.acquire(llm_user_var.get(), llm_priority_var.get(), estimated_tokens)
+    try:
+        yield
+    finally:
+        scheduler.release(ticket)
+
+
+@asynccontextmanager
+async def allm_slot(estimated_tokens):
+    """
+    Async version of `llm_slot`; waiting does not block the event loop.
+    """
+    scheduler = get_scheduler()
+    with span("llm_queue"):
+        ticket = await scheduler.aacquire(
+            llm_user_var.get(), llm_priority_var.get(), estimated_tokens
+        )
+    try:
+        yield
+    finally:
+        scheduler.release(ticket)
+
+
+def parse_duration(value):
+    """
+    Seconds in a rate-limit header value: plain seconds ("2", "0.5") or
+    a duration such as "1m30s" or "20ms". None if it cannot be parsed.
+    """
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART_RE.findall(str(value))
+    if not parts:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def rate_limit_delay(headers):
+    """
+    How long the provider asks us to wait, from the headers of a rate-limit
+    response, and pause every process for that long. Returns None when the
+    headers say nothing about it. Writes to the shared rate limiter, so call
+    it from a worker thread in async code.
+    """
+    headers = {str(key).lower(): value for key, value in (headers or {}).items()}
+    if "retry-after-ms" in headers:
+        delay = parse_duration(headers["retry-after-ms"])
+        delay = delay / 1000 if delay is not None else None
+    else:
+        delay = parse_duration(headers.get("retry-after"))
+    if delay is None:
+        # Without Retry-After, wait for whichever exhausted limit resets
+        resets = [
+            parse_duration(headers.get(f"x-ratelimit-reset-{name}"))
+            for name in ("requests", "tokens")
+            if _header_int(headers, f"x-ratelimit-remaining-{name}") in (0, None)
+        ]
+        resets = [reset for reset in resets if reset is not None]
+        delay = max(resets) if resets else None
+
+    limiter = get_rate_limiter()
+    if delay is not None and limiter is not None:
+        limiter.pause(
+            delay,
+            {
+                name: _header_int(headers, f"x-ratelimit-remaining-{name}")
+                for name in ("requests", "tokens")
+            },
+        )
+    return delay
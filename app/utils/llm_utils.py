@@ -0,0 +1,340 @@
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.utils.llm_scheduler import allm_slot, llm_slot, rate_limit_delay
+from app.utils.tracing import (
+    observe_llm_call,
+    observe_rate_limit,
+    span,
+    submit_with_context,
+)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+logger = logging.getLogger(__name__)
+
+
+# Roughly one token per word piece or punctuation mark.
+APPROX_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+_encoding = None
+
+# `openai` is slow to import, so it is loaded on the first model call
+_openai = None
+
+# aiohttp session shared by async LLM calls, so connections are pooled
+_aiosession = None
+
+
+def get_model():
+    return os.getenv("OPENAI_MODEL", DEFAULT_MODEL)
+
+
+def get_openai():
+    """
+    Return the `openai` module, importing and configuring it on first use.
+    """
+    global _openai
+    if _openai is None:
+        import openai
+
+        openai.api_key = os.getenv("OPENAI_API_KEY")
+        _openai = openai
+    return _openai
+
+
+def retryable_errors():
+    """
+    Errors worth retrying: the request may succeed if sent again later.
+    """
+    error = get_openai().error
+    return (
+        error.RateLimitError,
+        error.Timeout,
+        error.APIConnectionError,
+        error.ServiceUnavailableError,
+    )
+
+
+def count_tokens(text):
+    """
+    Count tokens the way the model sees them when `tiktoken` is installed,
+    otherwise fall back to a close regex approximation.
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            try:
+                _encoding = tiktoken.encoding_for_model(get_model())
+            except KeyError:
+                _encoding = tiktoken.get_encoding("o200k_base")
+        except ImportError:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(APPROX_TOKEN_RE.findall(text))
+
+
+def get_max_concurrency():
+    return max(1, int(os.getenv("LLM_MAX_CONCURRENCY", "4")))
+
+
+def backoff_delay(attempt):
+    """
+    Full-jitter exponential backoff: a random delay in [0, base * 2 ** attempt],
+    capped at LLM_BACKOFF_MAX seconds.
+    """
+    base = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+    cap = float(os.getenv("LLM_BACKOFF_MAX", "30.0"))
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def retry_delay(error, attempt, model):
+    """
+    Delay before retrying a failed call. Rate-limit responses are waited out
+    for as long as their headers ask (plus a little jitter, so waiting callers
+    do not all return at once), pausing every worker process meanwhile;
+    anything else gets jittered exponential backoff.
+    """
+    if isinstance(error, get_openai().error.RateLimitError):
+        observe_rate_limit(model)
+        delay = rate_limit_delay(getattr(error, "headers", None))
+        if delay is not None:
+            return delay + random.uniform(0, min(1.0, delay * 0.1))
+    return backoff_delay(attempt)
+
+
+def estimate_tokens(prompt, max_tokens):
+    """
+    Tokens a call is charged against the rate limit: its prompt plus the
+    completion budget, as the provider counts it.
+    """
+    return count_tokens(prompt) + max_tokens
+
+
+def _accept(reply, validate, attempt, max_retries, revalidated):
+    """
+    Whether `complete` should return `reply` rather than ask again.
+    """
+    if validate is None or revalidated or attempt == max_retries or validate(reply):
+        return True
+    logger.warning("Malformed model reply, requesting it again: %.200s", reply)
+    return False
+
+
+class TokenUsage:
+    """
+    Thread-safe tally of LLM calls and tokens for one request.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hits = 0
+        self.malformed_replies = 0
+        self._lock = threading.Lock()
+
+    def add(self, usage):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += usage.get("prompt_tokens", 0)
+            self.completion_tokens += usage.get("completion_tokens", 0)
+
+    def add_cache_hits(self, count):
+        with self._lock:
+            self.cache_hits += count
+
+    def add_malformed_reply(self):
+        with self._lock:
+            self.malformed_replies += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "llmCalls": self.calls,
+                "promptTokens": self.prompt_tokens,
+                "completionTokens": self.completion_tokens,
+                "totalTokens": self.prompt_tokens + self.completion_tokens,
+                "cacheHits": self.cache_hits,
+                "malformedReplies": self.malformed_replies,
+            }
+
+
+def complete(
+    prompt, max_tokens=1500, temperature=0.1, usage=None, json_output=False, validate=None
+):
+    """
+    Send a single-message chat completion and return the reply text.
+    Each call is bounded by LLM_TIMEOUT seconds and retried with jittered
+    backoff on rate limits and transient errors, up to LLM_MAX_RETRIES times.
+    Calls are dispatched through the LLM scheduler (see llm_scheduler), which
+    enforces the shared rate limits and shares capacity fairly between users.
+    Token counts are added to `usage` (a TokenUsage) when given, and
+    `json_output` asks the model for a JSON object reply. A reply rejected by
+    `validate(reply)` (e.g. JSON cut off at `max_tokens`) is requested once
+    more; the second reply is returned whatever it is.
+    """
+    extra_args = {"response_format": {"type": "json_object"}} if json_output else {}
+    timeout = float(os.getenv("LLM_TIMEOUT", "60"))
+    max_retries = int(os.getenv("LLM_MAX_RETRIES", "5"))
+
+    openai = get_openai()
+    retryable = retryable_errors()
+    model = get_model()
+    estimated_tokens = estimate_tokens(prompt, max_tokens)
+    start = time.perf_counter()
+    outcome, response_usage = "error", None
+    revalidated = False
+    try:
+        with span("llm_call", model=model):
+            for attempt in range(max_retries + 1):
+                try:
+                    with llm_slot(estimated_tokens):
+                        response = openai.ChatCompletion.create(
+                            model=model,
+                            messages=[{"role": "user", "content": prompt}],
+                            max_tokens=max_tokens,
+                            temperature=temperature,
+                            request_timeout=timeout,
+                            **extra_args,
+                        )
+                    outcome, response_usage = "ok", response.get("usage") or {}
+                    if usage is not None:
+                        usage.add(response_usage)
+                    reply = response["choices"][0]["message"]["content"]
+                    if _accept(reply, validate, attempt, max_retries, revalidated):
+                        return reply
+                    revalidated = True
+                except retryable as e:
+                    if attempt == max_retries:
+                        raise
+                    time.sleep(retry_delay(e, attempt, model))
+    finally:
+        observe_llm_call(model, time.perf_counter() - start, outcome, response_usage)
+
+
+def complete_all(prompts, max_workers=None, on_complete=None, **kwargs):
+    """
+    Run `complete` for every prompt on a bounded thread pool.
+    Replies are returned in the same order as the prompts. If given,
+    `on_complete(index, reply)` is called as each reply arrives.
+    """
+    prompts = list(prompts)
+    if not prompts:
+        return []
+
+    replies = [None] * len(prompts)
+    max_workers = min(max_workers or get_max_concurrency(), len(prompts))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            submit_with_context(executor, complete, prompt, **kwargs): idx
+            for idx, prompt in enumerate(prompts)
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            replies[idx] = future.result()
+            if on_complete:
+                on_complete(idx, replies[idx])
+    return replies
+
+
+def get_aiosession():
+    """
+    Return the aiohttp session used by `acomplete`, creating it on first use.
+    Must be called from the event loop that will use it.
+    """
+    global _aiosession
+    if _aiosession is None or _aiosession.closed:
+        import aiohttp
+
+        _aiosession = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+            )
+        )
+    return _aiosession
+
+
+async def close_aiosession():
+    global _aiosession
+    if _aiosession is not None:
+        await _aiosession.close()
+        _aiosession = None
+
+
+async def acomplete(
+    prompt, max_tokens=1500, temperature=0.1, usage=None, json_output=False, validate=None
+):
+    """
+    Async version of `complete`, sending the request over the shared aiohttp
+    session instead of blocking a thread. Same timeout, retries and metrics.
+    """
+    extra_args = {"response_format": {"type": "json_object"}} if json_output else {}
+    timeout = float(os.getenv("LLM_TIMEOUT", "60"))
+    max_retries = int(os.getenv("LLM_MAX_RETRIES", "5"))
+
+    openai = get_openai()
+    retryable = retryable_errors()
+    # Without a session set here, openai opens a new connection per request
+    openai.aiosession.set(get_aiosession())
+    model = get_model()
+    estimated_tokens = estimate_tokens(prompt, max_tokens)
+    start = time.perf_counter()
+    outcome, response_usage = "error", None
+    revalidated = False
+    try:
+        with span("llm_call", model=model):
+            for attempt in range(max_retries + 1):
+                try:
+                    async with allm_slot(estimated_tokens):
+                        response = await openai.ChatCompletion.acreate(
+                            model=model,
+                            messages=[{"role": "user", "content": prompt}],
+                            max_tokens=max_tokens,
+                            temperature=temperature,
+                            request_timeout=timeout,
+                            **extra_args,
+                        )
+                    outcome, response_usage = "ok", response.get("usage") or {}
+                    if usage is not None:
+                        usage.add(response_usage)
+                    reply = response["choices"][0]["message"]["content"]
+                    if _accept(reply, validate, attempt, max_retries, revalidated):
+                        return reply
+                    revalidated = True
+                except retryable as e:
+                    if attempt == max_retries:
+                        raise
+                    # retry_delay may pause the shared rate limiter on disk
+                    delay = await asyncio.to_thread(retry_delay, e, attempt, model)
+                    await asyncio.sleep(delay)
+    finally:
+        observe_llm_call(model, time.perf_counter() - start, outcome, response_usage)
+
+
+async def acomplete_all(prompts, max_workers=None, on_complete=None, **kwargs):
+    """
+    Async version of `complete_all`: at most `max_workers` (default
+    LLM_MAX_CONCURRENCY) calls are in flight at once, and replies are returned
+    in prompt order.
+    """
+    prompts = list(prompts)
+    semaphore = asyncio.Semaphore(max_workers or get_max_concurrency())
+    replies = [None] * len(prompts)
+
+    async def run(idx, prompt):
+        async with semaphore:
+            replies[idx] = await acomplete(prompt, **kwargs)
+        if on_complete:
+            on_complete(idx, replies[idx])
+
+    await asyncio.gather(*(run(idx, prompt) for idx, prompt in enumerate(prompts)))
+    return replies
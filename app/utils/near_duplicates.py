@@ -0,0 +1,273 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict, defaultdict
+from app.utils.relevance import tokenize
+
+# Word shingles compared between job descriptions
+SHINGLE_SIZE = 3
+
+# MinHash values per signature, split into LSH bands of NUM_PERM // BANDS rows.
+# Descriptions sharing every row of any band become candidates, which are
+# then checked against the threshold with the full signature. With 16 bands
+# of 8 rows a pair at 0.8 similarity is found 95% of the time, at 0.9 always.
+NUM_PERM = 128
+BANDS = 16
+
+# Paragraphs that differ between postings without changing the job: the
+# company blurb, benefits and equal-opportunity sections, by their heading
+BOILERPLATE_SECTION_RE = re.compile(
+    r"^\s*(?:about(?!\s+(?:the\s+)?(?:role|position|job|opportunity|you)\b)"
+    r"[^\n:]{0,40}(?::|\n|$)|"
+    r"who\s+we\s+are|our\s+(?:mission|story|values|culture)|benefits|perks|"
+    r"what\s+we\s+offer|equal\s+(?:employment\s+)?opportunity)",
+    re.IGNORECASE,
+)
+
+# Likewise single sentences: equal-opportunity statements, accommodation
+# notices and the like
+BOILERPLATE_TERMS_RE = re.compile(
+    r"\b(?:equal\s+(?:employment\s+)?opportunity|affirmative\s+action|eeo|"
+    r"without\s+regard\s+to|reasonable\s+accommodation|veteran\s+status|e-verify|"
+    r"sexual\s+orientation|gender\s+identity)\b",
+    re.IGNORECASE,
+)
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|\n")
+
+_MASK = 0xFFFFFFFF
+
+
+def is_heading_line(paragraph):
+    paragraph = paragraph.strip()
+    short = len(paragraph.split()) <= 6
+    return short and "\n" not in paragraph and not paragraph.endswith(".")
+
+
+def strip_boilerplate(text):
+    """
+    Drop boilerplate paragraphs, and the paragraphs under a boilerplate
+    heading up to the next heading, then boilerplate sentences.
+    """
+    kept, skipping = [], False
+    for paragraph in re.split(r"\n\s*\n", text):
+        if BOILERPLATE_SECTION_RE.match(paragraph):
+            skipping = is_heading_line(paragraph)
+        elif skipping and not is_heading_line(paragraph):
+            continue
+        else:
+            skipping = False
+            kept.extend(
+                sentence
+                for sentence in SENTENCE_END_RE.split(paragraph)
+                if not BOILERPLATE_TERMS_RE.search(sentence)
+            )
+    return "\n".join(kept)
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """
+    64-bit hashes of the word shingles of `text`, after dropping boilerplate,
+    case, punctuation and stopwords. Stable across processes.
+    """
+    tokens = tokenize(strip_boilerplate(text))
+    if len(tokens) < size:
+        shingles = {" ".join(tokens)} if tokens else set()
+    else:
+        shingles = {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+    return {
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for shingle in shingles
+    }
+
+
+def minhash_signature(text, num_perm=NUM_PERM):
+    """
+    MinHash signature of `text` as an array of 32-bit values, or None if it
+    has no words. Uses one-permutation hashing: each shingle hash lands in
+    one of `num_perm` bins and every bin keeps its minimum, so the cost is
+    one hash per shingle rather than `num_perm`. Empty bins borrow from the
+    next non-empty bin (rotation densification).
+    """
+    bins = [None] * num_perm
+    for value in shingle_hashes(text):
+        idx, value = value % num_perm, value // num_perm
+        if bins[idx] is None or value < bins[idx]:
+            bins[idx] = value
+    if all(value is None for value in bins):
+        return None
+
+    signature = array("I", bytes(4 * num_perm))
+    for idx in range(num_perm):
+        distance = 0
+        while bins[(idx + distance) % num_perm] is None:
+            distance += 1
+        value = bins[(idx + distance) % num_perm]
+        signature[idx] = (value + distance * 0x9E3779B1) & _MASK
+    return signature
+
+
+def signature_similarity(a, b):
+    """
+    Estimated Jaccard similarity of the shingle sets behind two signatures.
+    """
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index of job descriptions, each stored with a value (the
+    tailoring it produced). Entries are grouped by `namespace`, e.g. one per
+    master resume, and only match within it. Holds at most `max_entries`,
+    dropping the least recently matched. With `path`, entries are appended to
+    a JSON lines file and reloaded from it on start.
+    """
+
+    def __init__(
+        self, threshold=0.85, max_entries=10000, path=None, num_perm=NUM_PERM, bands=BANDS
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # id -> (namespace, signature, value)
+        self._buckets = defaultdict(list)  # band hash -> ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def _band_keys(self, namespace, signature):
+        rows = self.rows
+        return [
+            hash((namespace, band, *signature[band * rows : (band + 1) * rows]))
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, namespace, signature, value):
+        # Called with the lock held
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (namespace, signature, value)
+        for key in self._band_keys(namespace, signature):
+            self._buckets[key].append(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id):
+        namespace, signature, _ = self._entries.pop(entry_id)
+        for key in self._band_keys(namespace, signature):
+            bucket = self._buckets[key]
+            bucket.remove(entry_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def query(self, namespace, signature):
+        """
+        Return (value, similarity) for the most similar entry in `namespace`
+        at or above the threshold, or None.
+        """
+        best, best_similarity = None, self.threshold
+        with self._lock:
+            candidates = {
+                entry_id
+                for key in self._band_keys(namespace, signature)
+                for entry_id in self._buckets.get(key, ())
+            }
+            for entry_id in candidates:
+                entry_namespace, entry_signature, _ = self._entries[entry_id]
+                if entry_namespace != namespace:
+                    continue  # Band hash collision
+                similarity = signature_similarity(signature, entry_signature)
+                if similarity >= best_similarity:
+                    best, best_similarity = entry_id, similarity
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best)
+            return self._entries[best][2], best_similarity
+
+    def add(self, namespace, signature, value):
+        """
+        Index `signature` in `namespace` with `value`, which must be
+        JSON-serializable when the index is persisted.
+        """
+        line = None
+        if self.path:
+            line = json.dumps([namespace, list(signature), value], separators=(",", ":"))
+        with self._lock:
+            self._insert(namespace, signature, value)
+            if line is not None:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+
+    def _load(self):
+        lines = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        namespace, signature, value = json.loads(line)
+                    except ValueError:
+                        continue  # Torn write
+                    if len(signature) == self.num_perm:
+                        self._insert(namespace, array("I", signature), value)
+        except FileNotFoundError:
+            return
+        if lines > len(self._entries) * 2:
+            self._compact()
+
+    def _compact(self):
+        # Rewrite the file with only the entries still held, atomically
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for namespace, signature, value in self._entries.values():
+                line = json.dumps([namespace, list(signature), value], separators=(",", ":"))
+                f.write(line + "\n")
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def create_reuse_index():
+    """
+    Build the index of tailored job descriptions from the environment:
+    TAILORING_REUSE_THRESHOLD (similarity 0-1 at which earlier tailoring is
+    reused, default 0.85; 0 disables reuse), TAILORING_REUSE_INDEX_SIZE and
+    TAILORING_REUSE_INDEX_PATH (persist to this file).
+    """
+    threshold = float(os.getenv("TAILORING_REUSE_THRESHOLD", "0.85"))
+    if not threshold:
+        return None
+    return NearDuplicateIndex(
+        threshold=threshold,
+        max_entries=int(os.getenv("TAILORING_REUSE_INDEX_SIZE", "10000")),
+        path=os.getenv("TAILORING_REUSE_INDEX_PATH") or None,
+    )
@@ -1,168 +1,795 @@
 import os
-import openai
-import tempfile
-import requests
+import re
+import json
+import pickle
+import asyncio
+import hashlib
+import logging
+from io import BytesIO
 from dotenv import load_dotenv
-from docx import Document
-from docx.shared import RGBColor, Pt, Inches
-from docx.shared import Twips
+from app.utils.near_duplicates import create_reuse_index, minhash_signature
+from app.utils.relevance import get_relevance_threshold, relative_scores
+from app.utils.tracing import span
+from app.utils.llm_utils import (
+    TokenUsage,
+    acomplete,
+    acomplete_all,
+    complete,
+    complete_all,
+    count_tokens,
+    get_model,
+)
+from app.utils.cache_utils import (
+    LRUCache,
+    create_tailoring_cache,
+    hash_key,
+    normalize_text,
+)
 
 load_dotenv()
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
+logger = logging.getLogger(__name__)
 
+# Bump whenever build_tailoring_prompt changes so cached output is not reused.
+PROMPT_VERSION = 4
 
-def chunk_text(text, max_tokens=1000):
+# "full": the model returns every paragraph of a chunk.
+# "delta": the model returns JSON edits for changed paragraphs only, against
+# a condensed job description shared by all chunks.
+TAILORING_MODES = ("full", "delta")
+
+# "[12] Paragraph text" lines used to map tailored text back to paragraphs
+PARAGRAPH_LINE_RE = re.compile(r"^\s*\[(\d+)\][ \t]?(.*)$", re.MULTILINE)
+
+# Soft line breaks inside a paragraph as written in prompts, so that every
+# paragraph stays on one line; tabs are sent as they are
+LINE_BREAK = "\\n"
+
+# Whitespace other than tabs and newlines
+SPACES_RE = re.compile(r"[^\S\t\n]+")
+
+tailoring_cache = create_tailoring_cache()
+
+# Edits made for earlier job postings, found again for near-duplicate postings
+reuse_index = create_reuse_index()
+
+# Master resumes per user, pickled as (etag, docx bytes, content, doc_props)
+structure_cache = LRUCache(
+    max_size=int(os.getenv("STRUCTURE_CACHE_SIZE", "1024")),
+    max_bytes=int(os.getenv("STRUCTURE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+
+def is_heading(para_props):
+    style = para_props.get("style") or ""
+    return style.startswith(("Heading", "Title"))
+
+
+def group_paragraphs(content, max_tokens=1000, tokenizer=count_tokens):
     """
-    Chunk text into parts that fit within the token limit.
+    Lazily group paragraphs into chunks of at most `max_tokens` tokens,
+    yielding lists of paragraph indices into `content`.
+    Chunks are only cut between paragraphs, never directly after a heading,
+    so bullets stay whole and headings stay with the section they introduce.
+    A single paragraph larger than the budget becomes its own chunk.
     """
-    words = text.split()
-    chunks = []
-    current_chunk = []
+    current = []
+    current_tokens = 0
+    # Trailing run of headings in `current`, moved to the next chunk on a cut.
+    heading_start = None
+    heading_tokens = 0
 
-    for word in words:
-        if len(" ".join(current_chunk)) + len(word) + 1 > max_tokens:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = []
-        current_chunk.append(word)
+    for idx, para_props in enumerate(content):
+        tokens = tokenizer(para_props["text"]) + 1  # +1 for the newline separator
 
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-    return chunks
+        if current and current_tokens + tokens > max_tokens:
+            if heading_start is None:
+                yield current
+                current, current_tokens = [], 0
+            elif heading_start > 0:
+                yield current[:heading_start]
+                current = current[heading_start:]
+                current_tokens = heading_tokens
+                heading_start = 0
+
+        current.append(idx)
+        current_tokens += tokens
+        if is_heading(para_props):
+            if heading_start is None:
+                heading_start, heading_tokens = len(current) - 1, 0
+            heading_tokens += tokens
+        else:
+            heading_start = None
+
+    if current:
+        yield current
+
+
+def split_sections(content):
+    """
+    Split paragraphs into sections, each starting at a heading (or run of
+    headings). Paragraphs before the first heading, typically the name and
+    contact details, form their own section. Yields lists of indices.
+    """
+    current = []
+    for idx, para_props in enumerate(content):
+        if is_heading(para_props) and current and not is_heading(content[current[-1]]):
+            yield current
+            current = []
+        current.append(idx)
+    if current:
+        yield current
+
+
+def rank_sections(content, job_title, job_description, threshold=None):
+    """
+    Score every section against the job locally (BM25, relative to the best
+    section) before any LLM call. Sections below `threshold` (default
+    RELEVANCE_THRESHOLD) are marked as not relevant and pass through
+    unchanged. If no section shares a term with the job, all are relevant.
+    """
+    if threshold is None:
+        threshold = get_relevance_threshold()
+    sections = list(split_sections(content))
+    texts = ["\n".join(content[idx]["text"] for idx in section) for section in sections]
+    scores = relative_scores(texts, f"{job_title}\n{job_description}")
+    no_signal = not any(scores)
+
+    ranked = []
+    for section, score in zip(sections, scores):
+        heading = content[section[0]]["text"] if is_heading(content[section[0]]) else None
+        ranked.append(
+            {
+                "heading": heading,
+                "paragraphs": section,
+                "score": round(score, 4),
+                "relevant": no_signal or score >= threshold,
+            }
+        )
+    return ranked
+
+
+def chunk_paragraphs(content, max_tokens=1000, tokenizer=count_tokens):
+    """
+    Lazily yield chunk texts built from `group_paragraphs`.
+    """
+    for group in group_paragraphs(content, max_tokens, tokenizer):
+        yield "\n".join(content[idx]["text"] for idx in group)
 
 
 def extract_docx_structure(file_path):
-    doc = Document(file_path)
-    content = []
+    # python-docx and lxml are only needed once a document is parsed
+    from app.utils.docx_extract import parse_docx
+
+    tree = parse_docx(file_path)
 
     doc_props = {
-        "headers": [
-            {"text": section.header.paragraphs[0].text if section.header.paragraphs else ""}
-            for section in doc.sections
-        ],
-        "footers": [
-            {"text": section.footer.paragraphs[0].text if section.footer.paragraphs else ""}
-            for section in doc.sections
-        ],
+        "headers": [{"text": section.header_text} for section in tree.sections],
+        "footers": [{"text": section.footer_text} for section in tree.sections],
         "section_props": [
             {
-                "page_width": section.page_width.twips,
-                "page_height": section.page_height.twips,
-                "left_margin": section.left_margin.twips,
-                "right_margin": section.right_margin.twips,
-                "top_margin": section.top_margin.twips,
-                "bottom_margin": section.bottom_margin.twips,
-                "header_distance": section.header_distance.twips,
-                "footer_distance": section.footer_distance.twips,
+                "page_width": section.page_width,
+                "page_height": section.page_height,
+                "left_margin": section.left_margin,
+                "right_margin": section.right_margin,
+                "top_margin": section.top_margin,
+                "bottom_margin": section.bottom_margin,
+                "header_distance": section.header_distance,
+                "footer_distance": section.footer_distance,
             }
-            for section in doc.sections
+            for section in tree.sections
         ],
     }
 
-    for para in doc.paragraphs:
-        para_props = {
+    content = [
+        {
             "text": para.text,
-            "style": para.style.name,
-            "alignment": para.paragraph_format.alignment,
+            "style": para.style,
+            "alignment": para.alignment,
+            "has_hyperlink": para.has_hyperlink,
             "runs": [
                 {
                     "text": run.text,
                     "bold": run.bold,
                     "italic": run.italic,
                     "underline": run.underline,
-                    "font_name": run.font.name,
-                    "font_size": run.font.size.pt if run.font.size else None,
+                    "font_name": run.font_name,
+                    "font_size": run.font_size,
                 }
                 for run in para.runs
             ],
         }
-        content.append(para_props)
+        for para in tree.paragraphs
+    ]
 
     return content, doc_props
 
 
-def apply_formatting(doc, content, doc_props):
-    for idx, section_props in enumerate(doc_props["section_props"]):
-        section = doc.sections[idx] if idx < len(doc.sections) else doc.add_section()
-        section.page_width = Twips(section_props["page_width"])
-        section.page_height = Twips(section_props["page_height"])
-        section.left_margin = Twips(section_props["left_margin"])
-        section.right_margin = Twips(section_props["right_margin"])
-        section.top_margin = Twips(section_props["top_margin"])
-        section.bottom_margin = Twips(section_props["bottom_margin"])
-        section.header_distance = Twips(section_props["header_distance"])
-        section.footer_distance = Twips(section_props["footer_distance"])
-
-        if idx < len(doc_props["headers"]):
-            header = section.header
-            if doc_props["headers"][idx]["text"]:
-                header.paragraphs[0].text = doc_props["headers"][idx]["text"]
-        if idx < len(doc_props["footers"]):
-            footer = section.footer
-            if doc_props["footers"][idx]["text"]:
-                footer.paragraphs[0].text = doc_props["footers"][idx]["text"]
-
-    for para_props in content:
-        if para_props["text"].startswith(("*", "-")):
-            paragraph = doc.add_paragraph(style="List Bullet")
-            paragraph.add_run(para_props["text"][1:].strip())
-        else:
-            paragraph = doc.add_paragraph(para_props["text"])
+def load_master_resume(user_id, etag, fetch_master_file):
+    """
+    Return (docx bytes, content, doc_props) for a user's master resume.
+    The download and parse are cached per user and reused while the S3 ETag
+    is unchanged; `fetch_master_file` is only called on a miss and should
+    return the .docx as a binary file-like object, or None if it cannot be
+    fetched.
+    """
+    blob = structure_cache.get(user_id)
+    if blob is not None:
+        cached_etag, master_bytes, content, doc_props = pickle.loads(blob)
+        if cached_etag == etag:
+            return master_bytes, content, doc_props
 
-        paragraph.alignment = para_props["alignment"]
+    with span("s3_download"):
+        master_file = fetch_master_file()
+        if master_file is None:
+            return None
+        master_bytes = master_file.read()
+    with span("parse_docx"):
+        content, doc_props = extract_docx_structure(BytesIO(master_bytes))
+    structure_cache.set(
+        user_id,
+        pickle.dumps(
+            (etag, master_bytes, content, doc_props), pickle.HIGHEST_PROTOCOL
+        ),
+    )
+    return master_bytes, content, doc_props
 
-        for run_props in para_props["runs"]:
-            run = paragraph.add_run(run_props["text"])
-            run.bold = run_props["bold"]
-            run.italic = run_props["italic"]
-            run.underline = run_props["underline"]
-            if run_props["font_name"]:
-                run.font.name = run_props["font_name"]
-            if run_props["font_size"]:
-                run.font.size = Pt(run_props["font_size"])
 
+def invalidate_master_resume(user_id):
+    structure_cache.delete(user_id)
 
-def generate_tailored_resume_with_chunking(
-    s3_url, job_title, job_description, output_file_path
-):
-    response = requests.get(s3_url)
-    if response.status_code != 200:
-        raise Exception("Failed to download master resume.")
-
-    with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as temp_file:
-        temp_file.write(response.content)
-        local_path = temp_file.name
-
-    content, doc_props = extract_docx_structure(local_path)
-    master_text = "\n".join([p["text"] for p in content])
-    chunks = chunk_text(master_text)
-
-    tailored_content = []
-    for chunk in chunks:
-        prompt = f"""
-        Rewrite this resume content to match the job title and description below while maintaining the original formatting:
-        - Ensure headers and footers are retained.
-        - Preserve bullet points as actual bullets.
-        - Match the formatting of the input text.
-
-        Resume Content:
+
+def prompt_line(text):
+    """
+    `text` on one line for the ID protocol: runs of spaces collapsed and
+    soft line breaks written as LINE_BREAK. Tabs are kept, so tab-aligned
+    text such as "Company\tJan 2020 - Now" survives tailoring.
+    """
+    lines = (SPACES_RE.sub(" ", line).strip(" ") for line in text.split("\n"))
+    return LINE_BREAK.join(lines).strip(" ")
+
+
+def prompt_text(para_props):
+    return prompt_line(para_props["text"])
+
+
+def format_paragraphs(content, group):
+    return "\n".join(f"[{idx}] {prompt_text(content[idx])}" for idx in group)
+
+
+def parse_tailored_paragraphs(reply, group):
+    """
+    Map the "[id] text" lines of a model reply back to paragraph indices.
+    IDs outside `group` are ignored.
+    """
+    allowed = set(group)
+    tailored = {}
+    for match in PARAGRAPH_LINE_RE.finditer(reply):
+        idx = int(match.group(1))
+        if idx in allowed:
+            tailored[idx] = prompt_line(match.group(2))
+    return tailored
+
+
+def load_edits(reply):
+    """
+    The entries of a JSON `{"edits": [...]}` reply, or None when the reply is
+    not such an object (e.g. cut off at max_tokens).
+    """
+    reply = reply.strip()
+    if reply.startswith("```"):
+        reply = reply.strip("`").removeprefix("json").strip()
+    try:
+        entries = json.loads(reply).get("edits", [])
+    except (ValueError, AttributeError):
+        return None
+    return entries if isinstance(entries, list) else None
+
+
+def is_valid_reply(reply, mode):
+    """
+    Whether a tailoring reply can be parsed at all: a JSON edits object in
+    "delta" mode, at least one "[id] text" line in "full" mode.
+    """
+    if not reply:
+        return False
+    if mode == "delta":
+        return load_edits(reply) is not None
+    return PARAGRAPH_LINE_RE.search(reply) is not None
+
+
+def parse_paragraph_edits(reply, group):
+    """
+    Parse a JSON `{"edits": [{"id": ..., "text": ...}]}` reply into
+    {paragraph index: new text}. IDs outside `group` and malformed entries are
+    ignored; an unparseable reply means no edits.
+    """
+    entries = load_edits(reply)
+    if entries is None:
+        logger.warning("Ignoring malformed tailoring reply: %.200s", reply.strip())
+        return {}
+
+    allowed = set(group)
+    tailored = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        idx, text = entry.get("id"), entry.get("text")
+        if isinstance(idx, str) and idx.strip("[] ").isdigit():
+            idx = int(idx.strip("[] "))
+        if idx in allowed and isinstance(text, str):
+            tailored[idx] = prompt_line(text)
+    return tailored
+
+
+def build_tailoring_prompt(chunk, job_title, job_description):
+    return f"""
+        Rewrite these resume paragraphs to match the job title and description below.
+        Each paragraph is on its own line and starts with an ID in square brackets, e.g. [12].
+        - Return every paragraph exactly once, on its own line, starting with the same ID.
+        - Do not merge, split, add or remove paragraphs.
+        - Keep names, contact details, dates and section headings unchanged.
+        - Keep bullet markers and punctuation style as in the input.
+        - Keep tabs and \\n line break markers where they are.
+
+        Resume Paragraphs:
         {chunk}
 
         Job Title: {job_title}
 
         Job Description: {job_description}
 
-        Provide only the tailored resume content, formatted exactly like the input.
+        Provide only the ID-prefixed paragraphs.
+        """
+
+
+def build_delta_prompt(chunk, job_title, job_summary):
+    return f"""
+        Tailor these resume paragraphs to the job below. Each paragraph is on its own line and starts with an ID in square brackets, e.g. [12].
+        Only rewrite paragraphs that clearly benefit from it; keep names, contact details, dates and section headings unchanged, and keep tabs and \\n line break markers where they are.
+        Reply with a JSON object {{"edits": [{{"id": 12, "text": "new paragraph text"}}]}} listing only the paragraphs you changed, or {{"edits": []}}.
+
+        Job Title: {job_title}
+
+        Job Requirements: {job_summary}
+
+        Resume Paragraphs:
+        {chunk}
+        """
+
+
+def build_job_summary_prompt(job_title, job_description):
+    return f"""
+        Condense this job posting into the skills, technologies, responsibilities and qualifications a resume should reflect.
+        Reply with a short comma-separated list. Leave out company background, benefits and legal boilerplate.
+
+        Job Title: {job_title}
+
+        Job Description: {job_description}
         """
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+
+
+def get_tailoring_mode():
+    mode = os.getenv("TAILORING_MODE", "delta").lower()
+    return mode if mode in TAILORING_MODES else "delta"
+
+
+def _cached_job_summary(job_title, job_description, usage):
+    """
+    Return (summary, cache key). The summary is None when it still has to be
+    requested from the model; short descriptions are used as is.
+    """
+    if count_tokens(job_description) < int(os.getenv("JOB_SUMMARY_MIN_TOKENS", "150")):
+        return job_description, None
+
+    key = hash_key(
+        "job-summary",
+        PROMPT_VERSION,
+        get_model(),
+        normalize_text(job_title),
+        normalize_text(job_description),
+    )
+    summary = tailoring_cache.get(key) if tailoring_cache is not None else None
+    if summary is not None and usage is not None:
+        usage.add_cache_hits(1)
+    return summary, key
+
+
+def _store_job_summary(key, summary):
+    summary = summary.strip()
+    if tailoring_cache is not None:
+        tailoring_cache.set(key, summary)
+    return summary
+
+
+def summarize_job_description(job_title, job_description, usage=None):
+    """
+    Condense a long job description once so every chunk prompt can reuse the
+    short version. Descriptions under JOB_SUMMARY_MIN_TOKENS are used as is.
+    """
+    summary, key = _cached_job_summary(job_title, job_description, usage)
+    if summary is None:
+        reply = complete(
+            build_job_summary_prompt(job_title, job_description),
+            max_tokens=300,
+            temperature=0,
+            usage=usage,
+        )
+        summary = _store_job_summary(key, reply)
+    return summary
+
+
+async def asummarize_job_description(job_title, job_description, usage=None):
+    summary, key = _cached_job_summary(job_title, job_description, usage)
+    if summary is None:
+        reply = await acomplete(
+            build_job_summary_prompt(job_title, job_description),
+            max_tokens=300,
+            temperature=0,
+            usage=usage,
+        )
+        summary = _store_job_summary(key, reply)
+    return summary
+
+
+def tailoring_cache_key(chunk, job_title, job_description, mode="full"):
+    return hash_key(
+        PROMPT_VERSION,
+        mode,
+        get_model(),
+        normalize_text(job_title),
+        normalize_text(job_description),
+        hash_key(chunk),
+    )
+
+
+def _lookup_chunks(chunks, job_title, job_description, mode, usage, on_progress):
+    """
+    Look chunks up in the tailoring cache. Returns the replies found so far
+    (None where missing), the indices still missing, and a callback that
+    stores a model reply for the n-th missing chunk and reports progress.
+    Replies that cannot be parsed are kept for this request only: they are
+    not cached and are counted in `usage`.
+    """
+    tailored_content = [None] * len(chunks)
+    keys = [None] * len(chunks)
+    if tailoring_cache is not None:
+        for idx, chunk in enumerate(chunks):
+            keys[idx] = tailoring_cache_key(chunk, job_title, job_description, mode)
+            tailored_content[idx] = tailoring_cache.get(keys[idx])
+
+    missing = [idx for idx, tailored in enumerate(tailored_content) if tailored is None]
+    if usage is not None:
+        usage.add_cache_hits(len(chunks) - len(missing))
+    completed = len(chunks) - len(missing)
+    if on_progress:
+        on_progress(completed, len(chunks))
+
+    def store(prompt_idx, reply):
+        nonlocal completed
+        idx = missing[prompt_idx]
+        tailored_content[idx] = reply
+        if not is_valid_reply(reply, mode):
+            if usage is not None:
+                usage.add_malformed_reply()
+        elif tailoring_cache is not None:
+            tailoring_cache.set(keys[idx], reply)
+        completed += 1
+        if on_progress:
+            on_progress(completed, len(chunks))
+
+    return tailored_content, missing, store
+
+
+def _chunk_prompts(chunks, missing, job_title, job_context, mode):
+    build_prompt = build_delta_prompt if mode == "delta" else build_tailoring_prompt
+    return [build_prompt(chunks[idx], job_title, job_context) for idx in missing]
+
+
+def tailor_chunks(
+    chunks, job_title, job_description, on_progress=None, usage=None, mode=None
+):
+    """
+    Tailor every chunk to the job, returning the model replies in chunk order.
+    Chunks already in the tailoring cache skip the OpenAI call; the rest are
+    sent concurrently and stored in the cache afterwards. A reply that cannot
+    be parsed is requested once more and never cached.
+    `on_progress(completed, total)` is called as chunks finish, and LLM calls
+    and tokens are tallied in `usage` when given.
+    """
+    mode = mode or get_tailoring_mode()
+    tailored_content, missing, store = _lookup_chunks(
+        chunks, job_title, job_description, mode, usage, on_progress
+    )
+    if missing:
+        job_context = job_description
+        if mode == "delta":
+            job_context = summarize_job_description(job_title, job_description, usage)
+        complete_all(
+            _chunk_prompts(chunks, missing, job_title, job_context, mode),
+            on_complete=store,
+            max_tokens=1500,
+            temperature=0.1,
+            usage=usage,
+            json_output=mode == "delta",
+            validate=lambda reply: is_valid_reply(reply, mode),
+        )
+    return tailored_content
+
+
+async def atailor_chunks(
+    chunks, job_title, job_description, on_progress=None, usage=None, mode=None
+):
+    """
+    Async version of `tailor_chunks`.
+    """
+    mode = mode or get_tailoring_mode()
+    tailored_content, missing, store = _lookup_chunks(
+        chunks, job_title, job_description, mode, usage, on_progress
+    )
+    if missing:
+        job_context = job_description
+        if mode == "delta":
+            job_context = await asummarize_job_description(
+                job_title, job_description, usage
+            )
+        await acomplete_all(
+            _chunk_prompts(chunks, missing, job_title, job_context, mode),
+            on_complete=store,
             max_tokens=1500,
             temperature=0.1,
+            usage=usage,
+            json_output=mode == "delta",
+            validate=lambda reply: is_valid_reply(reply, mode),
+        )
+    return tailored_content
+
+
+def _paragraph_chunks(content, paragraphs, paragraph_groups):
+    if paragraph_groups is None:
+        paragraph_groups = group_paragraphs(content)
+    selected = set(range(len(content)) if paragraphs is None else paragraphs)
+    # Paragraphs with hyperlinks cannot be rewritten, so are not worth sending
+    groups = [
+        [
+            idx
+            for idx in group
+            if idx in selected
+            and content[idx]["text"].strip()
+            and not content[idx].get("has_hyperlink")
+        ]
+        for group in paragraph_groups
+    ]
+    groups = [group for group in groups if group]
+    return groups, [format_paragraphs(content, group) for group in groups]
+
+
+def _collect_edits(content, groups, replies, mode):
+    parse_reply = parse_paragraph_edits if mode == "delta" else parse_tailored_paragraphs
+    edits = {}
+    for group, reply in zip(groups, replies):
+        for idx, text in parse_reply(reply, group).items():
+            if text and text != prompt_text(content[idx]):
+                edits[idx] = text.replace(LINE_BREAK, "\n")
+    return edits
+
+
+def tailor_paragraphs(
+    content,
+    job_title,
+    job_description,
+    on_progress=None,
+    usage=None,
+    mode=None,
+    paragraphs=None,
+    paragraph_groups=None,
+):
+    """
+    Tailor the resume paragraph by paragraph and return the edits as
+    {paragraph index: new text}, leaving out paragraphs the model kept as is.
+    Only the paragraph indices in `paragraphs` are sent, when given.
+    `paragraph_groups` reuses a precomputed `group_paragraphs(content)`.
+    """
+    mode = mode or get_tailoring_mode()
+    groups, chunks = _paragraph_chunks(content, paragraphs, paragraph_groups)
+    replies = tailor_chunks(
+        chunks, job_title, job_description, on_progress, usage=usage, mode=mode
+    )
+    return _collect_edits(content, groups, replies, mode)
+
+
+async def atailor_paragraphs(
+    content,
+    job_title,
+    job_description,
+    on_progress=None,
+    usage=None,
+    mode=None,
+    paragraphs=None,
+    paragraph_groups=None,
+):
+    """
+    Async version of `tailor_paragraphs`.
+    """
+    mode = mode or get_tailoring_mode()
+    groups, chunks = _paragraph_chunks(content, paragraphs, paragraph_groups)
+    replies = await atailor_chunks(
+        chunks, job_title, job_description, on_progress, usage=usage, mode=mode
+    )
+    return _collect_edits(content, groups, replies, mode)
+
+
+def generate_tailored_resume_with_chunking(
+    master_file, job_title, job_description, output_file
+):
+    """
+    Tailor the master resume to the job and save the result.
+    `master_file` and `output_file` may be paths or binary file-like objects,
+    so the whole pipeline can run on in-memory buffers.
+    """
+    if isinstance(master_file, (str, os.PathLike)):
+        with open(master_file, "rb") as f:
+            master_bytes = f.read()
+    else:
+        master_bytes = master_file.read()
+    content, _ = extract_docx_structure(BytesIO(master_bytes))
+    return generate_tailored_resume(
+        master_bytes, content, job_title, job_description, output_file
+    )
+
+
+def _relevant_paragraphs(content, job_title, job_description):
+    with span("relevance_rank"):
+        sections = rank_sections(content, job_title, job_description)
+    relevant = [
+        idx for section in sections if section["relevant"] for idx in section["paragraphs"]
+    ]
+    return sections, relevant
+
+
+def _write_tailored_resume(master_bytes, edits, output_file):
+    # The master resume is parsed once and cloned for every tailored copy
+    from app.utils.docx_template import get_docx_template
+
+    with span("docx_template"):
+        template = get_docx_template(master_bytes)
+    with span("docx_render"):
+        template.render(output_file, edits)
+
+
+def _reuse_lookup(master_bytes, job_title, job_description, mode):
+    """
+    Look the job up among postings already tailored from the same master
+    resume. Returns (entry, match): `entry` identifies this posting for
+    `_index_edits` (None when reuse is off), and `match` is (edits,
+    similarity) from a near-duplicate posting, or None.
+    """
+    if reuse_index is None:
+        return None, None
+    with span("reuse_lookup"):
+        signature = minhash_signature(f"{job_title}\n{job_description}")
+        if signature is None:
+            return None, None
+        namespace = hash_key(
+            "tailoring-reuse",
+            PROMPT_VERSION,
+            mode,
+            get_model(),
+            hashlib.sha256(master_bytes).hexdigest(),
         )
-        tailored_content.append(response["choices"][0]["message"]["content"])
+        match = reuse_index.query(namespace, signature)
+    if match is None:
+        return (namespace, signature), None
+    pairs, similarity = match
+    return None, ({idx: text for idx, text in pairs}, similarity)
+
+
+def _index_edits(entry, edits, usage):
+    # Edits missing a chunk whose reply was malformed must not be reused
+    if entry is not None and not usage.malformed_replies:
+        # Pairs rather than a dict, so paragraph indices survive JSON
+        reuse_index.add(*entry, sorted(edits.items()))
+
+
+def _tailoring_report(usage, mode, edits, sections, reused_similarity=None):
+    report = usage.to_dict()
+    report.update(
+        {
+            "mode": mode,
+            "editedParagraphs": len(edits),
+            "reusedSimilarity": reused_similarity,
+            "sections": [
+                {key: section[key] for key in ("heading", "score", "relevant")}
+                for section in sections
+            ],
+            "skippedSections": sum(not section["relevant"] for section in sections),
+        }
+    )
+    return report
+
+
+def generate_tailored_resume(
+    master_bytes,
+    content,
+    job_title,
+    job_description,
+    output_file,
+    on_progress=None,
+    paragraph_groups=None,
+):
+    """
+    Same as generate_tailored_resume_with_chunking, for an already loaded
+    master resume (see load_master_resume). The tailored text is written into
+    a copy of the original document, so styles, numbering, sections, headers
+    and footers carry over unchanged. Sections that score below the relevance
+    threshold are left as they are without an LLM call. When the same master
+    resume was already tailored to a near-identical posting (see
+    near_duplicates), its edits are reused instead. Returns a report with
+    token usage and the per-section relevance scores. `paragraph_groups`
+    reuses precomputed chunking when the same resume is tailored repeatedly.
+    """
+    usage = TokenUsage()
+    mode = get_tailoring_mode()
+    sections, relevant = _relevant_paragraphs(content, job_title, job_description)
+    entry, match = _reuse_lookup(master_bytes, job_title, job_description, mode)
+    if match is not None:
+        edits, similarity = match
+        # Nothing left to tailor, as when every section is below the threshold
+        if on_progress:
+            on_progress(0, 0)
+    else:
+        similarity = None
+        with span("tailor"):
+            edits = tailor_paragraphs(
+                content,
+                job_title,
+                job_description,
+                on_progress,
+                usage=usage,
+                mode=mode,
+                paragraphs=relevant,
+                paragraph_groups=paragraph_groups,
+            )
+        _index_edits(entry, edits, usage)
+    _write_tailored_resume(master_bytes, edits, output_file)
+    return _tailoring_report(usage, mode, edits, sections, similarity)
 
-    tailored_doc = Document()
-    apply_formatting(tailored_doc, content, doc_props)
 
-    tailored_doc.save(output_file_path)
\ No newline at end of file
+async def agenerate_tailored_resume(
+    master_bytes,
+    content,
+    job_title,
+    job_description,
+    output_file,
+    on_progress=None,
+    paragraph_groups=None,
+):
+    """
+    Async version of `generate_tailored_resume`. LLM calls run on the event
+    loop; writing the document is CPU-bound and runs in a worker thread.
+    """
+    usage = TokenUsage()
+    mode = get_tailoring_mode()
+    sections, relevant = _relevant_paragraphs(content, job_title, job_description)
+    entry, match = _reuse_lookup(master_bytes, job_title, job_description, mode)
+    if match is not None:
+        edits, similarity = match
+        # Nothing left to tailor, as when every section is below the threshold
+        if on_progress:
+            on_progress(0, 0)
+    else:
+        similarity = None
+        with span("tailor"):
+            edits = await atailor_paragraphs(
+                content,
+                job_title,
+                job_description,
+                on_progress,
+                usage=usage,
+                mode=mode,
+                paragraphs=relevant,
+                paragraph_groups=paragraph_groups,
+            )
+        _index_edits(entry, edits, usage)
+    await asyncio.to_thread(_write_tailored_resume, master_bytes, edits, output_file)
+    return _tailoring_report(usage, mode, edits, sections, similarity)
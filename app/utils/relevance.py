@@ -0,0 +1,71 @@
+import os
+import re
+import math
+from collections import Counter
+
+# Words plus the punctuation that matters in skills: C++, C#, Node.js, CI/CD
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset(
+    """
+    a about an and are as at be by for from has have in into is it its of on
+    or our that the their this to was we were will with you your
+    """.split()
+)
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def get_relevance_threshold():
+    """
+    Sections scoring below RELEVANCE_THRESHOLD (0-1, relative to the best
+    section) are not sent for tailoring. 0 sends everything.
+    """
+    return float(os.getenv("RELEVANCE_THRESHOLD", "0.1"))
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def bm25_scores(documents, query, k1=BM25_K1, b=BM25_B):
+    """
+    BM25 score of every document against the query, with the documents
+    themselves as the corpus. Documents are kept as sparse term counts, so the
+    cost is linear in the number of tokens; only query terms are scored.
+    """
+    term_counts = [Counter(tokenize(doc)) for doc in documents]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    if not documents:
+        return []
+    avg_length = sum(lengths) / len(documents) or 1
+
+    query_terms = set(tokenize(query))
+    doc_freq = Counter(
+        term for counts in term_counts for term in counts.keys() & query_terms
+    )
+    idf = {
+        term: math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+        for term, df in doc_freq.items()
+    }
+
+    scores = []
+    for counts, length in zip(term_counts, lengths):
+        norm = k1 * (1 - b + b * length / avg_length)
+        score = 0.0
+        for term, weight in idf.items():
+            tf = counts.get(term)
+            if tf:
+                score += weight * tf * (k1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def relative_scores(documents, query):
+    """
+    BM25 scores scaled to 0-1 by the best-matching document.
+    """
+    scores = bm25_scores(documents, query)
+    best = max(scores, default=0.0)
+    return [score / best if best else 0.0 for score in scores]
@@ -0,0 +1,135 @@
+import os
+import logging
+from app.utils.file_utils import DOCX_MIMETYPE
+from app.utils.generation import tailored_prefix
+from app.utils.nlp_utils import invalidate_master_resume
+from app.utils.tracing import span
+from app.utils.s3_utils import (
+    delete_objects_from_s3,
+    download_fileobj_from_s3,
+    get_presigned_url,
+    get_s3_client,
+    upload_fileobj_to_s3,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def master_prefix(user_id):
+    return f"{user_id}/master_resume/"
+
+
+def store_master_resume(user_id, fileobj, filename):
+    """
+    Upload a new master resume and remove the user's previous ones.
+    Returns the S3 URL of the upload, or None if it failed.
+    """
+    s3_key = f"{master_prefix(user_id)}{filename}"
+
+    # Stream the new file straight to S3
+    with span("s3_upload"):
+        s3_url = upload_fileobj_to_s3(
+            fileobj, os.getenv("AWS_S3_BUCKET"), s3_key, content_type=DOCX_MIMETYPE
+        )
+    if not s3_url:
+        return None
+    invalidate_master_resume(user_id)
+
+    # Remove any older files in the master_resume folder
+    with span("s3_list"):
+        existing_files = get_s3_client().list_objects_v2(
+            Bucket=os.getenv("AWS_S3_BUCKET"), Prefix=master_prefix(user_id)
+        )
+    old_keys = [
+        obj["Key"] for obj in existing_files.get("Contents", []) if obj["Key"] != s3_key
+    ]
+    if old_keys:
+        with span("s3_delete"):
+            _, errors = delete_objects_from_s3(os.getenv("AWS_S3_BUCKET"), old_keys)
+        if errors:
+            logger.warning("Failed to remove old master resumes: %s", errors)
+    return s3_url
+
+
+def get_master_resume_url(user_id):
+    """
+    Return (pre-signed URL, file name) of the user's master resume, or None
+    if there is none.
+    """
+    with span("s3_list"):
+        response = get_s3_client().list_objects_v2(
+            Bucket=os.getenv("AWS_S3_BUCKET"), Prefix=master_prefix(user_id)
+        )
+    master_resumes = response.get("Contents")
+    if not master_resumes:
+        return None
+
+    # Assume there's only one file in master_resume directory
+    master_file = master_resumes[0]["Key"]
+    pre_signed_url = get_presigned_url(
+        os.getenv("AWS_S3_BUCKET"), master_file, expires_in=3600  # Valid for 1 hour
+    )
+    return pre_signed_url, master_file.split("/")[-1]
+
+
+def list_tailored_resumes(user_id, limit, cursor=None):
+    """
+    Return one page of the user's tailored resumes as
+    ([{"title", "downloadUrl"}], next cursor or None).
+    Raises botocore's PaginationError for an invalid cursor.
+    """
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    pagination_config = {"MaxItems": limit, "PageSize": limit}
+    if cursor:
+        pagination_config["StartingToken"] = cursor
+    with span("s3_list"):
+        page = paginator.paginate(
+            Bucket=os.getenv("AWS_S3_BUCKET"),
+            Prefix=tailored_prefix(user_id),
+            PaginationConfig=pagination_config,
+        ).build_full_result()
+
+    # Only sign URLs for the objects on this page
+    tailored_resumes = []
+    for obj in page.get("Contents", []):
+        key = obj["Key"]
+        pre_signed_url = get_presigned_url(os.getenv("AWS_S3_BUCKET"), key, expires_in=3600)
+        tailored_resumes.append({"title": key.split("/")[-1], "downloadUrl": pre_signed_url})
+    return tailored_resumes, page.get("NextToken")
+
+
+def delete_tailored_resumes(user_id, keys):
+    """
+    Delete tailored resumes by file name with batched DeleteObjects calls.
+    Returns (deleted names, errors) as reported per key by S3, so nothing
+    has to be listed again to confirm the deletion.
+    """
+    prefix = tailored_prefix(user_id)
+    with span("s3_delete"):
+        deleted, errors = delete_objects_from_s3(
+            os.getenv("AWS_S3_BUCKET"), [f"{prefix}{key}" for key in keys]
+        )
+    for error in errors:
+        error["key"] = error["key"][len(prefix) :]
+    return [key[len(prefix) :] for key in deleted], errors
+
+
+def get_tailored_resume_url(user_id, key):
+    """
+    Pre-signed download URL of a tailored resume, by file name.
+    """
+    return get_presigned_url(
+        os.getenv("AWS_S3_BUCKET"), f"{tailored_prefix(user_id)}{key}", expires_in=3600
+    )
+
+
+def load_tailored_resume(user_id, key):
+    """
+    Download a tailored resume by file name. Returns its bytes, or None if it
+    does not exist or could not be read.
+    """
+    with span("s3_download"):
+        tailored_file = download_fileobj_from_s3(
+            os.getenv("AWS_S3_BUCKET"), f"{tailored_prefix(user_id)}{key}"
+        )
+    return tailored_file.read() if tailored_file is not None else None
@@ -1,16 +1,139 @@
-import boto3
 import os
+import time
+import asyncio
+import logging
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from botocore.exceptions import ClientError
+from app.utils.cache_utils import CountingCache, LRUCache
 
-# Initialize S3 client
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=os.getenv("AWS_S3_REGION"),
+logger = logging.getLogger(__name__)
+
+_s3_client = None
+_s3_client_pid = None
+_s3_client_lock = threading.Lock()
+
+_s3_executor = None
+_s3_executor_pid = None
+
+# Most keys a single DeleteObjects request accepts
+MAX_DELETE_BATCH = 1000
+
+# (bucket, key, operation) -> (url, expires_at)
+presigned_url_cache = CountingCache(
+    LRUCache(max_size=int(os.getenv("PRESIGNED_URL_CACHE_SIZE", "10000")))
 )
 
 
+def create_s3_client():
+    """
+    Build an S3 client with a sized connection pool, TCP keep-alive and
+    adaptive retries. Pool size and timeouts can be tuned from the environment.
+    """
+    # boto3 pulls in most of botocore on import, so defer it to the first client
+    import boto3
+    from botocore.config import Config
+
+    config = Config(
+        max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50")),
+        connect_timeout=float(os.getenv("S3_CONNECT_TIMEOUT", "5")),
+        read_timeout=float(os.getenv("S3_READ_TIMEOUT", "30")),
+        tcp_keepalive=True,
+        retries={
+            "max_attempts": int(os.getenv("S3_MAX_ATTEMPTS", "5")),
+            "mode": "adaptive",
+        },
+    )
+    session = boto3.session.Session(
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_S3_REGION"),
+    )
+    return session.client("s3", config=config)
+
+
+def get_s3_client():
+    """
+    Return the S3 client shared by every request in this worker process.
+    It is created on first use and rebuilt after a fork, since connection
+    pools must not be shared between processes.
+    """
+    global _s3_client, _s3_client_pid
+    if _s3_client is None or _s3_client_pid != os.getpid():
+        with _s3_client_lock:
+            if _s3_client is None or _s3_client_pid != os.getpid():
+                _s3_client = create_s3_client()
+                _s3_client_pid = os.getpid()
+    return _s3_client
+
+
+def get_s3_executor():
+    """
+    Thread pool for blocking S3 calls made from async code, sized like the
+    client's connection pool so no thread waits for a connection.
+    """
+    global _s3_executor, _s3_executor_pid
+    if _s3_executor is None or _s3_executor_pid != os.getpid():
+        with _s3_client_lock:
+            if _s3_executor is None or _s3_executor_pid != os.getpid():
+                _s3_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50")),
+                    thread_name_prefix="s3",
+                )
+                _s3_executor_pid = os.getpid()
+    return _s3_executor
+
+
+async def run_s3(func, *args, **kwargs):
+    """
+    Await a blocking S3 helper on the S3 thread pool, keeping the caller's
+    context (request ID, trace) in the worker thread.
+    """
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_s3_executor(), call)
+
+
+def get_presigned_url(bucket_name, s3_key, expires_in=3600, operation="get_object"):
+    """
+    Return a pre-signed URL for an object, reusing a previously signed one
+    while it stays valid for at least PRESIGNED_URL_MIN_VALIDITY seconds
+    (by default half of `expires_in`).
+    :param bucket_name: Name of the S3 bucket.
+    :param s3_key: Key for the file in S3 (e.g., userId/resume.docx).
+    :param expires_in: Validity of newly signed URLs, in seconds.
+    :param operation: Client method the URL is signed for.
+    :return: Pre-signed URL.
+    """
+    min_validity = float(os.getenv("PRESIGNED_URL_MIN_VALIDITY", expires_in / 2))
+    min_validity = min(min_validity, expires_in / 2)
+    cache_key = (bucket_name, s3_key, operation)
+
+    cached = presigned_url_cache.get(
+        cache_key, is_valid=lambda entry: entry[1] - time.time() >= min_validity
+    )
+    if cached is not None:
+        return cached[0]
+
+    expires_at = time.time() + expires_in
+    url = get_s3_client().generate_presigned_url(
+        operation,
+        Params={"Bucket": bucket_name, "Key": s3_key},
+        ExpiresIn=expires_in,
+    )
+    presigned_url_cache.set(cache_key, (url, expires_at))
+    return url
+
+
+def invalidate_presigned_url(bucket_name, s3_key):
+    """
+    Drop cached pre-signed URLs for an object that was overwritten or deleted.
+    """
+    presigned_url_cache.delete((bucket_name, s3_key, "get_object"))
+
+
 def upload_to_s3(file_path, bucket_name, s3_key):
     """
     Upload a file to S3.
@@ -20,11 +143,50 @@ def upload_to_s3(file_path, bucket_name, s3_key):
     :return: Public URL of the uploaded file.
     """
     try:
-        s3_client.upload_file(file_path, bucket_name, s3_key)
+        get_s3_client().upload_file(file_path, bucket_name, s3_key)
+        invalidate_presigned_url(bucket_name, s3_key)
+        s3_url = f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
+        return s3_url
+    except ClientError as e:
+        logger.exception("Error uploading to S3")
+        return None
+
+
+def upload_fileobj_to_s3(fileobj, bucket_name, s3_key, content_type=None):
+    """
+    Stream a file-like object to S3 without writing it to disk.
+    Large bodies are sent as a multipart upload.
+    :param fileobj: Readable binary file-like object.
+    :param bucket_name: Name of the S3 bucket.
+    :param s3_key: Key for the file in S3 (e.g., userId/resume.docx).
+    :param content_type: Optional Content-Type stored with the object.
+    :return: Public URL of the uploaded file.
+    """
+    extra_args = {"ContentType": content_type} if content_type else None
+    try:
+        get_s3_client().upload_fileobj(fileobj, bucket_name, s3_key, ExtraArgs=extra_args)
+        invalidate_presigned_url(bucket_name, s3_key)
         s3_url = f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
         return s3_url
     except ClientError as e:
-        print(f"Error uploading to S3: {e}")
+        logger.exception("Error uploading to S3")
+        return None
+
+
+def download_fileobj_from_s3(bucket_name, s3_key):
+    """
+    Download a file from S3 into memory.
+    :param bucket_name: Name of the S3 bucket.
+    :param s3_key: Key for the file in S3 (e.g., userId/resume.docx).
+    :return: BytesIO positioned at the start of the file, or None on failure.
+    """
+    buffer = BytesIO()
+    try:
+        get_s3_client().download_fileobj(bucket_name, s3_key, buffer)
+        buffer.seek(0)
+        return buffer
+    except ClientError as e:
+        logger.exception("Error downloading from S3")
         return None
 
 
@@ -36,6 +198,46 @@ def delete_from_s3(bucket_name, s3_key):
     :return: None
     """
     try:
-        s3_client.delete_object(Bucket=bucket_name, Key=s3_key)
+        get_s3_client().delete_object(Bucket=bucket_name, Key=s3_key)
+        invalidate_presigned_url(bucket_name, s3_key)
     except ClientError as e:
-        print(f"Error deleting from S3: {e}")
+        logger.exception("Error deleting from S3")
+
+
+def delete_objects_from_s3(bucket_name, s3_keys):
+    """
+    Delete many files from S3 with batched DeleteObjects requests.
+    :param bucket_name: Name of the S3 bucket.
+    :param s3_keys: Keys to delete; sent in batches of up to 1000.
+    :return: (deleted keys, errors), where errors is a list of
+             {"key", "code", "message"} dicts for keys S3 did not delete.
+    """
+    s3_client = get_s3_client()
+    s3_keys = list(dict.fromkeys(s3_keys))
+    deleted, errors = [], []
+    for start in range(0, len(s3_keys), MAX_DELETE_BATCH):
+        batch = s3_keys[start : start + MAX_DELETE_BATCH]
+        try:
+            # Quiet mode: the response only lists the keys that failed
+            response = s3_client.delete_objects(
+                Bucket=bucket_name,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            failed = {
+                error["Key"]: error for error in response.get("Errors", [])
+            }
+        except ClientError as e:
+            logger.exception("Error deleting from S3")
+            code = e.response.get("Error", {}).get("Code", "ClientError")
+            failed = {key: {"Code": code, "Message": str(e)} for key in batch}
+
+        for key in batch:
+            error = failed.get(key)
+            if error is None:
+                deleted.append(key)
+                invalidate_presigned_url(bucket_name, key)
+            else:
+                errors.append(
+                    {"key": key, "code": error.get("Code"), "message": error.get("Message")}
+                )
+    return deleted, errors
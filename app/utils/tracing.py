@@ -0,0 +1,304 @@
+import os
+import io
+import re
+import time
+import uuid
+import bisect
+import pstats
+import cProfile
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers S3 round trips up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Libraries that log every request and retry at DEBUG/INFO
+NOISY_LOGGERS = ("botocore", "boto3", "s3transfer", "urllib3", "openai")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Client IDs end up in log lines and profile file names, so only plain ones are kept
+REQUEST_ID_RE = re.compile(r"[A-Za-z0-9._-]{1,64}")
+PROFILE_HEADER = "X-Profile"
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+trace_var = contextvars.ContextVar("trace", default=None)
+
+
+class Histogram:
+    """
+    Prometheus-style cumulative histogram, one series per label value tuple.
+    """
+
+    def __init__(self, name, help_text, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[idx] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            label_text = _format_labels(self.labelnames, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(
+                    f"{self.name}_bucket{{{label_text + ',' if label_text else ''}{le}}} {cumulative}"
+                )
+            suffix = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+            lines.append(f"{self.name}_sum{suffix} {values[-1]}")
+        return lines
+
+
+class Counter:
+    """
+    Prometheus-style monotonically increasing counter.
+    """
+
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            label_text = _format_labels(self.labelnames, labels)
+            suffix = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{self.name}{suffix} {value}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests.",
+    ("method", "endpoint", "status"),
+)
+stage_seconds = Histogram(
+    "stage_duration_seconds",
+    "Time spent in each stage of request handling and resume generation.",
+    ("stage",),
+)
+llm_request_seconds = Histogram(
+    "llm_request_duration_seconds",
+    "Latency of individual LLM calls, including retries.",
+    ("model", "outcome"),
+)
+llm_tokens = Counter(
+    "llm_tokens_total",
+    "Tokens sent to and received from the LLM.",
+    ("model", "direction"),
+)
+
+llm_rate_limits = Counter(
+    "llm_rate_limited_total",
+    "Rate-limit responses from the LLM provider.",
+    ("model",),
+)
+
+METRICS = (http_request_seconds, stage_seconds, llm_request_seconds, llm_tokens, llm_rate_limits)
+
+
+def render_metrics():
+    """
+    All metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def current_request_id():
+    return request_id_var.get()
+
+
+@contextmanager
+def span(stage, **attributes):
+    """
+    Time a stage: observed in the stage histogram, logged with the request ID
+    and added to the current request's trace.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.observe(elapsed, stage)
+        trace = trace_var.get()
+        if trace is not None:
+            trace.append((stage, elapsed))
+        logger.debug(
+            "stage=%s duration_ms=%.2f %s",
+            stage,
+            elapsed * 1000,
+            " ".join(f"{key}={value}" for key, value in attributes.items()),
+        )
+
+
+def observe_llm_call(model, elapsed, outcome, usage=None):
+    llm_request_seconds.observe(elapsed, model, outcome)
+    if usage:
+        llm_tokens.inc(usage.get("prompt_tokens", 0), model, "in")
+        llm_tokens.inc(usage.get("completion_tokens", 0), model, "out")
+
+
+def observe_rate_limit(model):
+    llm_rate_limits.inc(1, model)
+
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """
+    `executor.submit` that runs `fn` in a copy of the caller's context, so
+    spans in worker threads keep the request ID and trace.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Adds the current request ID to every record as `request_id` ("-" outside
+    a request), so any module's log lines can be tied to their request.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+def configure_logging(level="INFO", library_level="WARNING"):
+    """
+    Configure logging for the process: `level` for the root logger and
+    `library_level` for chatty third-party loggers such as botocore. Every
+    line carries the ID of the request it was logged for.
+    """
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s %(name)s request_id=%(request_id)s: %(message)s"
+    )
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in root.handlers:
+        if not any(isinstance(f, RequestIdFilter) for f in handler.filters):
+            handler.addFilter(RequestIdFilter())
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(library_level)
+
+
+def profiling_enabled():
+    return os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def begin_request(request_id=None):
+    """
+    Start tracing a request: set its ID and an empty trace. A new ID is made
+    when none is given or the given one is not a plain token (REQUEST_ID_RE).
+    Set on every request, so values never leak from a previous one.
+    Returns the request ID.
+    """
+    if not request_id or not REQUEST_ID_RE.fullmatch(request_id) or request_id in (".", ".."):
+        request_id = uuid.uuid4().hex
+    request_id_var.set(request_id)
+    trace_var.set([])
+    return request_id
+
+
+def end_request(method, endpoint, path, status, elapsed):
+    """
+    Record a finished request in the request histogram and log its stages.
+    """
+    http_request_seconds.observe(elapsed, method, endpoint, status)
+    logger.info(
+        "%s %s status=%s duration_ms=%.2f stages=%s",
+        method,
+        path,
+        status,
+        elapsed * 1000,
+        ",".join(
+            f"{stage}:{seconds * 1000:.1f}ms" for stage, seconds in trace_var.get() or []
+        ),
+    )
+
+
+def init_tracing(app):
+    """
+    Give every request an ID (taken from X-Request-ID when present), time it,
+    and log its stage breakdown. With PROFILING_ENABLED set, a request sent
+    with `X-Profile: 1` is run under cProfile and its stats are written to
+    PROFILE_DIR/<request id>.prof, with the top functions logged.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def start_trace():
+        begin_request(request.headers.get(REQUEST_ID_HEADER))
+        g.request_start = time.perf_counter()
+        g.profiler = None
+        if profiling_enabled() and request.headers.get(PROFILE_HEADER):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_trace(response):
+        if "request_start" not in g:
+            return response
+        request_id = request_id_var.get()
+        end_request(
+            request.method,
+            request.url_rule.rule if request.url_rule else "unmatched",
+            request.path,
+            response.status_code,
+            time.perf_counter() - g.request_start,
+        )
+        response.headers[REQUEST_ID_HEADER] = request_id
+        profiler = g.profiler
+        if profiler is not None:
+            # Streamed bodies run after this hook, so stop once the body is sent
+            response.call_on_close(lambda: _save_profile(profiler, request_id))
+        return response
+
+
+def _save_profile(profiler, request_id):
+    profiler.disable()
+    directory = os.getenv("PROFILE_DIR", ".cache/profiles")
+    os.makedirs(directory, exist_ok=True)
+    # begin_request only lets through IDs that are safe as file names
+    path = os.path.join(directory, f"{os.path.basename(request_id)}.prof")
+    profiler.dump_stats(path)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(20)
+    logger.info("request_id=%s profile=%s\n%s", request_id, path, summary.getvalue())
@@ -0,0 +1,141 @@
+"""
+The sync Flask app (threaded werkzeug server) against the aiohttp app in
+app/async_app.py, on moto's in-memory S3 and the stub LLM. Fires
+`--requests` POST /generate-resume calls at once, polls every job until it
+finishes and reports the wall time and the most jobs in flight at once.
+
+    python -m benchmarks.bench_async_serving --requests 200 --latency 0.2
+"""
+import argparse
+import asyncio
+import logging
+import os
+import threading
+import time
+
+import aiohttp
+from aiohttp import web
+from moto import mock_aws
+from werkzeug.serving import make_server
+
+from app.utils import nlp_utils, s3_utils
+from benchmarks.corpus import build_docx
+from benchmarks.stubs import StubLLM
+
+BUCKET = "bench-bucket"
+USER_ID = "bench"
+HOST = "127.0.0.1"
+
+
+def serve_flask(port):
+    from app import create_app
+
+    server = make_server(HOST, port, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown
+
+
+def serve_aiohttp(port):
+    from app.async_app import create_async_app
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(create_async_app(), access_log=None)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, HOST, port).start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    def shutdown():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return shutdown
+
+
+async def generate(session, base_url, i, in_flight):
+    headers = {"userId": USER_ID}
+    async with session.post(
+        f"{base_url}/generate-resume",
+        headers=headers,
+        json={
+            "jobTitle": f"Backend Engineer {i}",
+            "jobDescription": f"Team {i}: python, flask and aws services, api latency.",
+        },
+    ) as response:
+        assert response.status == 202, await response.text()
+        job_id = (await response.json())["jobId"]
+
+    in_flight[0] += 1
+    in_flight[1] = max(in_flight[1], in_flight[0])
+    try:
+        while True:
+            async with session.get(f"{base_url}/jobs/{job_id}", headers=headers) as response:
+                job = await response.json()
+            if job["status"] in ("succeeded", "failed"):
+                return job["status"]
+            await asyncio.sleep(0.05)
+    finally:
+        in_flight[0] -= 1
+
+
+async def drive(base_url, requests):
+    # [currently in flight, peak]
+    in_flight = [0, 0]
+    connector = aiohttp.TCPConnector(limit=requests)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        statuses = await asyncio.gather(
+            *(generate(session, base_url, i, in_flight) for i in range(requests))
+        )
+        elapsed = time.perf_counter() - start
+    return elapsed, statuses.count("succeeded"), in_flight[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    os.environ.update(
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_S3_REGION="us-east-1",
+        AWS_S3_BUCKET=BUCKET,
+    )
+    nlp_utils.tailoring_cache = None
+    nlp_utils.reuse_index = None
+    stub = StubLLM(latency=args.latency)
+    restore = stub.install()
+    results = {}
+    try:
+        with mock_aws():
+            client = s3_utils.get_s3_client()
+            client.create_bucket(Bucket=BUCKET)
+            client.put_object(
+                Bucket=BUCKET,
+                Key=f"{USER_ID}/master_resume/resume.docx",
+                Body=build_docx(args.pages),
+            )
+            for port, (label, serve) in enumerate(
+                (("flask (sync)", serve_flask), ("aiohttp (async)", serve_aiohttp)), 18700
+            ):
+                nlp_utils.invalidate_master_resume(USER_ID)
+                shutdown = serve(port)
+                try:
+                    results[label] = asyncio.run(drive(f"http://{HOST}:{port}", args.requests))
+                finally:
+                    shutdown()
+    finally:
+        restore()
+
+    for label, (elapsed, succeeded, peak) in results.items():
+        print(f"{label:16} {elapsed:7.2f}s for {args.requests} generations, "
+              f"{succeeded} succeeded, peak {peak} in flight")
+    sync_time, async_time = results["flask (sync)"][0], results["aiohttp (async)"][0]
+    print(f"speedup: {sync_time / async_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
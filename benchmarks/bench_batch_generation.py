@@ -0,0 +1,104 @@
+"""
+N sequential generate_resume_for_user calls against one batch of N
+(generate_resumes_for_user), on moto's in-memory S3 and the stub LLM.
+Reports wall time and the S3 requests each approach makes.
+
+    python -m benchmarks.bench_batch_generation --jobs 20 --latency 0.2
+"""
+import argparse
+import os
+import time
+from collections import Counter
+
+from moto import mock_aws
+
+from app.utils import generation, nlp_utils, s3_utils
+from benchmarks.corpus import build_docx
+from benchmarks.stubs import StubLLM
+
+BUCKET = "bench-bucket"
+USER_ID = "bench"
+
+
+def make_jobs(count):
+    return [
+        {
+            "jobTitle": f"Backend Engineer {i}",
+            "jobDescription": f"Team {i}: python, flask and aws services, api latency.",
+        }
+        for i in range(count)
+    ]
+
+
+def count_s3_calls(client):
+    calls = Counter()
+
+    def record(model, **kwargs):
+        calls[model.name] += 1
+
+    client.meta.events.register("before-call.s3", record)
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    os.environ.update(
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_S3_REGION="us-east-1",
+        AWS_S3_BUCKET=BUCKET,
+    )
+    nlp_utils.tailoring_cache = None
+    nlp_utils.reuse_index = None
+    stub = StubLLM(latency=args.latency)
+    restore = stub.install()
+    jobs = make_jobs(args.jobs)
+    try:
+        with mock_aws():
+            client = s3_utils.get_s3_client()
+            client.create_bucket(Bucket=BUCKET)
+            client.put_object(
+                Bucket=BUCKET,
+                Key=f"{USER_ID}/master_resume/resume.docx",
+                Body=build_docx(args.pages),
+            )
+            calls = count_s3_calls(client)
+
+            nlp_utils.invalidate_master_resume(USER_ID)
+            start = time.perf_counter()
+            for job in jobs:
+                generation.generate_resume_for_user(
+                    USER_ID, job["jobTitle"], job["jobDescription"]
+                )
+            sequential_time = time.perf_counter() - start
+            sequential_calls, sequential_llm = dict(calls), stub.calls
+            calls.clear()
+
+            nlp_utils.invalidate_master_resume(USER_ID)
+            start = time.perf_counter()
+            results = list(
+                generation.generate_resumes_for_user(
+                    USER_ID, jobs, max_workers=args.concurrency
+                )
+            )
+            batch_time = time.perf_counter() - start
+            batch_calls, batch_llm = dict(calls), stub.calls - sequential_llm
+    finally:
+        restore()
+
+    assert all(result["status"] == "succeeded" for result in results), results
+    print(f"sequential x{args.jobs}: {sequential_time:6.2f}s, "
+          f"{sequential_llm} LLM calls, S3 {sequential_calls}")
+    print(f"batch of {args.jobs}:     {batch_time:6.2f}s, "
+          f"{batch_llm} LLM calls, S3 {batch_calls}")
+    print(f"speedup: {sequential_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
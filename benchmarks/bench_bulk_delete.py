@@ -0,0 +1,89 @@
+"""
+Deleting tailored resumes against moto's in-memory S3 (pip install moto)
+seeded with a few thousand tailored resumes per user. Compares the old
+delete-then-relist-the-prefix handler, called once per key, with the
+DELETE /tailored-resumes bulk endpoint.
+
+    python -m benchmarks.bench_bulk_delete --objects 3000 --deletes 200
+"""
+import argparse
+import logging
+import os
+import time
+
+from moto import mock_aws
+
+BUCKET = "bench-bucket"
+
+
+def legacy_delete(s3_client, user_id, key):
+    s3_key = f"{user_id}/tailored/{key}"
+    s3_client.delete_object(Bucket=BUCKET, Key=s3_key)
+    response = s3_client.list_objects_v2(Bucket=BUCKET, Prefix=f"{user_id}/tailored/")
+    remaining_files = [obj["Key"] for obj in response.get("Contents", [])]
+    if s3_key in remaining_files:
+        raise Exception("File deletion failed.")
+
+
+def seed(s3_client, user_id, objects):
+    for i in range(objects):
+        s3_client.put_object(Bucket=BUCKET, Key=f"{user_id}/tailored/Job_{i:05d}.docx", Body=b"PK")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=3000)
+    parser.add_argument("--deletes", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.update(
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_S3_REGION="us-east-1",
+        AWS_S3_BUCKET=BUCKET,
+    )
+    keys = [f"Job_{i:05d}.docx" for i in range(args.deletes)]
+    with mock_aws():
+        from app import create_app
+        from app.utils.s3_utils import get_s3_client
+
+        logging.disable(logging.DEBUG)
+        s3_client = get_s3_client()
+        s3_client.create_bucket(Bucket=BUCKET)
+        seed(s3_client, "legacy", args.objects)
+        seed(s3_client, "bench", args.objects)
+
+        start = time.perf_counter()
+        for key in keys:
+            legacy_delete(s3_client, "legacy", key)
+        legacy_time = time.perf_counter() - start
+
+        client = create_app().test_client()
+        start = time.perf_counter()
+        single = client.delete(
+            f"/delete-tailored-resume?key={keys[0]}", headers={"userId": "bench"}
+        )
+        single_time = time.perf_counter() - start
+        assert single.status_code == 200, single.json
+
+        start = time.perf_counter()
+        bulk = client.delete(
+            "/tailored-resumes", headers={"userId": "bench"}, json={"keys": keys[1:]}
+        ).json
+        bulk_time = time.perf_counter() - start
+
+        remaining = client.get(
+            "/get-tailored-resumes?limit=1000", headers={"userId": "bench"}
+        ).json
+        first_left = remaining["resumes"][0]["title"] if remaining["resumes"] else None
+
+    print(f"legacy handler x{args.deletes}: {legacy_time * 1000:9.2f} ms "
+          f"({legacy_time / args.deletes * 1000:.2f} ms/key, relists {args.objects} objects)")
+    print(f"single delete:        {single_time * 1000:9.2f} ms (no relist)")
+    print(f"bulk delete x{len(keys) - 1}:    {bulk_time * 1000:9.2f} ms, "
+          f"{len(bulk['deleted'])} deleted, {len(bulk['errors'])} errors; "
+          f"first remaining: {first_left}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Compare sequential chunk tailoring with the concurrent engine.
+
+    python -m benchmarks.bench_chunk_tailoring --chunks 8 --latency 0.25
+"""
+import argparse
+import random
+import time
+
+from app.utils import llm_utils
+from benchmarks.stubs import StubLLM
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    latencies = {
+        f"chunk {i}": args.latency * random.uniform(0.5, 1.5) for i in range(args.chunks)
+    }
+    stub = StubLLM(latency=lambda prompt: latencies[prompt])
+    restore = stub.install()
+    try:
+        prompts = list(latencies)
+
+        start = time.perf_counter()
+        sequential = [llm_utils.complete(prompt) for prompt in prompts]
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = llm_utils.complete_all(prompts, max_workers=args.concurrency)
+        concurrent_time = time.perf_counter() - start
+    finally:
+        restore()
+
+    assert sequential == concurrent == prompts, "results out of order"
+    print(f"chunks:               {args.chunks}")
+    print(f"sum of latencies:     {sum(latencies.values()):.3f}s")
+    print(f"slowest chunk:        {max(latencies.values()):.3f}s")
+    print(f"sequential:           {sequential_time:.3f}s")
+    print(f"concurrent (cap={args.concurrency}): {concurrent_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
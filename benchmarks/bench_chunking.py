@@ -0,0 +1,31 @@
+"""
+Compare the character-based chunk_text with the token-aware paragraph chunker.
+
+    python -m benchmarks.bench_chunking
+"""
+import timeit
+
+from app.utils import nlp_utils
+from benchmarks import legacy_extractors
+from benchmarks.corpus import synthetic_resume
+
+
+def main():
+    for pages in (10, 100):
+        content = synthetic_resume(pages)
+        text = "\n".join(p["text"] for p in content)
+
+        legacy = timeit.Timer(lambda: legacy_extractors.chunk_text(text)).repeat(3, 5)
+        paragraph = timeit.Timer(
+            lambda: list(nlp_utils.chunk_paragraphs(content))
+        ).repeat(3, 5)
+
+        print(f"{pages:>3} pages, {len(text.split())} words")
+        print(f"    chunk_text:       {min(legacy) / 5 * 1000:8.2f} ms"
+              f" ({len(legacy_extractors.chunk_text(text))} chunks)")
+        print(f"    chunk_paragraphs: {min(paragraph) / 5 * 1000:8.2f} ms"
+              f" ({len(list(nlp_utils.chunk_paragraphs(content)))} chunks)")
+
+
+if __name__ == "__main__":
+    main()
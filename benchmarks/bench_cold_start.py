@@ -0,0 +1,96 @@
+"""
+Worker cold start: the time to import the app and build it with create_app,
+then the latency of the first /health request, each measured in a fresh
+interpreter. "eager" reproduces the old start-up (boto3, openai and
+python-docx imported up front, the S3 client built at import and DEBUG
+logging on the root logger); "lazy" is the current factory. The slowest
+imports of the lazy start-up come from `python -X importtime`.
+
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+EAGER_PRELUDE = """
+import logging
+logging.basicConfig(level=logging.DEBUG)
+import boto3, openai, docx
+from app.utils.s3_utils import get_s3_client
+get_s3_client()
+"""
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+{prelude}
+from app import create_app
+app = create_app()
+ready = time.perf_counter()
+response = app.test_client().get("/health")
+assert response.status_code == 200
+done = time.perf_counter()
+print(ready - start, done - ready)
+"""
+
+
+def run(prelude, extra_args=()):
+    env = dict(
+        os.environ,
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_S3_REGION="us-east-1",
+    )
+    result = subprocess.run(
+        [sys.executable, *extra_args, "-c", SCRIPT.format(prelude=prelude)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    startup, first_request = map(float, result.stdout.split()[-2:])
+    return startup, first_request, result.stderr
+
+
+def slowest_imports(importtime_log, top):
+    """
+    Parse `-X importtime` output into the `top` (cumulative us, module) pairs.
+    """
+    imports = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = (part.strip() for part in line[len("import time:"):].split("|"))
+        imports.append((int(cumulative), module))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    for label, prelude in (("eager", EAGER_PRELUDE), ("lazy", "")):
+        samples = [run(prelude)[:2] for _ in range(args.runs)]
+        results[label] = (
+            statistics.median(startup for startup, _ in samples),
+            statistics.median(first for _, first in samples),
+        )
+
+    for label, (startup, first_request) in results.items():
+        print(f"{label:5}  import + create_app: {startup * 1000:8.1f} ms   "
+              f"first request: {first_request * 1000:6.1f} ms")
+    print(f"start-up speedup: {results['eager'][0] / results['lazy'][0]:.1f}x")
+
+    _, _, importtime_log = run("", ("-X", "importtime"))
+    print("\nslowest imports (lazy, cumulative):")
+    for cumulative, module in slowest_imports(importtime_log, args.top):
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Tailored .docx documents assembled per second: python-docx (parse the master
+resume, apply the edits, save every part) against the pre-parsed template
+(clone the document part, apply the edits, zip it up with the other parts as
+they were), and the same for plain-text documents built on the blank
+template. Then assembles documents for many requests at once and checks that
+every output holds exactly its own request's text.
+
+    python -m benchmarks.bench_docx_assembly --sizes small,medium --seconds 3
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from docx import Document
+
+from app.utils.docx_extract import parse_docx
+from app.utils.docx_rewrite import apply_paragraph_edits
+from app.utils.docx_template import DocxTemplate, get_docx_template, template_cache
+from app.utils.generate_docx import generate_docx
+from benchmarks.corpus import CORPUS_SIZES, build_docx
+
+
+def make_edits(master_bytes, tag):
+    tree = parse_docx(BytesIO(master_bytes), include_sections=False)
+    return {
+        idx: f"{para.text} ({tag})"
+        for idx, para in enumerate(tree.paragraphs)
+        if para.style == "List Bullet" and idx % 3 == 0
+    }
+
+
+def legacy_tailored(master_bytes, edits):
+    doc = Document(BytesIO(master_bytes))
+    apply_paragraph_edits(doc, edits)
+    output = BytesIO()
+    doc.save(output)
+    return output
+
+
+def template_tailored(master_bytes, edits):
+    output = BytesIO()
+    get_docx_template(master_bytes).render(output, edits)
+    return output
+
+
+def legacy_plain(text):
+    doc = Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    output = BytesIO()
+    doc.save(output)
+    return output
+
+
+def rate(func, seconds):
+    func()  # Warm up caches
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        func()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def texts(output):
+    return [para.text for para in parse_docx(BytesIO(output.getvalue()), False).paragraphs]
+
+
+def check_same_output(master_bytes, edits):
+    legacy = texts(legacy_tailored(master_bytes, edits))
+    assert texts(template_tailored(master_bytes, edits)) == legacy, "outputs differ"
+
+
+def check_no_collisions(master_bytes, requests, workers):
+    """
+    Assemble one document per request on `workers` threads, half from the
+    master resume and half as plain text, and check each holds only its tag.
+    """
+    def assemble(n):
+        tag = f"request-{n}"
+        if n % 2:
+            return tag, generate_docx(f"Tailored for {tag}\nSecond line")
+        return tag, template_tailored(master_bytes, {3: f"Tailored for {tag}"})
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(assemble, range(requests)))
+
+    outputs = {id(output) for _, output in results}
+    assert len(outputs) == requests, "requests shared an output buffer"
+    for tag, output in results:
+        found = [text for text in texts(output) if "request-" in text]
+        assert found == [f"Tailored for {tag}"], f"{tag} got {found}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="small,medium")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    for size in args.sizes.split(","):
+        master_bytes = build_docx(CORPUS_SIZES[size])
+        edits = make_edits(master_bytes, "tailored")
+        check_same_output(master_bytes, edits)
+
+        legacy = rate(lambda: legacy_tailored(master_bytes, edits), args.seconds)
+        template = rate(lambda: template_tailored(master_bytes, edits), args.seconds)
+        template_cache.clear()
+        cold = rate(lambda: DocxTemplate(master_bytes).render(BytesIO(), edits), args.seconds)
+        print(f"{size:8} tailored  python-docx {legacy:8.1f}/s  template {template:8.1f}/s "
+              f"({template / legacy:.1f}x)  template parsed every time {cold:8.1f}/s")
+
+    text = "\n".join(f"Line {n} of the tailored resume" for n in range(60))
+    legacy = rate(lambda: legacy_plain(text), args.seconds)
+    blank = rate(lambda: generate_docx(text), args.seconds)
+    print(f"{'':8} plain     python-docx {legacy:8.1f}/s  template {blank:8.1f}/s "
+          f"({blank / legacy:.1f}x)")
+
+    check_no_collisions(build_docx(CORPUS_SIZES["small"]), args.requests, args.workers)
+    print(f"{args.requests} concurrent requests on {args.workers} threads: no shared outputs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Parse time and peak Python memory of the single-pass extractor against the
+three DOCX walkers it replaced, on large multi-section resumes.
+
+    python -m benchmarks.bench_docx_extract --pages 20 100
+"""
+import argparse
+import io
+import time
+import tracemalloc
+
+from docx import Document
+from docx.enum.section import WD_SECTION
+from docx.shared import Pt
+
+from app.utils import extract_formatting, file_utils, nlp_utils
+from benchmarks import legacy_extractors
+from benchmarks.corpus import synthetic_resume
+
+
+def build_multi_section_docx(pages):
+    doc = Document()
+    for idx, para in enumerate(synthetic_resume(pages)):
+        if para["style"] == "Heading 1" and idx > 2:
+            doc.add_section(WD_SECTION.NEW_PAGE)
+        paragraph = doc.add_paragraph(style=para["style"])
+        head, _, tail = para["text"].partition(" ")
+        run = paragraph.add_run(head + " ")
+        run.bold = True
+        run = paragraph.add_run(tail)
+        run.font.size = Pt(10.5)
+        run.font.name = "Calibri"
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def measure(func, data, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(io.BytesIO(data))
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(io.BytesIO(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+PAIRS = (
+    ("nlp_utils.extract_docx_structure",
+     legacy_extractors.nlp_utils_extract_docx_structure, nlp_utils.extract_docx_structure),
+    ("file_utils.extract_docx_structure",
+     legacy_extractors.file_utils_extract_docx_structure, file_utils.extract_docx_structure),
+    ("extract_text_with_formatting",
+     legacy_extractors.extract_text_with_formatting,
+     extract_formatting.extract_text_with_formatting),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 100])
+    args = parser.parse_args()
+
+    for pages in args.pages:
+        data = build_multi_section_docx(pages)
+        print(f"{pages} pages, {len(data) / 1024:.0f} KB")
+        for name, legacy, current in PAIRS:
+            assert legacy(io.BytesIO(data)) == current(io.BytesIO(data)), name
+            legacy_time, legacy_peak = measure(legacy, data)
+            current_time, current_peak = measure(current, data)
+            print(f"  {name:36s} {legacy_time * 1000:8.1f} ms -> {current_time * 1000:7.1f} ms, "
+                  f"peak {legacy_peak / 2**20:6.1f} MB -> {current_peak / 2**20:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Per-request cost of the old disk-based generation path (presigned URL,
+HTTP download, NamedTemporaryFile, local save, upload_file) against the
+in-memory pipeline, on moto's in-memory S3 (pip install moto) and the stub
+LLM. Also checks that the in-memory path leaves nothing in the temp dir.
+
+    python -m benchmarks.bench_generation_pipeline --requests 20
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import requests
+from moto import mock_aws
+
+from app.utils import nlp_utils, s3_utils
+from benchmarks.corpus import build_docx
+from benchmarks.stubs import StubLLM
+
+BUCKET = "bench-bucket"
+MASTER_KEY = "bench/master_resume/resume.docx"
+
+
+def legacy_request(client, output_dir):
+    url = client.generate_presigned_url(
+        "get_object", Params={"Bucket": BUCKET, "Key": MASTER_KEY}, ExpiresIn=3600
+    )
+    response = requests.get(url)
+    with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as temp_file:
+        temp_file.write(response.content)
+        local_path = temp_file.name
+    output_path = os.path.join(output_dir, "Tailored_Resume.docx")
+    nlp_utils.generate_tailored_resume_with_chunking(local_path, "Eng", "Python", output_path)
+    client.upload_file(output_path, BUCKET, "bench/legacy.docx")
+    os.remove(output_path)
+    return local_path
+
+
+def in_memory_request():
+    master_file = s3_utils.download_fileobj_from_s3(BUCKET, MASTER_KEY)
+    output = io.BytesIO()
+    nlp_utils.generate_tailored_resume_with_chunking(master_file, "Eng", "Python", output)
+    output.seek(0)
+    s3_utils.upload_fileobj_to_s3(output, BUCKET, "bench/in_memory.docx")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.update(
+        AWS_ACCESS_KEY_ID="testing", AWS_SECRET_ACCESS_KEY="testing", AWS_S3_REGION="us-east-1"
+    )
+    restore = StubLLM().install()
+    try:
+        with mock_aws(), tempfile.TemporaryDirectory() as output_dir:
+            client = s3_utils.get_s3_client()
+            client.create_bucket(Bucket=BUCKET)
+            client.put_object(Bucket=BUCKET, Key=MASTER_KEY, Body=build_docx(args.pages))
+
+            leaked = []
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                leaked.append(legacy_request(client, output_dir))
+            legacy_time = (time.perf_counter() - start) / args.requests
+            for path in leaked:
+                os.remove(path)
+
+            before = set(os.listdir(tempfile.gettempdir()))
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                in_memory_request()
+            in_memory_time = (time.perf_counter() - start) / args.requests
+            left_behind = set(os.listdir(tempfile.gettempdir())) - before
+    finally:
+        restore()
+
+    print(f"legacy:    {legacy_time * 1000:7.2f} ms/request "
+          f"({len(leaked)} temp files leaked)")
+    print(f"in-memory: {in_memory_time * 1000:7.2f} ms/request "
+          f"({len(left_behind)} temp files left behind)")
+    print(f"saved:     {(legacy_time - in_memory_time) * 1000:7.2f} ms/request")
+    assert not left_behind, f"in-memory pipeline left files behind: {left_behind}"
+
+
+if __name__ == "__main__":
+    main()
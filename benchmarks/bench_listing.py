@@ -0,0 +1,87 @@
+"""
+/get-tailored-resumes against moto's in-memory S3 (pip install moto) seeded
+with a master resume and many tailored resumes for one user. Compares the
+old list-everything-and-sign-everything handler with the paginated one.
+
+    python -m benchmarks.bench_listing --objects 10000 --limit 50
+"""
+import argparse
+import logging
+import os
+import time
+
+from moto import mock_aws
+
+BUCKET = "bench-bucket"
+
+
+def legacy_listing(s3_client, user_id):
+    response = s3_client.list_objects_v2(Bucket=BUCKET, Prefix=f"{user_id}/")
+    resumes = []
+    for obj in response.get("Contents", []):
+        if "master_resume" not in obj["Key"]:
+            url = s3_client.generate_presigned_url(
+                "get_object", Params={"Bucket": BUCKET, "Key": obj["Key"]}, ExpiresIn=3600
+            )
+            resumes.append({"title": obj["Key"].split("/")[-1], "downloadUrl": url})
+    return resumes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.update(
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_S3_REGION="us-east-1",
+        AWS_S3_BUCKET=BUCKET,
+    )
+    with mock_aws():
+        from app import create_app
+        from app.utils.s3_utils import get_s3_client
+
+        logging.disable(logging.DEBUG)
+        s3_client = get_s3_client()
+        s3_client.create_bucket(Bucket=BUCKET)
+        s3_client.put_object(Bucket=BUCKET, Key="bench/master_resume/resume.docx", Body=b"PK")
+        for i in range(args.objects):
+            s3_client.put_object(Bucket=BUCKET, Key=f"bench/tailored/Job_{i:05d}.docx", Body=b"PK")
+            s3_client.put_object(Bucket=BUCKET, Key=f"legacy/Job_{i:05d}.docx", Body=b"PK")
+        s3_client.put_object(Bucket=BUCKET, Key="legacy/master_resume/resume.docx", Body=b"PK")
+
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            legacy = legacy_listing(s3_client, "legacy")
+        legacy_time = (time.perf_counter() - start) / args.requests
+
+        client = create_app().test_client()
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            page = client.get(
+                f"/get-tailored-resumes?limit={args.limit}", headers={"userId": "bench"}
+            ).json
+        paged_time = (time.perf_counter() - start) / args.requests
+
+        # Walk every page once to confirm nothing is truncated
+        seen, cursor = 0, ""
+        while True:
+            page = client.get(
+                f"/get-tailored-resumes?limit=1000&cursor={cursor}", headers={"userId": "bench"}
+            ).json
+            seen += len(page["resumes"])
+            cursor = page["nextCursor"]
+            if not cursor:
+                break
+
+    print(f"legacy handler:    {legacy_time * 1000:8.2f} ms/request, "
+          f"{len(legacy)} of {args.objects} resumes returned")
+    print(f"paginated handler: {paged_time * 1000:8.2f} ms/request for a page of "
+          f"{args.limit}; {seen} of {args.objects} resumes reachable via cursors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+One heavy user and a few light users calling the LLM at once against a stub
+that enforces its own requests- and tokens-per-minute limits. Compares
+dispatching without the scheduler (limits off: every caller sends right away
+and retries on 429s) with the scheduler's shared token buckets and fair
+share, reporting 429s, failures and how long the light users waited.
+
+    python -m benchmarks.bench_llm_scheduler --rpm 600 --heavy 80 --light-users 4
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from app.utils import llm_scheduler, llm_utils
+from benchmarks.stubs import StubLLM
+
+PROMPT = "Tailor this resume bullet to the job: built python services on aws " * 4
+
+
+def run_user(user_id, calls, concurrency, durations, failures):
+    llm_scheduler.set_llm_user(user_id)
+    start = time.perf_counter()
+    try:
+        llm_utils.complete_all([PROMPT] * calls, max_workers=concurrency, max_tokens=100)
+    except Exception:
+        failures[user_id] = failures.get(user_id, 0) + 1
+    durations[user_id] = time.perf_counter() - start
+
+
+def scenario(args, scheduled):
+    os.environ.update(
+        LLM_RPM=str(args.rpm if scheduled else 0),
+        LLM_TPM=str(args.tpm if scheduled else 0),
+        LLM_RATE_LIMIT_BURST=str(args.burst),
+        LLM_RATE_LIMIT_DB=os.path.join(tempfile.mkdtemp(), "limits.db"),
+        LLM_MAX_IN_FLIGHT=str(args.in_flight if scheduled else 10000),
+    )
+    # Rebuild the scheduler and limiter from the environment above
+    llm_scheduler._singletons_pid = None
+
+    stub = StubLLM(latency=args.latency, rpm=args.rpm, tpm=args.tpm, burst_seconds=args.burst)
+    restore = stub.install()
+    durations, failures = {}, {}
+    try:
+        threads = [
+            threading.Thread(
+                target=run_user, args=("heavy", args.heavy, args.concurrency, durations, failures)
+            )
+        ]
+        threads[0].start()
+        # Light users arrive once the heavy user has used up the burst
+        time.sleep(args.light_delay)
+        for i in range(args.light_users):
+            thread = threading.Thread(
+                target=run_user,
+                args=(f"light-{i}", args.light_calls, args.concurrency, durations, failures),
+            )
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+    finally:
+        restore()
+
+    light = [seconds for user, seconds in durations.items() if user != "heavy"]
+    return {
+        "calls": stub.calls,
+        "429s": stub.rate_limited,
+        "failed users": len(failures),
+        "heavy s": durations["heavy"],
+        "light p50 s": statistics.median(light),
+        "light max s": max(light),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--tpm", type=int, default=150000)
+    parser.add_argument("--burst", type=float, default=1.0, help="seconds of rate per bucket")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--heavy", type=int, default=80, help="calls from the heavy user")
+    parser.add_argument("--concurrency", type=int, default=8, help="threads per user")
+    parser.add_argument("--light-users", type=int, default=4)
+    parser.add_argument("--light-calls", type=int, default=3)
+    parser.add_argument("--light-delay", type=float, default=0.5)
+    parser.add_argument("--in-flight", type=int, default=8)
+    args = parser.parse_args()
+
+    os.environ.update(LLM_MAX_RETRIES="20", LLM_BACKOFF_BASE="0.05", LLM_BACKOFF_MAX="1")
+    results = {
+        "unscheduled": scenario(args, scheduled=False),
+        "scheduled": scenario(args, scheduled=True),
+    }
+
+    print(f"{'':12}" + "".join(f"{name:>14}" for name in results["scheduled"]))
+    for label, result in results.items():
+        print(f"{label:12}" + "".join(f"{value:14.2f}" if isinstance(value, float)
+                                       else f"{value:14}" for value in result.values()))
+
+
+if __name__ == "__main__":
+    main()
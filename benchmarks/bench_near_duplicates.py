@@ -0,0 +1,184 @@
+"""
+Near-duplicate job description lookups. Indexes synthetic job postings, then
+measures lookup latency against the full index and checks accuracy:
+re-posts that differ only in boilerplate (company blurb, equal-opportunity
+text, benefits), whitespace or a word or two must match their original, and
+different jobs from the same company must not.
+
+    python -m benchmarks.bench_near_duplicates --entries 100000 --queries 1000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.utils.near_duplicates import NearDuplicateIndex, minhash_signature
+
+SKILLS = (
+    "python go java typescript rust sql postgres redis kafka spark airflow aws gcp "
+    "azure kubernetes docker terraform react graphql grpc flask django fastapi "
+    "pytorch pandas snowflake dbt linux ci/cd observability security networking"
+).split()
+VERBS = (
+    "design build own operate scale migrate optimize maintain review mentor "
+    "automate monitor debug document ship integrate"
+).split()
+OBJECTS = (
+    "backend services data pipelines internal tools public apis billing systems "
+    "search infrastructure deployment tooling customer dashboards ml platforms "
+    "storage layers event streams reporting jobs authentication flows"
+).split()
+TITLES = ("Backend Engineer", "Data Engineer", "Platform Engineer", "ML Engineer")
+
+BLURBS = (
+    "About {company}\n\n{company} helps teams everywhere move faster. We are a "
+    "remote-first company of {size} people backed by leading investors.",
+    "About us: {company} is on a mission to make software simple for everyone, "
+    "with {size} employees across four continents.",
+    "Who we are\n\nAt {company} we believe great tools change how people work. "
+    "Founded ten years ago, we now serve {size} thousand customers.",
+)
+EEO = (
+    "{company} is an equal opportunity employer. All qualified applicants will "
+    "receive consideration without regard to race, religion, sex, sexual "
+    "orientation, gender identity, national origin, disability or veteran status.",
+    "We are proud to be an EEO employer and provide reasonable accommodation to "
+    "applicants with disabilities.",
+    "Equal Opportunity\n\nWe celebrate diversity and are committed to an "
+    "inclusive environment for all employees.",
+)
+BENEFITS = (
+    "Benefits\n\n- Health, dental and vision\n- Home office budget\n- Flexible hours",
+    "What we offer\n\n- Equity\n- Learning budget\n- 25 days of vacation",
+    "",
+)
+
+
+def core_sentences(rng, count):
+    return [
+        f"You will {rng.choice(VERBS)} {rng.choice(OBJECTS)} using "
+        f"{', '.join(rng.sample(SKILLS, 3))} and {rng.choice(SKILLS)}."
+        for _ in range(count)
+    ]
+
+
+def posting(rng, title, sentences, requirements, company):
+    size = rng.randint(20, 900)
+    parts = [
+        title,
+        rng.choice(BLURBS).format(company=company, size=size),
+        "About the role\n\n" + " ".join(sentences),
+        "Requirements\n\n" + "\n".join(requirements),
+        rng.choice(BENEFITS),
+        rng.choice(EEO).format(company=company),
+    ]
+    return "\n\n".join(part for part in parts if part)
+
+
+def make_job(rng, idx):
+    return {
+        "title": rng.choice(TITLES),
+        "sentences": core_sentences(rng, rng.randint(6, 12)),
+        "requirements": [
+            f"- {rng.randint(2, 8)}+ years of {rng.choice(SKILLS)}" for _ in range(4)
+        ],
+        "company": f"Company{idx % 5000}",
+    }
+
+
+def signature(job, text):
+    return minhash_signature(f"{job['title']}\n{text}")
+
+
+def repost(rng, job):
+    """
+    The same job posted again: other boilerplate, whitespace and case, and
+    sometimes a word changed.
+    """
+    sentences = list(job["sentences"])
+    if rng.random() < 0.5:
+        idx = rng.randrange(len(sentences))
+        words = sentences[idx].split()
+        words[rng.randrange(2, len(words) - 1)] = rng.choice(SKILLS)
+        sentences[idx] = " ".join(words)
+    text = posting(rng, job["title"], sentences, job["requirements"], job["company"])
+    if rng.random() < 0.5:
+        text = "  ".join(text.split(" ")).upper()
+    return text
+
+
+def sibling(rng, job):
+    """
+    A different job at the same company: same boilerplate, half the duties.
+    """
+    sentences = job["sentences"][: len(job["sentences"]) // 2]
+    sentences += core_sentences(rng, len(job["sentences"]) - len(sentences))
+    return posting(rng, job["title"], sentences, job["requirements"], job["company"])
+
+
+def percentile(values, pct):
+    return sorted(values)[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = NearDuplicateIndex(threshold=args.threshold, max_entries=args.entries)
+    jobs = [make_job(rng, idx) for idx in range(args.entries)]
+
+    start = time.perf_counter()
+    for idx, job in enumerate(jobs):
+        text = posting(
+            rng, job["title"], job["sentences"], job["requirements"], job["company"]
+        )
+        index.add("bench", signature(job, text), idx)
+    build_seconds = time.perf_counter() - start
+    print(f"indexed {len(index)} postings in {build_seconds:.1f}s "
+          f"({build_seconds / len(index) * 1e6:.0f} us each)")
+
+    sampled = rng.sample(range(len(jobs)), min(args.queries, len(jobs)))
+    signature_us, lookup_us = [], []
+    found = wrong = false_matches = 0
+    similarities = []
+    for idx in sampled:
+        job = jobs[idx]
+        for kind, text in (("repost", repost(rng, job)), ("sibling", sibling(rng, job))):
+            start = time.perf_counter()
+            query = signature(job, text)
+            signed = time.perf_counter()
+            match = index.query("bench", query)
+            done = time.perf_counter()
+            signature_us.append((signed - start) * 1e6)
+            lookup_us.append((done - signed) * 1e6)
+
+            if kind == "repost":
+                if match is not None and match[0] == idx:
+                    found += 1
+                    similarities.append(match[1])
+                elif match is not None:
+                    wrong += 1
+            elif match is not None:
+                false_matches += 1
+
+    queries = len(sampled)
+    print(f"signature  p50 {statistics.median(signature_us):8.1f} us  "
+          f"p99 {percentile(signature_us, 99):8.1f} us")
+    print(f"lookup     p50 {statistics.median(lookup_us):8.1f} us  "
+          f"p99 {percentile(lookup_us, 99):8.1f} us")
+    print(f"reposts found {found}/{queries} ({found / queries:.1%}), "
+          f"matched the wrong posting {wrong}, "
+          f"median similarity {statistics.median(similarities) if similarities else 0:.2f}")
+    print(f"different jobs matched {false_matches}/{queries}")
+
+    assert found >= 0.95 * queries, "near-duplicate reposts must be found"
+    assert wrong == 0 and false_matches == 0, "different jobs must not match"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+PDF rendering throughput: many tailored resumes rendered one after another
+in this process, against the same resumes submitted at once to the
+render pool (started and warmed first), then again from the PDF cache.
+
+    python -m benchmarks.bench_pdf_render --resumes 64 --pages 2 --workers 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import build_docx
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=64)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    os.environ["PDF_RENDER_WORKERS"] = str(args.workers)
+    from app.utils import generate_pdf
+
+    documents = [build_docx(args.pages, seed=seed) for seed in range(args.resumes)]
+
+    # Load reportlab and the styles first, like a pre-warmed worker
+    generate_pdf.render_pdf(documents[0])
+    start = time.perf_counter()
+    serial = [generate_pdf.render_pdf(document) for document in documents]
+    serial_time = time.perf_counter() - start
+
+    # Wait for every worker to start before timing
+    pool = generate_pdf.get_pdf_pool()
+    for future in [pool.submit(os.getpid) for _ in range(args.workers * 4)]:
+        future.result()
+    start = time.perf_counter()
+    # Concurrent requests, each waiting on its own render
+    with ThreadPoolExecutor(max_workers=args.resumes) as executor:
+        pooled = list(executor.map(generate_pdf.docx_to_pdf, documents))
+    pooled_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for document in documents:
+        generate_pdf.docx_to_pdf(document)
+    cached_time = time.perf_counter() - start
+    assert pooled == serial, "pool and in-process renders differ"
+
+    average_kb = sum(map(len, serial)) / len(serial) / 1024
+    print(f"{args.resumes} resumes of {args.pages} pages, {average_kb:.1f} KB PDF each")
+    print(f"in process:         {serial_time:7.2f}s  {args.resumes / serial_time:7.1f} resumes/s")
+    print(f"pool ({args.workers:2} workers):  {pooled_time:7.2f}s  "
+          f"{args.resumes / pooled_time:7.1f} resumes/s  "
+          f"({serial_time / pooled_time:.1f}x)")
+    print(f"cached:             {cached_time:7.3f}s  {args.resumes / cached_time:7.0f} resumes/s")
+    print(f"cache: {generate_pdf.pdf_cache.stats()}")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+CPU time per /get-tailored-resumes request with and without the pre-signed
+URL cache, against moto's in-memory S3 (pip install moto). The list call
+itself costs the same in both runs; the difference is SigV4 signing.
+
+    python -m benchmarks.bench_presigned_urls --objects 200 --limit 100
+"""
+import argparse
+import logging
+import os
+import time
+
+from moto import mock_aws
+
+from app.utils.cache_utils import LRUCache
+
+BUCKET = "bench-bucket"
+
+
+def cpu_per_request(client, limit, requests):
+    start = time.process_time()
+    for _ in range(requests):
+        client.get(f"/get-tailored-resumes?limit={limit}", headers={"userId": "bench"})
+    return (time.process_time() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ.update(
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_S3_REGION="us-east-2",  # SigV4 pre-signing, as in production
+        AWS_S3_BUCKET=BUCKET,
+    )
+    with mock_aws():
+        from app import create_app
+        from app.utils import s3_utils
+
+        logging.disable(logging.DEBUG)
+        s3_client = s3_utils.get_s3_client()
+        s3_client.create_bucket(
+            Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": "us-east-2"}
+        )
+        for i in range(args.objects):
+            s3_client.put_object(Bucket=BUCKET, Key=f"bench/tailored/Job_{i:05d}.docx", Body=b"PK")
+        client = create_app().test_client()
+
+        # A zero-size backend forces a fresh signature on every lookup
+        cache_backend = s3_utils.presigned_url_cache.backend
+        s3_utils.presigned_url_cache.backend = LRUCache(max_size=0)
+        uncached = cpu_per_request(client, args.limit, args.requests)
+
+        s3_utils.presigned_url_cache.backend = cache_backend
+        s3_utils.presigned_url_cache.hits = s3_utils.presigned_url_cache.misses = 0
+        cached = cpu_per_request(client, args.limit, args.requests)
+        stats = s3_utils.presigned_url_cache.stats()
+
+    print(f"without cache: {uncached * 1000:7.2f} ms CPU/request")
+    print(f"with cache:    {cached * 1000:7.2f} ms CPU/request (hit rate {stats['hit_rate']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+LLM calls and tokens avoided by the local relevance pre-ranking, on a sample
+resume that mixes job-relevant experience with sections unrelated to the
+posting (contact details, education, publications, hobbies, references).
+
+    python -m benchmarks.bench_relevance --pages 4 --threshold 0.1
+"""
+import argparse
+import random
+import time
+
+from app.utils import nlp_utils
+from app.utils.llm_utils import TokenUsage
+from benchmarks.corpus import synthetic_resume
+from benchmarks.stubs import StubLLM
+
+JOB_TITLE = "Backend Engineer"
+JOB_DESCRIPTION = (
+    "Design and operate scalable Python and Flask services on AWS. "
+    "Own API latency and reliability, automate testing and deployment to "
+    "Kubernetes, and mentor the team."
+)
+
+UNRELATED_WORDS = (
+    "thesis seminar coursework honors chamber orchestra marathon hiking "
+    "photography volunteer shelter chess club tutoring poetry anthology "
+    "gardening ceramics referee soccer league choir travel"
+).split()
+
+
+def sample_resume(pages, seed=0):
+    rng = random.Random(seed)
+    content = synthetic_resume(pages, seed)
+    for heading in ("Education", "Publications", "Hobbies", "Volunteering", "References"):
+        content.append({"text": heading, "style": "Heading 1"})
+        for _ in range(30):
+            words = rng.choices(UNRELATED_WORDS, k=rng.randint(12, 30))
+            content.append({"text": " ".join(words).capitalize() + ".", "style": "Normal"})
+    return content
+
+
+def run(content, threshold):
+    sections = nlp_utils.rank_sections(content, JOB_TITLE, JOB_DESCRIPTION, threshold)
+    relevant = [idx for s in sections if s["relevant"] for idx in s["paragraphs"]]
+    nlp_utils.tailoring_cache = None
+    stub = StubLLM()
+    restore = stub.install()
+    usage = TokenUsage()
+    try:
+        start = time.perf_counter()
+        nlp_utils.tailor_paragraphs(
+            content, JOB_TITLE, JOB_DESCRIPTION, usage=usage, mode="full",
+            paragraphs=relevant,
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        restore()
+    return sections, usage.to_dict(), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    content = sample_resume(args.pages)
+    start = time.perf_counter()
+    nlp_utils.rank_sections(content, JOB_TITLE, JOB_DESCRIPTION, args.threshold)
+    print(f"ranking {len(content)} paragraphs: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    _, baseline, _ = run(content, 0.0)
+    sections, ranked, _ = run(content, args.threshold)
+    for section in sections:
+        print(f"  {section['score']:.3f} {'tailor' if section['relevant'] else 'skip  '} "
+              f"{section['heading']}")
+    print(f"no pre-ranking: {baseline}")
+    print(f"pre-ranking:    {ranked}")
+    print(f"LLM calls avoided: {baseline['llmCalls'] - ranked['llmCalls']} "
+          f"of {baseline['llmCalls']}, prompt tokens avoided: "
+          f"{1 - ranked['promptTokens'] / baseline['promptTokens']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Per-request boto3 client construction vs the shared pooled client, against
+moto's in-memory S3 (pip install moto).
+
+    python -m benchmarks.bench_s3_client --requests 200
+"""
+import argparse
+import os
+import time
+
+import boto3
+from moto import mock_aws
+
+from app.utils import s3_utils
+
+BUCKET = "bench-bucket"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_S3_REGION", "us-east-1")
+
+    with mock_aws():
+        s3_utils.get_s3_client().create_bucket(Bucket=BUCKET)
+        s3_utils.get_s3_client().put_object(
+            Bucket=BUCKET, Key="user/master_resume/resume.docx", Body=b"PK"
+        )
+
+        def per_request():
+            client = boto3.client(
+                "s3",
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                region_name=os.getenv("AWS_S3_REGION"),
+            )
+            client.list_objects_v2(Bucket=BUCKET, Prefix="user/master_resume/")
+
+        def shared():
+            s3_utils.get_s3_client().list_objects_v2(
+                Bucket=BUCKET, Prefix="user/master_resume/"
+            )
+
+        for name, handler in (("per-request client", per_request), ("shared client", shared)):
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                handler()
+            elapsed = time.perf_counter() - start
+            print(f"{name:20s} {elapsed / args.requests * 1000:7.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
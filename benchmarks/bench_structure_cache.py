@@ -0,0 +1,47 @@
+"""
+Cost of loading a master resume with and without the parsed-structure cache.
+
+    python -m benchmarks.bench_structure_cache --pages 10
+"""
+import argparse
+import io
+import time
+
+from app.utils import nlp_utils
+from benchmarks.corpus import build_docx
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    master_bytes = build_docx(args.pages)
+    fetches = 0
+
+    def fetch():
+        nonlocal fetches
+        fetches += 1
+        return io.BytesIO(master_bytes)
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        nlp_utils.extract_docx_structure(fetch())
+    uncached = (time.perf_counter() - start) / args.requests
+
+    fetches = 0
+    nlp_utils.invalidate_master_resume("bench")
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        nlp_utils.load_master_resume("bench", '"etag-1"', fetch)
+    cached = (time.perf_counter() - start) / args.requests
+
+    print(f"parse every request: {uncached * 1000:7.2f} ms/request")
+    print(f"structure cache:     {cached * 1000:7.2f} ms/request "
+          f"({fetches} fetch+parse for {args.requests} requests, "
+          f"{nlp_utils.structure_cache.total_bytes} bytes cached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Count stub-LLM invocations for repeated tailoring of the same job posting.
+
+    python -m benchmarks.bench_tailoring_cache --repeats 5
+"""
+import argparse
+import time
+
+from app.utils import nlp_utils
+from app.utils.cache_utils import CountingCache, LRUCache
+from benchmarks.stubs import StubLLM
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    nlp_utils.tailoring_cache = CountingCache(LRUCache(max_size=1024))
+    stub = StubLLM(latency=args.latency)
+    restore = stub.install()
+    chunks = [f"Experience bullet set {i}" for i in range(args.chunks)]
+    try:
+        for repeat in range(args.repeats):
+            # Same posting with cosmetic whitespace/case differences.
+            title = "Backend Engineer" if repeat % 2 else "  backend   engineer "
+            start = time.perf_counter()
+            nlp_utils.tailor_chunks(chunks, title, "Python, Flask and AWS.")
+            elapsed = time.perf_counter() - start
+            print(f"run {repeat + 1}: {elapsed:.3f}s, LLM calls so far: {stub.calls}")
+    finally:
+        restore()
+
+    assert stub.calls == args.chunks, "cache hits must not reach the LLM"
+    print(f"cache: {nlp_utils.tailoring_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Token accounting for the full-rewrite and paragraph-delta tailoring
+protocols, against a deterministic stub model. Both protocols must produce
+exactly the same paragraph edits; the script fails otherwise.
+
+    python -m benchmarks.bench_token_usage --pages 3
+"""
+import argparse
+import json
+import re
+
+from app.utils import nlp_utils
+from app.utils.llm_utils import TokenUsage
+from benchmarks.corpus import synthetic_resume
+from benchmarks.stubs import StubLLM
+
+JOB_TITLE = "Backend Engineer"
+# Long enough to be condensed once in delta mode
+JOB_DESCRIPTION = " ".join(
+    [
+        "We are a fast-growing company building products customers love.",
+        "You will design scalable Python and Flask services on AWS,",
+        "own reliability and latency of our API, and mentor the team.",
+        "We offer competitive benefits, remote work and a learning budget.",
+    ]
+    * 8
+)
+JOB_SUMMARY = "python, flask, aws, scalable services, api latency, reliability, mentoring"
+
+LINE_RE = re.compile(r"^\s*\[(\d+)\]\s?(.*)$", re.MULTILINE)
+
+
+def rewrite(text):
+    # Deterministic "tailoring": only bullets mentioning python change
+    return text.replace("python", "Python (Flask, AWS)") if "python" in text else text
+
+
+def stub_reply(prompt):
+    if prompt.lstrip().startswith("Condense this job posting"):
+        return JOB_SUMMARY
+    paragraphs = [(int(m.group(1)), m.group(2)) for m in LINE_RE.finditer(prompt)]
+    if '{"edits"' in prompt:
+        edits = [
+            {"id": idx, "text": rewrite(text)}
+            for idx, text in paragraphs
+            if rewrite(text) != text
+        ]
+        return json.dumps({"edits": edits})
+    return "\n".join(f"[{idx}] {rewrite(text)}" for idx, text in paragraphs)
+
+
+def run(content, mode):
+    nlp_utils.tailoring_cache = None
+    stub = StubLLM(reply=stub_reply)
+    restore = stub.install()
+    usage = TokenUsage()
+    try:
+        edits = nlp_utils.tailor_paragraphs(
+            content, JOB_TITLE, JOB_DESCRIPTION, usage=usage, mode=mode
+        )
+    finally:
+        restore()
+    return edits, usage.to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=3)
+    args = parser.parse_args()
+
+    content = synthetic_resume(args.pages)
+    full_edits, full_usage = run(content, "full")
+    delta_edits, delta_usage = run(content, "delta")
+
+    print(f"paragraphs: {len(content)}, edited: {len(full_edits)}")
+    for mode, usage in (("full", full_usage), ("delta", delta_usage)):
+        print(f"{mode:>5}: {usage}")
+    saved = 1 - delta_usage["totalTokens"] / full_usage["totalTokens"]
+    print(f"delta protocol saves {saved:.0%} of tokens")
+
+    assert full_edits, "the stub should change some paragraphs"
+    assert delta_edits == full_edits, "protocols disagree on the edits"
+
+
+if __name__ == "__main__":
+    main()
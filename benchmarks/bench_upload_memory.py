@@ -0,0 +1,126 @@
+"""
+Peak Python memory for /upload-resume, against moto's in-memory S3
+(pip install moto). Request bodies are generated as they are read, so only
+the server's memory is measured. The upload is kept in memory rather than
+spooled to a temporary file, so at most one capped request body is ever
+held; oversized requests are rejected at that cap, whether they declare a
+Content-Length or are sent chunked.
+
+    python -m benchmarks.bench_upload_memory
+"""
+import io
+import os
+import tracemalloc
+
+from moto import mock_aws
+
+BUCKET = "bench-bucket"
+MIMETYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+BOUNDARY = "bench-boundary"
+MB = 1024 * 1024
+
+# boto3 and moto's in-process S3 copy the body while storing it
+S3_READ_BUFFER = 8 * MB
+
+
+class MultipartBody(io.RawIOBase):
+    """
+    A multipart/form-data body with a `size`-byte .docx-like file, produced
+    chunk by chunk as it is read.
+    """
+
+    def __init__(self, size):
+        self.head = (
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="resume"; filename="resume.docx"\r\n'
+            f"Content-Type: {MIMETYPE}\r\n\r\n"
+        ).encode() + b"PK\x03\x04"
+        self.tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+        self.length = len(self.head) + size - 4 + len(self.tail)
+        self.position = 0
+        self.filler = os.urandom(64 * 1024)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.length}
+        self.position = base[whence] + offset
+        return self.position
+
+    def readinto(self, buffer):
+        remaining = self.length - self.position
+        count = min(len(buffer), remaining, len(self.filler))
+        if count <= 0:
+            return 0
+        start, end = self.position, self.position + count
+        body_end = self.length - len(self.tail)
+        chunk = bytearray(self.filler[:count])
+        # Overlay the head and tail where this chunk overlaps them
+        if start < len(self.head):
+            piece = self.head[start:end]
+            chunk[: len(piece)] = piece
+        if end > body_end:
+            offset = max(start, body_end)
+            chunk[offset - start :] = self.tail[offset - body_end : end - body_end]
+        buffer[:count] = chunk
+        self.position = end
+        return count
+
+
+def upload(client, size, chunked=False):
+    body = MultipartBody(size)
+    headers = {
+        "userId": "bench",
+        "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+    }
+    extra = {}
+    if chunked:
+        # What a WSGI server passes on for Transfer-Encoding: chunked; the
+        # header also hides the Content-Length the test client adds
+        headers["Transfer-Encoding"] = "chunked"
+        extra["environ_overrides"] = {"wsgi.input_terminated": True}
+    tracemalloc.start()
+    response = client.post(
+        "/upload-resume", headers=headers, input_stream=io.BufferedReader(body), **extra
+    )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return response.status_code, peak
+
+
+def main():
+    os.environ.update(
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_S3_REGION="us-east-1",
+        AWS_S3_BUCKET=BUCKET,
+    )
+    with mock_aws():
+        from app import create_app
+        from app.routes import MAX_RESUME_REQUEST_SIZE
+        from app.utils.s3_utils import get_s3_client
+
+        get_s3_client().create_bucket(Bucket=BUCKET)
+        client = create_app().test_client()
+        # Load botocore models and moto state before measuring
+        upload(client, MB // 2)
+
+        for chunked in (False, True):
+            for size, expected in ((MB // 2, 200), (2 * MB - 1024, 200), (64 * MB, 400)):
+                status, peak = upload(client, size, chunked)
+                kind = "chunked" if chunked else "sized"
+                print(f"{kind:8} {size / MB:7.2f} MB upload -> {status}, "
+                      f"peak traced memory {peak / MB:6.2f} MB")
+                assert status == expected, f"{kind} {size} byte upload got {status}"
+                # One capped body, with room for its buffer growing, plus the
+                # S3 copy for an accepted one, however large the request
+                bound = 2 * MAX_RESUME_REQUEST_SIZE + (S3_READ_BUFFER if status == 200 else 0)
+                assert peak < bound, f"{kind} {size} byte upload held {peak} bytes"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import io
+import random
+
+from docx import Document
+
+# Pages per generated resume for the load test corpora
+CORPUS_SIZES = {"small": 1, "medium": 5, "large": 60}
+
+WORDS = (
+    "designed built led migrated optimized scalable services python flask aws "
+    "pipelines reduced latency customers revenue team mentored deployed kubernetes "
+    "analytics dashboards automated testing reliability database queries api"
+).split()
+
+
+def synthetic_resume(pages, seed=0):
+    """
+    Paragraph structure (as returned by extract_docx_structure) for a resume
+    of roughly `pages` pages: headings followed by bullets and prose.
+    """
+    rng = random.Random(seed)
+    content = [{"text": "Jane Doe", "style": "Title"},
+               {"text": "jane@example.com | (555) 010-0000", "style": "Normal"}]
+    for page in range(pages):
+        content.append({"text": f"Experience {page + 1}", "style": "Heading 1"})
+        for _ in range(12):
+            words = rng.choices(WORDS, k=rng.randint(12, 40))
+            content.append({"text": "- " + " ".join(words).capitalize() + ".",
+                            "style": "List Bullet"})
+    return content
+
+
+def build_docx(pages, seed=0):
+    """
+    A .docx of `synthetic_resume(pages, seed)`, as bytes.
+    """
+    doc = Document()
+    for para in synthetic_resume(pages, seed):
+        doc.add_paragraph(para["text"], style=para["style"])
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,126 @@
+"""
+Code that app/ has replaced, kept for comparison benchmarks: the DOCX
+walkers as they were before app.utils.docx_extract, and the character-count
+chunker that nlp_utils.chunk_paragraphs replaced.
+"""
+from docx import Document
+
+
+def file_utils_extract_docx_structure(file_path):
+    """
+    Extract text and formatting from a .docx file.
+    """
+    doc = Document(file_path)
+    content = []
+
+    for para in doc.paragraphs:
+        if not para.runs:  # Skip paragraphs with no runs
+            content.append(
+                {"text": para.text, "style": para.style.name}
+            )  # Basic info for empty runs
+            continue
+
+        for run in para.runs:
+            content.append(
+                {
+                    "text": run.text,  # Use run text instead of paragraph text for finer granularity
+                    "style": para.style.name,
+                    "font_name": run.font.name if run.font and run.font.name else None,
+                    "font_size": run.font.size.pt
+                    if run.font and run.font.size
+                    else None,
+                    "bold": run.bold if run else False,
+                    "italic": run.italic if run else False,
+                    "underline": run.underline if run else False,
+                }
+            )
+
+    return content
+
+
+def nlp_utils_extract_docx_structure(file_path):
+    doc = Document(file_path)
+    content = []
+
+    doc_props = {
+        "headers": [
+            {"text": section.header.paragraphs[0].text if section.header.paragraphs else ""}
+            for section in doc.sections
+        ],
+        "footers": [
+            {"text": section.footer.paragraphs[0].text if section.footer.paragraphs else ""}
+            for section in doc.sections
+        ],
+        "section_props": [
+            {
+                "page_width": section.page_width.twips,
+                "page_height": section.page_height.twips,
+                "left_margin": section.left_margin.twips,
+                "right_margin": section.right_margin.twips,
+                "top_margin": section.top_margin.twips,
+                "bottom_margin": section.bottom_margin.twips,
+                "header_distance": section.header_distance.twips,
+                "footer_distance": section.footer_distance.twips,
+            }
+            for section in doc.sections
+        ],
+    }
+
+    for para in doc.paragraphs:
+        para_props = {
+            "text": para.text,
+            "style": para.style.name,
+            "alignment": para.paragraph_format.alignment,
+            # Not in the original; matches the flag nlp_utils added since
+            "has_hyperlink": bool(para.hyperlinks),
+            "runs": [
+                {
+                    "text": run.text,
+                    "bold": run.bold,
+                    "italic": run.italic,
+                    "underline": run.underline,
+                    "font_name": run.font.name,
+                    "font_size": run.font.size.pt if run.font.size else None,
+                }
+                for run in para.runs
+            ],
+        }
+        content.append(para_props)
+
+    return content, doc_props
+
+
+def extract_text_with_formatting(docx_path: str) -> str:
+    """
+    Extract text and formatting (font size, bold, etc.) from a Word document (.docx).
+    """
+    doc = Document(docx_path)
+    formatted_text = ""
+
+    for para in doc.paragraphs:
+        for run in para.runs:  # Each run is a piece of text with a consistent style
+            font_size = run.font.size
+            text = run.text
+            is_bold = run.bold
+            formatted_text += f"[Font Size: {font_size}, Bold: {is_bold}] {text}\n"
+
+    return formatted_text
+
+
+def chunk_text(text, max_tokens=1000):
+    """
+    Chunk text into parts that fit within the token limit.
+    """
+    words = text.split()
+    chunks = []
+    current_chunk = []
+
+    for word in words:
+        if len(" ".join(current_chunk)) + len(word) + 1 > max_tokens:
+            chunks.append(" ".join(current_chunk))
+            current_chunk = []
+        current_chunk.append(word)
+
+    if current_chunk:
+        chunks.append(" ".join(current_chunk))
+    return chunks
@@ -0,0 +1,299 @@
+"""
+Offline load test of every API route. Boots create_app() against moto's
+in-memory S3 and the stub LLM, uploads small, medium and large generated
+resumes, then drives each route from `--concurrency` threads and prints a
+JSON report (latency percentiles, throughput, errors, peak RSS and LLM call
+counts) that can be saved and compared between commits.
+
+    python -m benchmarks.load_test --concurrency 8 --requests 40 --llm-latency 0.05 > before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from moto import mock_aws
+
+from benchmarks.corpus import CORPUS_SIZES, build_docx
+from benchmarks.stubs import StubLLM
+
+BUCKET = "load-test-bucket"
+DOCX_MIMETYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+JOB_DESCRIPTION = (
+    "Build scalable Python and Flask services on AWS, reduce API latency, "
+    "automate testing and mentor the team."
+)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+class Recorder:
+    """
+    Latencies and error counts per route label, shared by all worker threads.
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.elapsed = {}
+        self._lock = threading.Lock()
+
+    def record(self, label, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(label, []).append(seconds)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+    def report(self):
+        routes = {}
+        for label, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            wall = self.elapsed.get(label)
+            routes[label] = {
+                "requests": len(values),
+                "errors": self.errors.get(label, 0),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+                "throughput_rps": round(len(values) / wall, 2) if wall else None,
+            }
+        return routes
+
+
+def timed(recorder, label, func, *args, expect=None, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = func(*args, **kwargs)
+        ok = response.status_code in expect if expect else response.status_code < 400
+        body = response.get_data()  # Drain streamed bodies inside the timing
+    except Exception as e:
+        print(f"{label} failed: {e}", file=sys.stderr)
+        response, ok, body = None, False, b""
+    recorder.record(label, time.perf_counter() - start, ok)
+    return response, body
+
+
+def run_phase(app, recorder, label, count, concurrency, operation):
+    """
+    Call `operation(client, i)` `count` times from `concurrency` threads,
+    each with its own test client.
+    """
+    local = threading.local()
+
+    def worker(i):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        operation(local.client, i)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(count)))
+    recorder.elapsed[label] = time.perf_counter() - start
+
+
+def upload(recorder, label, client, user_id, docx_bytes):
+    return timed(
+        recorder,
+        label,
+        client.post,
+        "/upload-resume",
+        headers={"userId": user_id},
+        data={"resume": (io.BytesIO(docx_bytes), "resume.docx", DOCX_MIMETYPE)},
+    )
+
+
+def generate(recorder, size, client, user_id, i):
+    response, _ = timed(
+        recorder,
+        f"POST /generate-resume [{size}]",
+        client.post,
+        "/generate-resume",
+        headers={"userId": user_id},
+        json={"jobTitle": f"Engineer {size} {i}", "jobDescription": JOB_DESCRIPTION},
+    )
+    if response is None or response.status_code != 202:
+        return
+    job_id = response.get_json()["jobId"]
+    # The event stream only ends once the job has finished
+    timed(
+        recorder,
+        f"GET /jobs/<id>/events [{size}]",
+        client.get,
+        f"/jobs/{job_id}/events",
+        headers={"userId": user_id},
+    )
+    response, _ = timed(
+        recorder, "GET /jobs/<id>", client.get, f"/jobs/{job_id}", headers={"userId": user_id}
+    )
+    if response is not None and response.get_json()["status"] != "succeeded":
+        recorder.record(f"POST /generate-resume [{size}]", 0.0, False)
+
+
+def download(recorder, label, client, user_id, key, output_format):
+    # Stored .docx files redirect to S3; PDFs are rendered and sent back
+    return timed(
+        recorder,
+        label,
+        client.get,
+        f"/download-tailored-resume?key={key}&format={output_format}",
+        headers={"userId": user_id},
+        expect=(302,) if output_format == "docx" else (200,),
+    )
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40, help="per route")
+    parser.add_argument("--generations", type=int, default=8, help="per corpus size")
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--sizes", default=",".join(CORPUS_SIZES))
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    os.environ.update(
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_S3_REGION="us-east-2",
+        AWS_S3_BUCKET=BUCKET,
+    )
+    sizes = args.sizes.split(",")
+    corpora = {size: build_docx(CORPUS_SIZES[size], seed=i) for i, size in enumerate(sizes)}
+    users = [f"load-user-{n}" for n in range(args.concurrency)]
+    recorder = Recorder()
+    stub = StubLLM(latency=args.llm_latency)
+    restore = stub.install()
+
+    # Keep stdout for the report; the app prints progress as it works
+    try:
+        with mock_aws(), contextlib.redirect_stdout(sys.stderr):
+            from app import create_app
+            from app.utils.s3_utils import get_s3_client
+
+            get_s3_client().create_bucket(
+                Bucket=BUCKET,
+                CreateBucketConfiguration={"LocationConstraint": "us-east-2"},
+            )
+            app = create_app()
+            count, conc = args.requests, args.concurrency
+
+            for label, path, expect in (
+                ("GET /", "/", None),
+                ("GET /health", "/health", None),
+                ("GET /cache-stats", "/cache-stats", None),
+                ("GET /static/uploads/<filename>", "/static/uploads/missing.docx", (404,)),
+            ):
+                run_phase(app, recorder, label, count, conc,
+                          lambda client, i, label=label, path=path, expect=expect:
+                          timed(recorder, label, client.get, path, expect=expect))
+
+            llm_calls = {}
+            for size in sizes:
+                label = f"POST /upload-resume [{size}]"
+                run_phase(app, recorder, label, count, conc,
+                          lambda client, i, label=label, size=size:
+                          upload(recorder, label, client, users[i % len(users)], corpora[size]))
+
+                run_phase(app, recorder, "GET /get-master-resume", count, conc,
+                          lambda client, i: timed(
+                              recorder, "GET /get-master-resume", client.get,
+                              "/get-master-resume", headers={"userId": users[i % len(users)]}))
+
+                calls_before = stub.calls
+                run_phase(app, recorder, f"POST /generate-resume [{size}]", args.generations, conc,
+                          lambda client, i, size=size:
+                          generate(recorder, size, client, users[i % len(users)], i))
+
+                label = f"POST /generate-resumes/batch [{size}]"
+                jobs = [
+                    {"jobTitle": f"Batch {size} {n}", "jobDescription": JOB_DESCRIPTION}
+                    for n in range(args.batch_size)
+                ]
+                run_phase(app, recorder, label, max(1, args.generations // args.batch_size), conc,
+                          lambda client, i, label=label, jobs=jobs: timed(
+                              recorder, label, client.post, "/generate-resumes/batch",
+                              headers={"userId": users[i % len(users)]}, json={"jobs": jobs}))
+                llm_calls[size] = stub.calls - calls_before
+
+            run_phase(app, recorder, "GET /get-tailored-resumes", count, conc,
+                      lambda client, i: timed(
+                          recorder, "GET /get-tailored-resumes", client.get,
+                          "/get-tailored-resumes?limit=50",
+                          headers={"userId": users[i % len(users)]}))
+
+            # Resumes made by the generate phases: "Engineer <size> <n>" for users[n]
+            def tailored(i):
+                n = i % args.generations
+                size = sizes[i // args.generations % len(sizes)]
+                return users[n % len(users)], f"Engineer_{size}_{n}_Tailored_Resume.docx"
+
+            for output_format in ("docx", "pdf"):
+                label = f"GET /download-tailored-resume [{output_format}]"
+                run_phase(app, recorder, label, count, conc,
+                          lambda client, i, label=label, output_format=output_format:
+                          download(recorder, label, client, *tailored(i), output_format))
+
+            run_phase(app, recorder, "DELETE /delete-tailored-resume", count, conc,
+                      lambda client, i: timed(
+                          recorder, "DELETE /delete-tailored-resume", client.delete,
+                          f"/delete-tailored-resume?key=Engineer_{sizes[0]}_{i}_Tailored_Resume.docx",
+                          headers={"userId": users[i % len(users)]}))
+
+            batch_keys = [
+                f"Batch_{size}_{n}_Tailored_Resume.docx"
+                for size in sizes
+                for n in range(args.batch_size)
+            ]
+            run_phase(app, recorder, "DELETE /tailored-resumes", count, conc,
+                      lambda client, i: timed(
+                          recorder, "DELETE /tailored-resumes", client.delete,
+                          "/tailored-resumes", headers={"userId": users[i % len(users)]},
+                          json={"keys": batch_keys}, expect=(200,)))
+
+            run_phase(app, recorder, "GET /metrics", count, conc,
+                      lambda client, i: timed(recorder, "GET /metrics", client.get, "/metrics"))
+    finally:
+        restore()
+
+    report = {
+        "commit": git_commit(),
+        "config": vars(args) | {"pages": {size: CORPUS_SIZES[size] for size in sizes}},
+        "routes": recorder.report(),
+        "llm_calls": {"total": stub.calls, "by_corpus": llm_calls},
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import re
+import time
+import asyncio
+import threading
+import openai
+
+PARAGRAPH_LINE_RE = re.compile(r"^\s*\[\d+\].*$", re.MULTILINE)
+
+
+class StubLLM:
+    """
+    Local stand-in for `openai.ChatCompletion.create`.
+    Sleeps for `latency` seconds (a number, or a callable taking the prompt),
+    answers with `reply(prompt)` or `echo_reply` and counts how many times
+    it was called.
+    The first `rate_limit_failures` calls raise RateLimitError.
+    With `rpm`/`tpm` set it also enforces its own requests and tokens per
+    minute like the provider does: token buckets holding `burst_seconds` of
+    their rate, charged the prompt words plus `max_tokens`, and a
+    RateLimitError with Retry-After and x-ratelimit-* headers when either
+    runs out. Rejected calls are counted in `rate_limited`.
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        rate_limit_failures=0,
+        reply=None,
+        rpm=None,
+        tpm=None,
+        burst_seconds=60.0,
+    ):
+        self.latency = latency
+        self.rate_limit_failures = rate_limit_failures
+        self.reply = reply
+        self.calls = 0
+        self.rate_limited = 0
+        self.limits = {"requests": rpm, "tokens": tpm}
+        self.burst_seconds = burst_seconds
+        self._levels = {
+            name: limit / 60.0 * burst_seconds for name, limit in self.limits.items() if limit
+        }
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __call__(self, model=None, messages=None, max_tokens=None, **kwargs):
+        prompt = self._start(messages, max_tokens)
+        time.sleep(self._delay(prompt))
+        return self._response(prompt)
+
+    async def acreate(self, model=None, messages=None, max_tokens=None, **kwargs):
+        """
+        Stand-in for `openai.ChatCompletion.acreate`; waits without blocking.
+        """
+        prompt = self._start(messages, max_tokens)
+        await asyncio.sleep(self._delay(prompt))
+        return self._response(prompt)
+
+    def _start(self, messages, max_tokens=None):
+        prompt = messages[-1]["content"]
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+            headers = self._take(len(prompt.split()) + (max_tokens or 0))
+            if headers is not None:
+                self.rate_limited += 1
+        if call_number <= self.rate_limit_failures:
+            raise openai.error.RateLimitError("stub rate limit")
+        if headers is not None:
+            raise openai.error.RateLimitError("stub rate limit", headers=headers)
+        return prompt
+
+    def _take(self, tokens):
+        """
+        Charge one request and `tokens` tokens, or return the headers of a
+        rate-limit response if either bucket is short. Called with the lock held.
+        """
+        now = time.monotonic()
+        elapsed, self._updated = now - self._updated, now
+        rates = {name: self.limits[name] / 60.0 for name in self._levels}
+        for name in self._levels:
+            capacity = rates[name] * self.burst_seconds
+            self._levels[name] = min(capacity, self._levels[name] + elapsed * rates[name])
+
+        wanted = {"requests": 1, "tokens": tokens}
+        waits = {
+            name: (wanted[name] - level) / rates[name]
+            for name, level in self._levels.items()
+            if level < wanted[name]
+        }
+        if not waits:
+            for name in self._levels:
+                self._levels[name] -= wanted[name]
+            return None
+        headers = {"retry-after-ms": str(int(max(waits.values()) * 1000) + 1)}
+        for name, level in self._levels.items():
+            headers[f"x-ratelimit-limit-{name}"] = str(self.limits[name])
+            headers[f"x-ratelimit-remaining-{name}"] = str(max(0, int(level)))
+            headers[f"x-ratelimit-reset-{name}"] = f"{waits.get(name, 0) * 1000:.0f}ms"
+        return headers
+
+    def _delay(self, prompt):
+        return self.latency(prompt) if callable(self.latency) else self.latency
+
+    def _response(self, prompt):
+        content = (self.reply or echo_reply)(prompt)
+        return {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {
+                "prompt_tokens": len(prompt.split()),
+                "completion_tokens": len(content.split()),
+                "total_tokens": len(prompt.split()) + len(content.split()),
+            },
+        }
+
+    def install(self):
+        """
+        Patch `openai.ChatCompletion.create` and `acreate` with this stub.
+        Returns a callable that restores the originals.
+        The app's own rate limits budget the real provider, so they are off
+        for the rest of the process unless LLM_RPM / LLM_TPM are already set.
+        """
+        os.environ.setdefault("LLM_RPM", "0")
+        os.environ.setdefault("LLM_TPM", "0")
+        original, original_async = openai.ChatCompletion.create, openai.ChatCompletion.acreate
+        openai.ChatCompletion.create = self
+        openai.ChatCompletion.acreate = self.acreate
+
+        def restore():
+            openai.ChatCompletion.create = original
+            openai.ChatCompletion.acreate = original_async
+
+        return restore
+
+
+def echo_reply(prompt):
+    """
+    A well-formed reply that changes nothing: no edits for a delta tailoring
+    prompt, the ID-prefixed paragraphs as given for a full one, and the
+    prompt itself for anything else.
+    """
+    if '{"edits"' in prompt:
+        return '{"edits": []}'
+    paragraphs = PARAGRAPH_LINE_RE.findall(prompt)
+    if paragraphs:
+        return "\n".join(line.strip() for line in paragraphs)
+    return prompt
@@ -0,0 +1,95 @@
+"""
+Move tailored resumes saved before they had their own prefix, at
+`<userId>/<title>_Tailored_Resume.docx`, to `<userId>/tailored/`, where
+/get-tailored-resumes lists them and the delete endpoints find them.
+Each legacy object is copied, then deleted. If a newer copy already exists
+under tailored/, it is kept and only the legacy one is deleted. Safe to
+run again, and while the app is serving.
+
+    python -m scripts.migrate_tailored_resumes --dry-run
+    python -m scripts.migrate_tailored_resumes
+"""
+import argparse
+import os
+import re
+
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+
+from app.utils.generation import tailored_prefix
+from app.utils.s3_utils import delete_objects_from_s3, get_s3_client
+
+# <userId>/<sanitized title>_Tailored_Resume.docx, directly under the user
+LEGACY_KEY_RE = re.compile(r"(?P<user_id>[^/]+)/(?P<name>[^/]+_Tailored_Resume\.docx)")
+
+
+def legacy_keys(bucket):
+    """
+    Yield (key, new key) for every tailored resume in the legacy layout.
+    """
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket):
+        for obj in page.get("Contents", []):
+            match = LEGACY_KEY_RE.fullmatch(obj["Key"])
+            if match:
+                new_key = f"{tailored_prefix(match['user_id'])}{match['name']}"
+                yield obj["Key"], new_key
+
+
+def exists(bucket, key):
+    try:
+        get_s3_client().head_object(Bucket=bucket, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+            return False
+        raise
+
+
+def migrate(bucket, dry_run=False):
+    """
+    Move every legacy tailored resume in `bucket`. Returns (moved, kept
+    newer, errors), where errors lists the legacy keys S3 failed to delete.
+    """
+    s3_client = get_s3_client()
+    moved, kept_newer, done = 0, 0, []
+    for key, new_key in legacy_keys(bucket):
+        note = ""
+        if exists(bucket, new_key):
+            kept_newer += 1
+            note = " (newer copy kept)"
+        else:
+            moved += 1
+            if not dry_run:
+                s3_client.copy_object(
+                    Bucket=bucket, Key=new_key, CopySource={"Bucket": bucket, "Key": key}
+                )
+        print(f"{key} -> {new_key}{note}")
+        done.append(key)
+
+    errors = []
+    if done and not dry_run:
+        _, errors = delete_objects_from_s3(bucket, done)
+    return moved, kept_newer, errors
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bucket", default=os.getenv("AWS_S3_BUCKET"))
+    parser.add_argument("--dry-run", action="store_true", help="only list what would move")
+    args = parser.parse_args()
+    if not args.bucket:
+        parser.error("--bucket or AWS_S3_BUCKET is required")
+
+    moved, kept_newer, errors = migrate(args.bucket, args.dry_run)
+    verb = "would move" if args.dry_run else "moved"
+    print(f"{verb} {moved}, {kept_newer} already had a newer copy under tailored/")
+    for error in errors:
+        print(f"failed to delete {error['key']}: {error['code']} {error['message']}")
+    if errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
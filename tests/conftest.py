@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+# The rate limits budget the real provider; tests only talk to FakeLLM
+os.environ.setdefault("LLM_RPM", "0")
+os.environ.setdefault("LLM_TPM", "0")
+
+
+class FakeLLM:
+    """
+    Stands in for `openai.ChatCompletion`: returns `replies` in order, the
+    last one for every call after that, and records the prompts.
+    """
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def create(self, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        reply = self.replies[min(len(self.prompts), len(self.replies)) - 1]
+        return {
+            "choices": [{"message": {"content": reply}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+        }
+
+    async def acreate(self, messages, **kwargs):
+        return self.create(messages, **kwargs)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    Install a FakeLLM; set its replies with `fake_llm.replies = [...]`.
+    """
+    from app.utils.llm_utils import get_openai
+
+    fake = FakeLLM(["{}"])
+    openai = get_openai()
+    monkeypatch.setattr(openai.ChatCompletion, "create", fake.create)
+    monkeypatch.setattr(openai.ChatCompletion, "acreate", fake.acreate)
+    return fake
+
+
+@pytest.fixture
+def tailoring_state(monkeypatch):
+    """
+    Delta-mode tailoring of every section, with empty caches and reuse index.
+    """
+    from app.utils import nlp_utils
+    from app.utils.cache_utils import LRUCache
+    from app.utils.near_duplicates import NearDuplicateIndex
+
+    monkeypatch.setenv("TAILORING_MODE", "delta")
+    monkeypatch.setenv("RELEVANCE_THRESHOLD", "0")
+    monkeypatch.setattr(nlp_utils, "tailoring_cache", LRUCache())
+    monkeypatch.setattr(nlp_utils, "reuse_index", NearDuplicateIndex())
+
+
+@pytest.fixture
+def s3_bucket(monkeypatch):
+    """
+    moto's in-memory S3 with an empty bucket, and a fresh client for it.
+    Returns the bucket name.
+    """
+    moto = pytest.importorskip("moto")
+    from app.utils import s3_utils
+
+    bucket = "test-bucket"
+    for name, value in (
+        ("AWS_ACCESS_KEY_ID", "testing"),
+        ("AWS_SECRET_ACCESS_KEY", "testing"),
+        ("AWS_S3_REGION", "us-east-1"),
+        ("AWS_S3_BUCKET", bucket),
+    ):
+        monkeypatch.setenv(name, value)
+    with moto.mock_aws():
+        monkeypatch.setattr(s3_utils, "_s3_client", None)
+        s3_utils.get_s3_client().create_bucket(Bucket=bucket)
+        yield bucket
+
+
+@pytest.fixture
+def client(s3_bucket):
+    from app import create_app
+
+    return create_app().test_client()
@@ -0,0 +1,35 @@
+from app.utils.s3_utils import get_s3_client
+
+HEADERS = {"userId": "user-1"}
+
+
+def seed(bucket, names):
+    for name in names:
+        get_s3_client().put_object(Bucket=bucket, Key=f"user-1/tailored/{name}", Body=b"PK")
+
+
+def titles(client):
+    resumes = client.get("/get-tailored-resumes?limit=100", headers=HEADERS).json["resumes"]
+    return [resume["title"] for resume in resumes]
+
+
+def test_bulk_delete_removes_only_listed_keys(client, s3_bucket):
+    names = [f"Job_{n}_Tailored_Resume.docx" for n in range(5)]
+    seed(s3_bucket, names)
+
+    response = client.delete(
+        "/tailored-resumes", headers=HEADERS, json={"keys": names[:3] + ["Missing.docx"]}
+    )
+    assert response.status_code == 200
+    # S3 reports keys that never existed as deleted, too
+    assert sorted(response.json["deleted"]) == sorted(names[:3] + ["Missing.docx"])
+    assert response.json["errors"] == []
+    assert titles(client) == names[3:]
+
+
+def test_bulk_delete_validates_keys(client):
+    for body in (None, {}, {"keys": []}, {"keys": "a.docx"}, {"keys": ["a.docx", ""]}):
+        response = client.delete("/tailored-resumes", headers=HEADERS, json=body)
+        assert response.status_code == 400
+    response = client.delete("/tailored-resumes", json={"keys": ["a.docx"]})
+    assert response.status_code == 400
@@ -0,0 +1,88 @@
+import json
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from app.utils import nlp_utils
+from tests.documents import add_hyperlink
+
+JOB_TITLE = "Backend Engineer"
+JOB_DESCRIPTION = "Build Python services on AWS with Postgres and Kafka."
+
+pytestmark = pytest.mark.usefixtures("tailoring_state")
+
+
+def master_resume():
+    doc = Document()
+    doc.add_paragraph("Experience", style="Heading 1")
+    doc.add_paragraph("Acme Corp\tJan 2020 - Now")
+    doc.add_paragraph("Built services in Python", style="List Bullet")
+    skills = doc.add_paragraph()
+    skills.add_run("Skills: ").bold = True
+    skills.add_run("Python, Go")
+    contact = doc.add_paragraph("Email: ")
+    add_hyperlink(contact, "jane@example.com", "mailto:jane@example.com")
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def tailored(fake_llm, edits):
+    fake_llm.replies = [
+        json.dumps({"edits": [{"id": idx, "text": text} for idx, text in edits.items()]})
+    ]
+    master_bytes = master_resume()
+    content, _ = nlp_utils.extract_docx_structure(BytesIO(master_bytes))
+    output = BytesIO()
+    nlp_utils.generate_tailored_resume(
+        master_bytes, content, JOB_TITLE, JOB_DESCRIPTION, output
+    )
+    return Document(BytesIO(master_bytes)), Document(BytesIO(output.getvalue()))
+
+
+def test_tabs_reach_the_model():
+    content, _ = nlp_utils.extract_docx_structure(BytesIO(master_resume()))
+    assert nlp_utils.prompt_text(content[1]) == "Acme Corp\tJan 2020 - Now"
+    assert nlp_utils.prompt_line("First line \n  second\tline") == "First line\\nsecond\tline"
+
+
+def test_edits_keep_structure_and_formatting(fake_llm):
+    master, doc = tailored(
+        fake_llm,
+        {
+            1: "Acme Corp\tJan 2020 - Present",
+            2: "Built Python services on AWS",
+            3: "Skills: Python, Go, AWS",
+            4: "Email: jane@example.org",
+        },
+    )
+
+    assert len(doc.paragraphs) == len(master.paragraphs)
+    assert [p.style.name for p in doc.paragraphs] == [p.style.name for p in master.paragraphs]
+    assert [p.text for p in doc.paragraphs[:4]] == [
+        "Experience",
+        "Acme Corp\tJan 2020 - Present",
+        "Built Python services on AWS",
+        "Skills: Python, Go, AWS",
+    ]
+
+    # The tab is still a tab stop, not a space
+    assert doc.paragraphs[1]._p.xpath(".//w:tab")
+
+    # The bold label is untouched and the new text is plain like its neighbour
+    runs = [(run.text, bool(run.bold)) for run in doc.paragraphs[3].runs]
+    assert runs[0] == ("Skills: ", True)
+    assert not any(bold for _, bold in runs[1:])
+
+    # Paragraphs with hyperlinks are left as they are
+    contact = doc.paragraphs[4]._p
+    assert contact.xpath("./w:hyperlink//w:t")[0].text == "jane@example.com"
+    assert master.paragraphs[4]._p.xml == contact.xml
+
+
+def test_soft_line_breaks_survive(fake_llm):
+    _, doc = tailored(fake_llm, {2: "Built Python services\\non AWS"})
+    bullet = doc.paragraphs[2]
+    assert bullet.text == "Built Python services\non AWS"
+    assert bullet._p.xpath(".//w:br")
@@ -0,0 +1,89 @@
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from docx import Document
+
+from app.utils.docx_rewrite import apply_paragraph_edits
+from app.utils.docx_template import DocxTemplate, get_docx_template
+from app.utils.generate_docx import generate_docx
+
+EDITS = {1: "Built Python services on AWS", 3: "Skills: Python, Go, AWS"}
+
+
+def master_resume():
+    doc = Document()
+    doc.add_paragraph("Experience", style="Heading 1")
+    doc.add_paragraph("Built services in Python", style="List Bullet")
+    doc.add_paragraph("Ran the on-call rotation", style="List Bullet")
+    skills = doc.add_paragraph()
+    skills.add_run("Skills: ").bold = True
+    skills.add_run("Python, Go")
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe"
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def render(template, edits=None, paragraphs=None):
+    output = BytesIO()
+    template.render(output, edits, paragraphs)
+    return output.getvalue()
+
+
+def paragraphs(docx_bytes):
+    doc = Document(BytesIO(docx_bytes))
+    return [(p.style.name, p.text) for p in doc.paragraphs]
+
+
+def test_same_output_as_python_docx():
+    master_bytes = master_resume()
+    doc = Document(BytesIO(master_bytes))
+    apply_paragraph_edits(doc, EDITS)
+    expected = BytesIO()
+    doc.save(expected)
+
+    output = render(DocxTemplate(master_bytes), EDITS)
+    assert paragraphs(output) == paragraphs(expected.getvalue())
+    assert Document(BytesIO(output)).sections[0].header.paragraphs[0].text == "Jane Doe"
+
+
+def test_archive_has_every_part_once():
+    master_bytes = master_resume()
+    with zipfile.ZipFile(BytesIO(master_bytes)) as archive:
+        expected = sorted(archive.namelist())
+    with zipfile.ZipFile(BytesIO(render(DocxTemplate(master_bytes), EDITS))) as archive:
+        assert archive.testzip() is None
+        assert sorted(archive.namelist()) == expected
+
+
+def test_template_is_not_changed_by_renders():
+    template = DocxTemplate(master_resume())
+    render(template, EDITS, ["Appended"])
+    assert paragraphs(render(template)) == paragraphs(master_resume())
+
+
+def test_templates_are_cached_by_content():
+    master_bytes = master_resume()
+    assert get_docx_template(master_bytes) is get_docx_template(bytes(master_bytes))
+
+
+def test_generate_docx_splits_lines():
+    output = generate_docx("First line\nSecond\tline")
+    assert [text for _, text in paragraphs(output.getvalue())] == ["First line", "Second\tline"]
+
+
+def test_concurrent_renders_do_not_collide():
+    template = get_docx_template(master_resume())
+
+    def assemble(n):
+        if n % 2:
+            return n, generate_docx(f"Tailored for request-{n}").getvalue()
+        return n, render(template, {1: f"Tailored for request-{n}"})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(assemble, range(64)))
+
+    for n, output in results:
+        found = [text for _, text in paragraphs(output) if "request-" in text]
+        assert found == [f"Tailored for request-{n}"]
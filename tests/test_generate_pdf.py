@@ -0,0 +1,57 @@
+from io import BytesIO
+
+from docx import Document
+
+from app import warm_up
+from app.utils import generate_pdf
+from app.utils.docx_extract import parse_docx
+from app.utils.generate_pdf import render_pdf
+from tests.documents import add_hyperlink
+
+
+def contact_docx():
+    doc = Document()
+    doc.add_paragraph("Jane Doe", style="Title")
+    contact = doc.add_paragraph()
+    contact.add_run("Email: ").bold = True
+    add_hyperlink(contact, "jane@example.com", "mailto:jane@example.com")
+    contact.add_run(" | ")
+    add_hyperlink(contact, "github.com/jane", "https://github.com/jane")
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def test_hyperlink_runs_are_parsed_in_order():
+    para = parse_docx(BytesIO(contact_docx())).paragraphs[1]
+    assert para.text == "Email: jane@example.com | github.com/jane"
+    # `runs` matches python-docx, which leaves hyperlinks out
+    assert [run.text for run in para.runs] == ["Email: ", " | "]
+    assert [(run.text, run.hyperlink) for run in para.all_runs] == [
+        ("Email: ", None),
+        ("jane@example.com", "mailto:jane@example.com"),
+        (" | ", None),
+        ("github.com/jane", "https://github.com/jane"),
+    ]
+
+
+def test_pdf_keeps_hyperlinks():
+    pdf = render_pdf(contact_docx())
+    assert b"jane@example.com" in pdf
+    assert b"github.com/jane" in pdf
+    assert b"(mailto:jane@example.com)" in pdf
+    assert b"(https://github.com/jane)" in pdf
+
+
+def test_warm_up_leaves_pdf_pool_to_first_render(monkeypatch):
+    monkeypatch.setattr(generate_pdf, "_pdf_pool", None)
+    warm_up()
+    assert generate_pdf._pdf_pool is None
+
+
+def test_pdf_pool_is_small_by_default(monkeypatch):
+    monkeypatch.delenv("PDF_RENDER_WORKERS", raising=False)
+    monkeypatch.setattr(generate_pdf.os, "cpu_count", lambda: 64)
+    assert generate_pdf.get_pdf_workers() == generate_pdf.DEFAULT_PDF_WORKERS
+    monkeypatch.setenv("PDF_RENDER_WORKERS", "8")
+    assert generate_pdf.get_pdf_workers() == 8
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+from app.utils.llm_scheduler import BATCH, INTERACTIVE, FairScheduler
+
+
+class SlowLimiter:
+    """
+    A rate limiter whose every reservation takes `seconds`, like SQLite
+    waiting on another process's write lock.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.threads = set()
+
+    def reserve(self, tokens):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.seconds)
+        return 0.0
+
+
+def grant_order(scheduler, requests):
+    """
+    Queue `requests` [(user, priority)] behind a held slot, then release
+    the slots one at a time and return the users in the order served.
+    """
+
+    async def run():
+        held = await scheduler.aacquire("holder")
+        order = []
+
+        async def call(user, priority):
+            ticket = await scheduler.aacquire(user, priority)
+            order.append(user)
+            scheduler.release(ticket)
+
+        tasks = [asyncio.create_task(call(*request)) for request in requests]
+        await asyncio.sleep(0)
+        scheduler.release(held)
+        await asyncio.gather(*tasks)
+        return order
+
+    return asyncio.run(run())
+
+
+def test_light_user_is_not_starved():
+    requests = [("heavy", INTERACTIVE)] * 3 + [("light", INTERACTIVE)]
+    order = grant_order(FairScheduler(max_in_flight=1), requests)
+    assert order[:2] == ["heavy", "light"]
+
+
+def test_interactive_calls_go_before_batch():
+    requests = [("batch", BATCH)] * 3 + [("user", INTERACTIVE)]
+    order = grant_order(FairScheduler(max_in_flight=1), requests)
+    assert order[0] == "user"
+
+
+def test_rate_limiter_does_not_block_event_loop():
+    limiter = SlowLimiter(0.2)
+    scheduler = FairScheduler(max_in_flight=10, limiter=limiter)
+
+    async def run():
+        gaps = []
+
+        async def tick():
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                gaps.append(time.perf_counter() - start)
+
+        ticker = asyncio.create_task(tick())
+        tickets = await asyncio.gather(*(scheduler.aacquire(f"user-{n}") for n in range(3)))
+        ticker.cancel()
+        for ticket in tickets:
+            scheduler.release(ticket)
+        return gaps
+
+    gaps = asyncio.run(run())
+    assert len(gaps) > 20
+    assert max(gaps) < 0.1
+    assert threading.get_ident() not in limiter.threads
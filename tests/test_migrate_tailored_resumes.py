@@ -0,0 +1,42 @@
+from app.utils.resume_store import list_tailored_resumes
+from app.utils.s3_utils import get_s3_client
+from scripts.migrate_tailored_resumes import migrate
+
+
+def put(bucket, key, body=b"docx"):
+    get_s3_client().put_object(Bucket=bucket, Key=key, Body=body)
+
+
+def keys(bucket):
+    response = get_s3_client().list_objects_v2(Bucket=bucket)
+    return sorted(obj["Key"] for obj in response.get("Contents", []))
+
+
+def test_legacy_resumes_move_under_tailored(s3_bucket):
+    put(s3_bucket, "user-1/Backend_Engineer_Tailored_Resume.docx", b"old layout")
+    put(s3_bucket, "user-1/Data_Engineer_Tailored_Resume.docx", b"stale")
+    put(s3_bucket, "user-1/tailored/Data_Engineer_Tailored_Resume.docx", b"newer")
+    put(s3_bucket, "user-1/master_resume/resume.docx")
+    put(s3_bucket, "user-2/notes.txt")
+
+    assert migrate(s3_bucket, dry_run=True) == (1, 1, [])
+    assert len(keys(s3_bucket)) == 5
+
+    assert migrate(s3_bucket) == (1, 1, [])
+    assert keys(s3_bucket) == [
+        "user-1/master_resume/resume.docx",
+        "user-1/tailored/Backend_Engineer_Tailored_Resume.docx",
+        "user-1/tailored/Data_Engineer_Tailored_Resume.docx",
+        "user-2/notes.txt",
+    ]
+    body = get_s3_client().get_object(
+        Bucket=s3_bucket, Key="user-1/tailored/Data_Engineer_Tailored_Resume.docx"
+    )["Body"].read()
+    assert body == b"newer"
+
+    resumes, _ = list_tailored_resumes("user-1", limit=10)
+    assert [resume["title"] for resume in resumes] == [
+        "Backend_Engineer_Tailored_Resume.docx",
+        "Data_Engineer_Tailored_Resume.docx",
+    ]
+    assert migrate(s3_bucket) == (0, 0, [])
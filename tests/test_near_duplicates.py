@@ -0,0 +1,130 @@
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from app.utils import nlp_utils
+from app.utils.job_queue import FAILED, SUCCEEDED, JobQueue
+from app.utils.near_duplicates import NearDuplicateIndex, minhash_signature, strip_boilerplate
+
+DUTIES = (
+    "You will design and operate backend services in Python and Go on AWS. "
+    "You will own our Postgres and Kafka data pipelines end to end. "
+    "You will build deployment tooling with Terraform and Kubernetes. "
+    "You will mentor engineers and review designs across the platform team."
+)
+REQUIREMENTS = "Requirements\n\n- 5+ years of Python\n- Experience with Kafka\n- AWS"
+
+
+def posting(company, duties=DUTIES, blurb=None, benefits=""):
+    blurb = blurb or f"About {company}\n\n{company} helps teams move faster."
+    parts = [
+        "Backend Engineer",
+        blurb,
+        "About the role\n\n" + duties,
+        REQUIREMENTS,
+        benefits,
+        f"{company} is an equal opportunity employer. All qualified applicants "
+        "will receive consideration without regard to race or veteran status.",
+    ]
+    return "\n\n".join(part for part in parts if part)
+
+
+def index_with(text, value="original", **kwargs):
+    index = NearDuplicateIndex(**kwargs)
+    index.add("master", minhash_signature(text), value)
+    return index
+
+
+def test_boilerplate_is_dropped():
+    kept = strip_boilerplate(posting("Acme", benefits="Benefits\n\n- Health\n- Equity"))
+    assert "Postgres" in kept
+    assert "helps teams" not in kept
+    assert "Health" not in kept
+    assert "equal opportunity" not in kept
+
+
+def test_repost_with_other_boilerplate_matches():
+    index = index_with(posting("Acme"))
+    repost = posting(
+        "Acme",
+        blurb="Who we are\n\nAt Acme we believe great tools change how people work.",
+        benefits="What we offer\n\n- Equity\n- Learning budget",
+    )
+    match = index.query("master", minhash_signature("  ".join(repost.upper().split(" "))))
+    assert match is not None
+    value, similarity = match
+    assert value == "original"
+    assert similarity >= index.threshold
+
+
+def test_different_job_does_not_match():
+    index = index_with(posting("Acme"))
+    other = DUTIES.split(". ")[:2] + [
+        "You will train ranking models in PyTorch",
+        "You will run experiments on our search infrastructure.",
+    ]
+    assert index.query("master", minhash_signature(posting("Acme", ". ".join(other)))) is None
+
+
+def test_entries_only_match_their_namespace():
+    index = index_with(posting("Acme"))
+    assert index.query("other master", minhash_signature(posting("Acme"))) is None
+
+
+def test_least_recently_matched_entry_is_dropped():
+    index = NearDuplicateIndex(max_entries=2)
+    texts = [
+        posting("Acme", "You will build billing systems in Java and run them on GCP."),
+        posting("Acme", "You will train ranking models in PyTorch for our search team."),
+        posting("Acme", "You will automate Terraform deployments across Azure regions."),
+    ]
+    for n, text in enumerate(texts[:2]):
+        index.add("master", minhash_signature(text), n)
+    assert index.query("master", minhash_signature(texts[0]))[0] == 0
+    index.add("master", minhash_signature(texts[2]), 2)
+    assert len(index) == 2
+    assert index.query("master", minhash_signature(texts[1])) is None
+    assert index.query("master", minhash_signature(texts[0]))[0] == 0
+
+
+def test_persisted_index_is_reloaded(tmp_path):
+    path = str(tmp_path / "reuse.jsonl")
+    index_with(posting("Acme"), value=[[3, "Tailored bullet"]], path=path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('["master", [1, 2')  # Torn write from a crashed process
+    reloaded = NearDuplicateIndex(path=path)
+    assert len(reloaded) == 1
+    assert reloaded.query("master", minhash_signature(posting("Acme")))[0] == [
+        [3, "Tailored bullet"]
+    ]
+
+
+@pytest.mark.usefixtures("tailoring_state")
+def test_reused_job_reports_progress(fake_llm):
+    fake_llm.replies = ['{"edits": [{"id": 1, "text": "Built Python services on AWS"}]}']
+    doc = Document()
+    doc.add_paragraph("Experience")
+    doc.add_paragraph("Built services in Python", style="List Bullet")
+    buffer = BytesIO()
+    doc.save(buffer)
+    master_bytes = buffer.getvalue()
+    content, _ = nlp_utils.extract_docx_structure(BytesIO(master_bytes))
+
+    queue = JobQueue(max_workers=1)
+    jobs, calls = [], []
+    for company in ("Acme", "Acme Corp"):
+        job = queue.submit(
+            "user", company, nlp_utils.generate_tailored_resume,
+            master_bytes, content, "Backend Engineer", posting(company), BytesIO(),
+        )
+        version = 0
+        while job.to_dict()["status"] not in (SUCCEEDED, FAILED):
+            version = job.wait_for_change(version, timeout=10)
+        jobs.append(job.to_dict())
+        calls.append(len(fake_llm.prompts))
+
+    assert calls[1] == calls[0]
+    assert jobs[1]["status"] == SUCCEEDED
+    assert jobs[1]["result"]["reusedSimilarity"] is not None
+    assert jobs[1]["progress"] == {"completed": 0, "total": 0}
@@ -0,0 +1,131 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from app.utils import nlp_utils
+from app.utils.llm_utils import TokenUsage, close_aiosession
+from tests.documents import add_hyperlink
+
+TRUNCATED = '{"edits": [{"id": 1, "text": "Built Python'
+EDITED = '{"edits": [{"id": 1, "text": "Built Python services on AWS"}]}'
+
+JOB_TITLE = "Backend Engineer"
+JOB_DESCRIPTION = "Build Python services on AWS with Postgres and Kafka."
+
+pytestmark = pytest.mark.usefixtures("tailoring_state")
+
+
+def master_resume():
+    doc = Document()
+    doc.add_paragraph("Experience")
+    doc.add_paragraph("Built services in Python", style="List Bullet")
+    doc.add_paragraph("Ran the on-call rotation", style="List Bullet")
+    buffer = BytesIO()
+    doc.save(buffer)
+    master_bytes = buffer.getvalue()
+    content, _ = nlp_utils.extract_docx_structure(BytesIO(master_bytes))
+    return master_bytes, content
+
+
+def tailor(master_bytes, content):
+    return nlp_utils.generate_tailored_resume(
+        master_bytes, content, JOB_TITLE, JOB_DESCRIPTION, BytesIO()
+    )
+
+
+def test_valid_replies():
+    assert nlp_utils.is_valid_reply(EDITED, "delta")
+    assert nlp_utils.is_valid_reply('```json\n{"edits": []}\n```', "delta")
+    assert not nlp_utils.is_valid_reply(TRUNCATED, "delta")
+    assert not nlp_utils.is_valid_reply('{"edits": {}}', "delta")
+    assert nlp_utils.is_valid_reply("[3] Text", "full")
+    assert not nlp_utils.is_valid_reply("Sorry, I can't help with that.", "full")
+
+
+def test_malformed_reply_is_requested_again(fake_llm):
+    fake_llm.replies = [TRUNCATED, EDITED]
+    usage = TokenUsage()
+    replies = nlp_utils.tailor_chunks(
+        ["[1] Built services in Python"], JOB_TITLE, JOB_DESCRIPTION, usage=usage
+    )
+    assert replies == [EDITED]
+    assert len(fake_llm.prompts) == 2
+    assert usage.malformed_replies == 0
+    assert len(nlp_utils.tailoring_cache) == 1
+
+
+def test_malformed_reply_is_not_cached_or_reused(fake_llm):
+    fake_llm.replies = [TRUNCATED]
+    master_bytes, content = master_resume()
+
+    report = tailor(master_bytes, content)
+    assert report["malformedReplies"] == 1
+    assert report["editedParagraphs"] == 0
+    assert len(nlp_utils.tailoring_cache) == 0
+    assert len(nlp_utils.reuse_index) == 0
+
+    # The next request asks the model again and keeps its good reply
+    calls = len(fake_llm.prompts)
+    fake_llm.replies = [EDITED]
+    report = tailor(master_bytes, content)
+    assert len(fake_llm.prompts) == calls + 1
+    assert report["malformedReplies"] == 0
+    assert report["editedParagraphs"] == 1
+    assert len(nlp_utils.reuse_index) == 1
+
+
+def test_async_malformed_reply_is_not_cached(fake_llm):
+    fake_llm.replies = [TRUNCATED]
+    usage = TokenUsage()
+
+    async def run():
+        try:
+            return await nlp_utils.atailor_chunks(
+                ["[1] Built services in Python"], JOB_TITLE, JOB_DESCRIPTION, usage=usage
+            )
+        finally:
+            await close_aiosession()
+
+    replies = asyncio.run(run())
+    assert replies == [TRUNCATED]
+    assert len(fake_llm.prompts) == 2
+    assert usage.malformed_replies == 1
+    assert len(nlp_utils.tailoring_cache) == 0
+
+
+def test_near_duplicate_posting_reuses_edits(fake_llm):
+    fake_llm.replies = [EDITED]
+    master_bytes, content = master_resume()
+    first = tailor(master_bytes, content)
+    calls = len(fake_llm.prompts)
+
+    report = nlp_utils.generate_tailored_resume(
+        master_bytes,
+        content,
+        JOB_TITLE,
+        JOB_DESCRIPTION.upper() + "\n\nWe are an equal opportunity employer.",
+        BytesIO(),
+    )
+    assert len(fake_llm.prompts) == calls
+    assert report["reusedSimilarity"] >= nlp_utils.reuse_index.threshold
+    assert report["editedParagraphs"] == first["editedParagraphs"] == 1
+
+
+def test_hyperlink_paragraphs_are_not_sent(fake_llm):
+    fake_llm.replies = [EDITED]
+    doc = Document()
+    doc.add_paragraph("Built services in Python", style="List Bullet")
+    add_hyperlink(doc.add_paragraph("Portfolio: "), "example.dev", "https://example.dev")
+    buffer = BytesIO()
+    doc.save(buffer)
+    content, _ = nlp_utils.extract_docx_structure(BytesIO(buffer.getvalue()))
+    assert [para["has_hyperlink"] for para in content] == [False, True]
+
+    # EDITED rewrites paragraph 1, the hyperlink one, so nothing is applied
+    report = tailor(buffer.getvalue(), content)
+    assert report["editedParagraphs"] == 0
+    assert len(fake_llm.prompts) == 1
+    assert "Built services in Python" in fake_llm.prompts[0]
+    assert "example.dev" not in fake_llm.prompts[0]
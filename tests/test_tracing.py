@@ -0,0 +1,51 @@
+import os
+
+from app import create_app, routes
+from app.utils.tracing import REQUEST_ID_HEADER, RequestIdFilter, begin_request
+
+
+def test_plain_request_ids_are_kept():
+    assert begin_request("abc-1.2_3") == "abc-1.2_3"
+
+
+def test_unsafe_request_ids_are_replaced():
+    for request_id in ("/tmp/escaped", "../up", "..", "a b", "abc\n", "x" * 65, ""):
+        replaced = begin_request(request_id)
+        assert replaced != request_id
+        assert len(replaced) == 32
+
+
+def test_profile_stays_in_profile_dir(tmp_path, monkeypatch):
+    profile_dir = tmp_path / "profiles"
+    monkeypatch.setenv("PROFILING_ENABLED", "1")
+    monkeypatch.setenv("PROFILE_DIR", str(profile_dir))
+    client = create_app().test_client()
+
+    escaped = tmp_path / "escaped"
+    response = client.get(
+        "/health", headers={"X-Profile": "1", REQUEST_ID_HEADER: str(escaped)}
+    )
+    response.close()
+
+    request_id = response.headers[REQUEST_ID_HEADER]
+    assert request_id != str(escaped)
+    assert not os.path.exists(f"{escaped}.prof")
+    assert os.listdir(profile_dir) == [f"{request_id}.prof"]
+
+
+def test_route_errors_are_logged_with_request_id(monkeypatch, caplog):
+    def fail(user_id):
+        raise RuntimeError("S3 is down")
+
+    monkeypatch.setattr(routes, "get_master_resume_url", fail)
+    client = create_app().test_client()
+    caplog.handler.addFilter(RequestIdFilter())
+
+    response = client.get(
+        "/get-master-resume", headers={"userId": "user", REQUEST_ID_HEADER: "req-1"}
+    )
+
+    assert response.status_code == 500
+    [record] = [r for r in caplog.records if r.name == "app.routes"]
+    assert record.request_id == "req-1"
+    assert record.exc_info[0] is RuntimeError
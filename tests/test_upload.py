@@ -0,0 +1,41 @@
+import tempfile
+
+import pytest
+
+from app.routes import MAX_RESUME_REQUEST_SIZE
+
+MB = 1024 * 1024
+
+pytest.importorskip("moto")
+from benchmarks.bench_upload_memory import S3_READ_BUFFER, upload  # noqa: E402
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_upload_is_stored(client, chunked):
+    upload(client, MB // 2)  # Load botocore models and moto state first
+    status, peak = upload(client, 2 * MB - 1024, chunked)
+    assert status == 200
+    assert peak < 2 * MAX_RESUME_REQUEST_SIZE + S3_READ_BUFFER
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_oversized_upload_is_not_buffered(client, chunked):
+    status, peak = upload(client, 64 * MB, chunked)
+    assert status == 400
+    assert peak < 2 * MAX_RESUME_REQUEST_SIZE
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_upload_is_not_written_to_disk(client, monkeypatch, chunked):
+    temp_files = []
+    temporary_file = tempfile.TemporaryFile
+
+    def record(*args, **kwargs):
+        temp_files.append(args)
+        return temporary_file(*args, **kwargs)
+
+    # SpooledTemporaryFile rolls over to disk through tempfile.TemporaryFile
+    monkeypatch.setattr(tempfile, "TemporaryFile", record)
+    status, _ = upload(client, 2 * MB - 1024, chunked)
+    assert status == 200
+    assert temp_files == []